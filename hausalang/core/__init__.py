@@ -8,11 +8,13 @@ from hausalang.core.errors import ContextualError, ErrorKind, SourceLocation
 from hausalang.core.interpreter import Interpreter
 from hausalang.core.lexer import Token, tokenize_program
 from hausalang.core.parser import Parser
+from hausalang.core.stack_interpreter import StackInterpreter
 
 __all__ = [
     "tokenize_program",
     "Parser",
     "Interpreter",
+    "StackInterpreter",
     "Token",
     "ContextualError",
     "ErrorKind",
@@ -0,0 +1,255 @@
+"""
+Call Graph Analysis for Hausalang
+
+Builds the call graph of the `aiki` functions of a program and summarizes
+each function for the optimizer and the interpreters:
+
+- which functions it calls directly
+- whether it is recursive: directly (it calls itself) or mutually (it is
+  on a cycle through other functions)
+- whether it is a leaf, calling no function at all
+- whether it writes output with `rubuta`, itself or through any function
+  it can call
+
+Functions are called by name, and under dynamic scoping a call can reach
+any definition of that name. The graph therefore has one node per name: a
+name defined more than once (including in nested `aiki` statements)
+combines the calls and prints of all its definitions.
+
+The analysis is one walk over the tree and one strongly connected
+components pass over the graph (Tarjan's algorithm), both linear. Use
+`Program.call_graph`, which caches the result with the tree.
+
+`is_leaf_function` checks a single definition at run time: whether its
+calls can run on a reused frame.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Set
+
+from . import parser
+
+
+@dataclass(frozen=True)
+class FunctionSummary:
+    """What a function can do when called.
+
+    Attributes:
+        name: The function name.
+        definitions: How many `aiki` statements define the name.
+        calls: Names the function calls directly, defined or not.
+        directly_recursive: The function calls itself.
+        mutually_recursive: The function is on a call cycle through other
+            functions.
+        leaf: The function makes no calls.
+        prints_directly: The function contains a `rubuta`.
+        prints: The function may write output, itself or through any
+            function it can call.
+    """
+
+    name: str
+    definitions: int
+    calls: FrozenSet[str]
+    directly_recursive: bool
+    mutually_recursive: bool
+    leaf: bool
+    prints_directly: bool
+    prints: bool
+
+    @property
+    def recursive(self) -> bool:
+        """True if a call to the function can lead to another call to it."""
+        return self.directly_recursive or self.mutually_recursive
+
+
+@dataclass(frozen=True)
+class CallGraph:
+    """The call graph of a program.
+
+    Attributes:
+        functions: Summary of every defined function, by name (read-only).
+        top_level_calls: Names called by the top-level statements.
+    """
+
+    functions: Mapping[str, FunctionSummary]
+    top_level_calls: FrozenSet[str]
+
+    def get(self, name: str) -> Optional[FunctionSummary]:
+        """Return the summary of function `name`, or None if undefined."""
+        return self.functions.get(name)
+
+    def recursive_functions(self) -> FrozenSet[str]:
+        """Return the names of all recursive functions."""
+        return frozenset(
+            name for name, summary in self.functions.items() if summary.recursive
+        )
+
+
+class _Collector:
+    """Records the direct calls and prints of every function in one walk."""
+
+    def __init__(self) -> None:
+        self.definitions: Dict[str, int] = {}
+        self.calls: Dict[str, Set[str]] = {}
+        self.prints: Set[str] = set()
+        self.top_level_calls: Set[str] = set()
+
+    def visit(self, node: Any, function: Optional[str]) -> None:
+        """Walk `node`, attributing what it does to `function`.
+
+        Args:
+            node: An AST node, or a list or tuple of them.
+            function: The name of the enclosing function, or None at top
+                level.
+        """
+        pending = [(node, function)]
+        while pending:
+            node, function = pending.pop()
+            if isinstance(node, (list, tuple)):
+                pending.extend((item, function) for item in node)
+                continue
+            if not isinstance(node, parser.ASTNode):
+                continue
+
+            if isinstance(node, parser.Function):
+                # The body belongs to the defined function, not the enclosing one
+                self.definitions[node.name] = self.definitions.get(node.name, 0) + 1
+                self.calls.setdefault(node.name, set())
+                pending.append((node.body, node.name))
+                continue
+
+            if isinstance(node, parser.FunctionCall):
+                if function is None:
+                    self.top_level_calls.add(node.name)
+                else:
+                    self.calls.setdefault(function, set()).add(node.name)
+            elif isinstance(node, parser.Print) and function is not None:
+                self.prints.add(function)
+
+            for value in vars(node).values():
+                if isinstance(value, (list, tuple, parser.ASTNode)):
+                    pending.append((value, function))
+
+
+def _components(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """Return the strongly connected components of `graph`.
+
+    Uses an iterative Tarjan's algorithm, so deep call chains do not hit
+    the recursion limit. Components come callees first: every component
+    is listed after all the components it can reach.
+
+    Args:
+        graph: Callees by caller; callees missing from `graph` are ignored.
+
+    Returns:
+        The components, each a list of names.
+    """
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components: List[List[str]] = []
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            name, callees = work[-1]
+            for callee in callees:
+                if callee not in graph:
+                    continue
+                if callee not in index:
+                    index[callee] = lowlink[callee] = len(index)
+                    stack.append(callee)
+                    on_stack.add(callee)
+                    work.append((callee, iter(graph[callee])))
+                    break
+                if callee in on_stack:
+                    lowlink[name] = min(lowlink[name], index[callee])
+            else:
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    lowlink[caller] = min(lowlink[caller], lowlink[name])
+                if lowlink[name] == index[name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    components.append(component)
+    return components
+
+
+def build_call_graph(program: parser.Program) -> CallGraph:
+    """Analyze the functions of a program.
+
+    Prefer `program.call_graph`, which only builds the graph once.
+
+    Args:
+        program: The program to analyze.
+
+    Returns:
+        The call graph, with a summary for every defined function.
+    """
+    collector = _Collector()
+    collector.visit(program.statements, None)
+    graph = {name: collector.calls[name] for name in collector.definitions}
+
+    prints: Dict[str, bool] = {}
+    mutual: Set[str] = set()
+    for component in _components(graph):
+        # Callees in other components are already done
+        members = set(component)
+        component_prints = any(
+            name in collector.prints
+            or any(prints.get(callee, False) for callee in graph[name] - members)
+            for name in component
+        )
+        for name in component:
+            prints[name] = component_prints
+        if len(component) > 1:
+            mutual |= members
+
+    functions = {
+        name: FunctionSummary(
+            name=name,
+            definitions=collector.definitions[name],
+            calls=frozenset(calls),
+            directly_recursive=name in calls,
+            mutually_recursive=name in mutual,
+            leaf=not calls,
+            prints_directly=name in collector.prints,
+            prints=prints[name],
+        )
+        for name, calls in graph.items()
+    }
+    return CallGraph(
+        functions=MappingProxyType(functions),
+        top_level_calls=frozenset(collector.top_level_calls),
+    )
+
+
+def is_leaf_function(func: parser.Function) -> bool:
+    """Return True if no scope can be created while `func` runs.
+
+    A leaf function makes no calls and defines no functions, so its
+    environment never becomes the parent of another scope, and nothing
+    can refer to it once the call returns (see interpreter.LeafFrame).
+
+    Args:
+        func: The Function definition.
+
+    Returns:
+        True if calls to `func` may run on a reused frame.
+    """
+    collector = _Collector()
+    collector.visit(func.body, func.name)
+    return not collector.definitions and not collector.calls.get(func.name)
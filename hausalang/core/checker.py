@@ -0,0 +1,306 @@
+"""
+Static Name Checking for Hausalang
+
+Finds the variables and functions a program uses where no definition of
+them can be in scope, before the program runs. At run time these are the
+UNDEFINED_VARIABLE and UNDEFINED_FUNCTION errors, which may only show up
+after a long computation; the checker reports all of them at once, each
+with its location.
+
+Scoping is dynamic: a function body sees its own names and then those of
+whichever scope called it. The checker therefore works out, for every
+function, the names that may be visible at any of its call sites, and
+checks the body against those. Within a body the analysis follows the
+order of the statements:
+
+- a name counts as defined if any path may have defined it: a name
+  assigned in one branch of an `idan`, or later in a loop body (for the
+  next iteration), is not reported
+- both branches of every `idan` and every loop body are checked, whatever
+  the conditions turn out to be
+- code that can never run is not checked: statements after a `mayar` in
+  the same block, and functions that are never called
+
+Every reported name is an error whenever the code around it runs, so the
+checker has no false positives; a name used before a definition that only
+some paths make may still fail at run time.
+
+The analysis is one pass over the program plus one pass over each called
+function per change in the names visible to it.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import parser
+from .errors import (
+    ContextualError,
+    ErrorKind,
+    KvFrame,
+    SourceLocation,
+    WithValueFrame,
+)
+
+# The variables and the functions that may be visible at a point, or None
+# where the code cannot run
+Names = Tuple[Set[str], Set[str]]
+
+
+class UndefinedNamesError(ContextualError, NameError):
+    """Undefined names found by the checker before a program runs.
+
+    The error itself describes the first of them; each of the others is
+    added as a KvFrame ("line:column", message).
+
+    Attributes:
+        errors: One ContextualError per undefined name use, in source
+            order.
+    """
+
+    def __init__(self, errors: List[ContextualError]):
+        """Initialize from the errors returned by find_undefined_names.
+
+        Args:
+            errors: The undefined name errors (at least one).
+        """
+        first = errors[0]
+        message = first.message
+        if len(errors) > 1:
+            message += f" (and {len(errors) - 1} more)"
+        super().__init__(
+            kind=first.kind,
+            message=message,
+            location=first.location,
+            context_frames=[
+                KvFrame(
+                    key=f"{error.location.line}:{error.location.column}",
+                    value=error.message,
+                )
+                for error in errors[1:]
+            ],
+            tags={"static"},
+            help=first.help,
+        )
+        self.errors = errors
+
+
+def _bindings(statements: List[parser.Statement]) -> Names:
+    """Return the variables and functions a block can define.
+
+    Nested blocks are included; the bodies of nested function definitions
+    are not, since they run in a scope of their own.
+    """
+    variables: Set[str] = set()
+    functions: Set[str] = set()
+    pending = list(statements)
+    while pending:
+        stmt = pending.pop()
+        if isinstance(stmt, parser.Assignment):
+            variables.add(stmt.name)
+        elif isinstance(stmt, parser.For):
+            variables.add(stmt.var)
+            pending.extend(stmt.body)
+        elif isinstance(stmt, parser.While):
+            pending.extend(stmt.body)
+        elif isinstance(stmt, parser.If):
+            pending.extend(stmt.then_body)
+            pending.extend(stmt.else_body or [])
+        elif isinstance(stmt, parser.Function):
+            functions.add(stmt.name)
+    return variables, functions
+
+
+def _copy(names: Optional[Names]) -> Optional[Names]:
+    """Return a copy of `names` that can be changed independently."""
+    if names is None:
+        return None
+    return set(names[0]), set(names[1])
+
+
+def _merge(first: Optional[Names], second: Optional[Names]) -> Optional[Names]:
+    """Combine the names of two paths that meet."""
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return first[0] | second[0], first[1] | second[1]
+
+
+class _NameChecker:
+    """Works out what each function can see, then checks every name use."""
+
+    def __init__(self, program: parser.Program) -> None:
+        self.program = program
+        # Every definition of each function name, nested ones included
+        self.definitions: Dict[str, List[parser.Function]] = {}
+        # Names that may be visible at some call of each called function
+        self.entries: Dict[str, Names] = {}
+        self.pending: List[str] = []
+        # Only collected on the final pass, once the entries are complete
+        self.errors: Optional[List[ContextualError]] = None
+
+        statements = list(program.statements)
+        while statements:
+            stmt = statements.pop()
+            if isinstance(stmt, parser.Function):
+                self.definitions.setdefault(stmt.name, []).append(stmt)
+                statements.extend(stmt.body)
+            elif isinstance(stmt, (parser.While, parser.For)):
+                statements.extend(stmt.body)
+            elif isinstance(stmt, parser.If):
+                statements.extend(stmt.then_body)
+                statements.extend(stmt.else_body or [])
+
+    def check(self, known: Names) -> List[ContextualError]:
+        """Return the undefined name errors, given the names defined up front."""
+        self.block(self.program.statements, _copy(known))
+        while self.pending:
+            name = self.pending.pop()
+            for func in self.definitions.get(name, []):
+                self.function(func)
+
+        self.errors = []
+        self.block(self.program.statements, _copy(known))
+        for name in self.entries:
+            for func in self.definitions.get(name, []):
+                self.function(func)
+        return sorted(
+            self.errors, key=lambda error: (error.location.line, error.location.column)
+        )
+
+    def function(self, func: parser.Function) -> None:
+        """Check a function body against the names its callers may pass on."""
+        variables, functions = self.entries[func.name]
+        self.block(func.body, (variables | set(func.parameters), set(functions)))
+
+    def block(
+        self, statements: List[parser.Statement], names: Optional[Names]
+    ) -> Optional[Names]:
+        """Check a block, returning the names that may be defined after it."""
+        for stmt in statements:
+            if names is None:
+                break
+            names = self.statement(stmt, names)
+        return names
+
+    def statement(self, stmt: parser.Statement, names: Names) -> Optional[Names]:
+        """Check a statement, returning the names that may be defined after it.
+
+        Updates `names` in place where it can.
+        """
+        if isinstance(stmt, parser.Assignment):
+            self.expression(stmt.value, names)
+            names[0].add(stmt.name)
+
+        elif isinstance(stmt, (parser.Print, parser.ExpressionStatement)):
+            self.expression(stmt.expression, names)
+
+        elif isinstance(stmt, parser.Return):
+            self.expression(stmt.expression, names)
+            return None
+
+        elif isinstance(stmt, parser.If):
+            self.expression(stmt.condition, names)
+            then_names = self.block(stmt.then_body, _copy(names))
+            else_names = self.block(stmt.else_body or [], names)
+            return _merge(then_names, else_names)
+
+        elif isinstance(stmt, (parser.While, parser.For)):
+            if isinstance(stmt, parser.For):
+                for bound in (stmt.start, stmt.end, stmt.step):
+                    if bound is not None:
+                        self.expression(bound, names)
+                names[0].add(stmt.var)
+            else:
+                # The first test runs before the body has defined anything
+                self.expression(stmt.condition, names)
+            # Each iteration may see what earlier ones defined
+            variables, functions = _bindings(stmt.body)
+            names[0].update(variables)
+            names[1].update(functions)
+            self.block(stmt.body, _copy(names))
+            if isinstance(stmt, parser.While):
+                # Later tests may call functions with the body's names
+                # visible; their uses were reported by the first test
+                errors, self.errors = self.errors, None
+                self.expression(stmt.condition, names)
+                self.errors = errors
+
+        elif isinstance(stmt, parser.Function):
+            names[1].add(stmt.name)
+
+        return names
+
+    def expression(self, expr: parser.Expression, names: Names) -> None:
+        """Check every name an expression uses."""
+        variables, functions = names
+        pending = [expr]
+        while pending:
+            expr = pending.pop()
+            if isinstance(expr, parser.Identifier):
+                if expr.name not in variables:
+                    self.report(ErrorKind.UNDEFINED_VARIABLE, expr.name, expr)
+            elif isinstance(expr, parser.BinaryOp):
+                pending.append(expr.right)
+                pending.append(expr.left)
+            elif isinstance(expr, parser.UnaryOp):
+                pending.append(expr.operand)
+            elif isinstance(expr, parser.FunctionCall):
+                pending.extend(reversed(expr.arguments))
+                if expr.name in functions:
+                    self.call(expr.name, names)
+                else:
+                    self.report(ErrorKind.UNDEFINED_FUNCTION, expr.name, expr)
+
+    def call(self, name: str, names: Names) -> None:
+        """Record that function `name` may be called where `names` are visible."""
+        entry = self.entries.get(name)
+        if entry is None:
+            self.entries[name] = _copy(names)
+        elif names[0] <= entry[0] and names[1] <= entry[1]:
+            return
+        else:
+            entry[0].update(names[0])
+            entry[1].update(names[1])
+        if name not in self.pending:
+            self.pending.append(name)
+
+    def report(self, kind: ErrorKind, name: str, node: parser.ASTNode) -> None:
+        """Record an undefined name use (on the final pass only)."""
+        if self.errors is None:
+            return
+        if kind == ErrorKind.UNDEFINED_VARIABLE:
+            message = f"Undefined variable: {name}"
+            help_text = "Assign a value before using the variable"
+        else:
+            message = f"Undefined function: {name}"
+            help_text = "Define the function with 'aiki' before calling it"
+        self.errors.append(
+            ContextualError(
+                kind=kind,
+                message=message,
+                location=SourceLocation("<input>", node.line, node.column),
+                context_frames=[WithValueFrame(label="name", value=name)],
+                tags={"static"},
+                help=help_text,
+            )
+        )
+
+
+def find_undefined_names(
+    program: parser.Program,
+    variables: Iterable[str] = (),
+    functions: Iterable[str] = (),
+) -> List[ContextualError]:
+    """Find the names a program uses where they cannot be defined.
+
+    Args:
+        program: The program to check.
+        variables: Variables already defined in the global scope (for
+            example by earlier input to the same interpreter).
+        functions: Functions already defined in the global scope.
+
+    Returns:
+        One UNDEFINED_VARIABLE or UNDEFINED_FUNCTION error per use, in
+        source order; empty if every name can be defined where it is used.
+    """
+    return _NameChecker(program).check((set(variables), set(functions)))
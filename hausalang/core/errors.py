@@ -94,6 +94,7 @@ class ErrorKind(Enum):
     # L3f: EXECUTION ERRORS (Control Flow)
     INFINITE_LOOP = "runtime/execution/infinite_loop"
     STACK_OVERFLOW = "runtime/execution/stack_overflow"
+    OUTPUT_LIMIT_EXCEEDED = "runtime/execution/output_limit_exceeded"
     UNKNOWN_OPERATOR = "runtime/execution/unknown_operator"
     UNKNOWN_STATEMENT_TYPE = "runtime/execution/unknown_statement_type"
 
@@ -0,0 +1,326 @@
+"""
+Hot Loop Compiler for Hausalang
+
+This module implements a small second execution tier for long-running
+numeric `kadai` loops. When the tree-walking interpreter has run a loop for
+a while, it asks this module to translate the loop into Python source code
+specialised for the types its variables currently have, and runs the
+compiled function instead of walking the AST.
+
+Key Design:
+- Only loops that are easy to prove type-stable are compiled: every name
+  the loop reads or writes must already be a local int or float variable,
+  and the body may only contain assignments, `rubuta`, `idan` and nested
+  `kadai` loops over numeric expressions (no calls, no `don`, no `mayar`)
+- With those restrictions the type of every expression follows from the
+  entry types, so a loop that would change a variable's type is simply not
+  compiled
+- Each compiled loop guards its entry: if a variable is missing or has a
+  different type than at compile time, the interpreter deoptimises and
+  keeps using the generic path for that run
+- Variables live in Python locals while the loop runs and are written back
+  to the environment when it stops, normally or with an error
+- When the interpreter has a step budget, every back-edge uses up one step
+  just like on the generic path; the compiled loop returns the steps left,
+  or a negative number if it stopped because the budget ran out. Loops
+  compiled without a budget do no counting at all
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+from . import parser
+from .optimizer import Let
+from .superinstructions import CompareConst, CompareNames, Increment, ModuloTest
+
+# Iterations a `kadai` loop runs on the generic path before it is compiled
+HOT_LOOP_THRESHOLD = 1000
+
+_ARITHMETIC = ("+", "-", "*", "/", "%")
+_COMPARISON = ("==", "!=", ">", "<", ">=", "<=")
+
+LoopFunction = Callable[
+    [Dict[str, Any], Callable[[str], None], Optional[int]], Optional[int]
+]
+
+
+class HotLoop:
+    """A `kadai` loop compiled for fixed variable types.
+
+    Attributes:
+        node: The While statement (keeps its id from being reused).
+        types: The type each variable must have on entry.
+        run: The compiled loop; call it with the environment's variable
+            dict, the output sink's `write` method and the steps left
+            (ignored unless `counted`). None if the loop cannot be compiled.
+        counted: Whether `run` counts steps.
+        source: The generated Python source, for debugging.
+    """
+
+    __slots__ = ("node", "types", "run", "counted", "source")
+
+    def __init__(
+        self,
+        node: parser.While,
+        types: Dict[str, type],
+        run: Optional[LoopFunction],
+        counted: bool = False,
+        source: str = "",
+    ):
+        self.node = node
+        self.types = types
+        self.run = run
+        self.counted = counted
+        self.source = source
+
+    def guard(self, variables: Dict[str, Any]) -> bool:
+        """Check that `variables` has the types the loop was compiled for."""
+        for name, expected in self.types.items():
+            if type(variables.get(name)) is not expected:
+                return False
+        return True
+
+
+def compile_loop(
+    stmt: parser.While, variables: Dict[str, Any], counted: bool = False
+) -> HotLoop:
+    """Compile a `kadai` loop for the current types of its variables.
+
+    Args:
+        stmt: The While statement.
+        variables: The variables of the environment the loop runs in.
+        counted: Whether the compiled loop uses up a step per back-edge.
+
+    Returns:
+        A HotLoop. Its `run` is None if the loop uses something this
+        compiler does not support, if a variable is not a local int or
+        float, or if the generated code is beyond what CPython can compile.
+    """
+    names: List[str] = []
+    _collect_names(stmt, names)
+    # Temporaries bound inside the loop are Python locals, not variables
+    bound = _let_temporaries(stmt)
+    names = [name for name in names if name not in bound]
+
+    types: Dict[str, type] = {}
+    for name in names:
+        value_type = type(variables.get(name))
+        if value_type not in (int, float):
+            return HotLoop(stmt, types, None, counted)
+        types[name] = value_type
+
+    generator = _LoopCodeGenerator(types, counted)
+    try:
+        lines = generator.statement(stmt, 2)
+    except (_Unsupported, RecursionError):
+        return HotLoop(stmt, types, None, counted)
+
+    slots = generator.slots
+    source = ["def hot_loop(variables, write, steps):"]
+    source += [f"    {slots[name]} = variables[{name!r}]" for name in names]
+    source.append("    try:")
+    source += lines
+    source.append("    finally:")
+    source += [f"        variables[{name!r}] = {slots[name]}" for name in names]
+    source.append("    return steps")
+    source = "\n".join(source) + "\n"
+
+    # Literals are emitted with repr(), which spells the non-finite floats
+    # as the names inf and nan
+    namespace: Dict[str, Any] = {"inf": math.inf, "nan": math.nan}
+    try:
+        code = compile(source, f"<kadai loop at line {stmt.line}>", "exec")
+        exec(code, namespace)
+    except (SyntaxError, RecursionError, MemoryError):
+        # Valid loops can still exceed CPython's limits, for example on
+        # nested parentheses in a very long expression
+        return HotLoop(stmt, types, None, counted)
+    return HotLoop(stmt, types, namespace["hot_loop"], counted, source)
+
+
+class _Unsupported(Exception):
+    """Raised while generating code for a construct the compiler skips."""
+
+
+def _collect_names(node: Any, names: List[str]) -> None:
+    """Append every variable name used in `node` to `names`, once each."""
+
+    def add(name: str) -> None:
+        if name not in names:
+            names.append(name)
+
+    if isinstance(node, parser.Identifier):
+        add(node.name)
+    elif isinstance(node, (parser.Assignment, Increment, CompareConst)):
+        add(node.name)
+    elif isinstance(node, CompareNames):
+        add(node.left)
+        add(node.right)
+
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            _collect_names(item, names)
+    elif isinstance(node, parser.ASTNode):
+        for value in vars(node).values():
+            if isinstance(value, (list, tuple, parser.ASTNode)):
+                _collect_names(value, names)
+
+
+def _let_temporaries(node: Any) -> List[str]:
+    """Return the temporaries bound by the Let expressions in `node`."""
+    bound: List[str] = []
+    if isinstance(node, Let):
+        bound += [name for name, _ in node.bindings if name is not None]
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            bound += _let_temporaries(item)
+    elif isinstance(node, parser.ASTNode):
+        for value in vars(node).values():
+            if isinstance(value, (list, tuple, parser.ASTNode)):
+                bound += _let_temporaries(value)
+    return bound
+
+
+class _LoopCodeGenerator:
+    """Translates a loop body into Python source with static types.
+
+    Every method raises _Unsupported for anything outside the compiled
+    subset, including an assignment that would change a variable's type.
+    """
+
+    def __init__(self, types: Dict[str, type], counted: bool):
+        self.types = dict(types)
+        self.counted = counted
+        self.slots = {name: f"v{index}" for index, name in enumerate(types)}
+
+    def block(self, statements: List[parser.Statement], depth: int) -> List[str]:
+        lines: List[str] = []
+        for stmt in statements:
+            lines += self.statement(stmt, depth)
+        return lines or ["    " * depth + "pass"]
+
+    def statement(self, stmt: parser.Statement, depth: int) -> List[str]:
+        indent = "    " * depth
+
+        if isinstance(stmt, parser.Assignment):
+            code, value_type = self.expression(stmt.value)
+            self.check_store(stmt.name, value_type)
+            return [f"{indent}{self.slots[stmt.name]} = {code}"]
+
+        elif isinstance(stmt, Increment):
+            value_type = self.arithmetic_type(
+                stmt.operator, self.types[stmt.name], type(stmt.amount)
+            )
+            self.check_store(stmt.name, value_type)
+            slot = self.slots[stmt.name]
+            return [f"{indent}{slot} {stmt.operator}= {stmt.amount!r}"]
+
+        elif isinstance(stmt, parser.Print):
+            if isinstance(stmt.expression, parser.String):
+                return [f"{indent}write({stmt.expression.value!r})"]
+            code, _ = self.expression(stmt.expression)
+            return [f"{indent}write(str({code}))"]
+
+        elif isinstance(stmt, parser.If):
+            condition, _ = self.expression(stmt.condition)
+            lines = [f"{indent}if {condition}:"]
+            lines += self.block(stmt.then_body, depth + 1)
+            if stmt.else_body:
+                lines.append(f"{indent}else:")
+                lines += self.block(stmt.else_body, depth + 1)
+            return lines
+
+        elif isinstance(stmt, parser.While):
+            condition, _ = self.expression(stmt.condition)
+            lines = [f"{indent}while {condition}:"]
+            lines += self.block(stmt.body, depth + 1)
+            if self.counted:
+                lines.append(f"{indent}    steps -= 1")
+                lines.append(f"{indent}    if steps < 0:")
+                lines.append(f"{indent}        return steps")
+            return lines
+
+        raise _Unsupported(type(stmt).__name__)
+
+    def check_store(self, name: str, value_type: type) -> None:
+        if self.types[name] is not value_type:
+            raise _Unsupported(f"{name} would change type")
+
+    def expression(self, expr: parser.Expression):
+        """Return (python_code, static_type) for an expression."""
+        if isinstance(expr, parser.Number):
+            return repr(expr.value), type(expr.value)
+
+        elif isinstance(expr, parser.Identifier):
+            return self.slots[expr.name], self.types[expr.name]
+
+        elif isinstance(expr, parser.BinaryOp):
+            left, left_type = self.expression(expr.left)
+            right, right_type = self.expression(expr.right)
+            return self.binary(expr.operator, left, left_type, right, right_type)
+
+        elif isinstance(expr, parser.UnaryOp):
+            operand, operand_type = self.expression(expr.operand)
+            if expr.operator not in ("-", "+") or operand_type is bool:
+                raise _Unsupported(expr.operator)
+            return f"({expr.operator}{operand})", operand_type
+
+        elif isinstance(expr, CompareConst):
+            return self.binary(
+                expr.operator,
+                self.slots[expr.name],
+                self.types[expr.name],
+                repr(expr.value),
+                type(expr.value),
+            )
+
+        elif isinstance(expr, CompareNames):
+            return self.binary(
+                expr.operator,
+                self.slots[expr.left],
+                self.types[expr.left],
+                self.slots[expr.right],
+                self.types[expr.right],
+            )
+
+        elif isinstance(expr, Let):
+            # Named bindings become assignment expressions to Python locals;
+            # unnamed ones are plain names, which the entry guard checks
+            parts = []
+            for name, value in expr.bindings:
+                if name is not None:
+                    code, value_type = self.expression(value)
+                    self.slots[name] = f"t{len(self.slots)}"
+                    self.types[name] = value_type
+                    parts.append(f"({self.slots[name]} := {code})")
+            body, body_type = self.expression(expr.body)
+            if not parts:
+                return body, body_type
+            return f"({', '.join(parts)}, {body})[-1]", body_type
+
+        elif isinstance(expr, ModuloTest):
+            dividend, dividend_type = self.expression(expr.dividend)
+            divisor, divisor_type = self.expression(expr.divisor)
+            remainder = self.binary("%", dividend, dividend_type, divisor, divisor_type)
+            return self.binary(
+                expr.operator, *remainder, repr(expr.value), type(expr.value)
+            )
+
+        raise _Unsupported(type(expr).__name__)
+
+    def binary(self, op: str, left: str, left_type: type, right: str, right_type: type):
+        if left_type is bool or right_type is bool:
+            raise _Unsupported("bool operand")
+        if op in _COMPARISON:
+            return f"({left} {op} {right})", bool
+        value_type = self.arithmetic_type(op, left_type, right_type)
+        if op == "/" and value_type is int:
+            op = "//"
+        return f"({left} {op} {right})", value_type
+
+    def arithmetic_type(self, op: str, left_type: type, right_type: type) -> type:
+        if op not in _ARITHMETIC:
+            raise _Unsupported(op)
+        if left_type is int and right_type is int:
+            return int
+        return float
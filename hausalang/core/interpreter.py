@@ -10,27 +10,207 @@ Key Design:
 - No raw token or line-based execution; pure AST-driven
 """
 
-from typing import Any, Dict, Optional
+import operator
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 from . import parser
 from .lexer import tokenize_program
+from .callgraph import is_leaf_function
+from .checker import UndefinedNamesError, find_undefined_names
 from .errors import (
     ContextualError,
     ErrorKind,
     SourceLocation,
 )
+from .hot_loops import HOT_LOOP_THRESHOLD, HotLoop, compile_loop
+from .memoize import DEFAULT_MEMO_SIZE, FunctionMemo, MemoStats, PurityAnalyzer
+from .optimizer import (
+    HoistedLoop,
+    Let,
+    OptimizerOptions,
+    OptimizerStats,
+    optimize,
+)
+from .type_inference import TypedBinaryOp
+from .output import OutputLimitError, OutputSink, StreamOutput
+from .superinstructions import (
+    COMPARISON_OPERATORS,
+    CompareConst,
+    CompareNames,
+    FusedCondition,
+    Increment,
+    ModuloTest,
+    fuse_program,
+)
+
 
+# Bumped every time any Environment defines a function. Call-site caches
+# record the version they were filled at and are ignored once it moves on.
+_function_version = 0
 
-class ReturnValue(Exception):
-    """Exception used to implement return statements.
 
-    When a return statement is executed, we raise this exception to unwind
-    the call stack back to the function call site.
+class ReturnValue:
+    """Completion record used to implement return statements.
+
+    Statement executors return None when they complete normally. A `mayar`
+    statement instead produces a ReturnValue, which each enclosing executor
+    (block, if, loop) hands straight back to its caller until it reaches the
+    function call site. This avoids building and unwinding a Python exception
+    for every return, which dominated the cost of recursive programs.
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, value: Any):
         self.value = value
-        super().__init__()
+
+
+class StepLimitError(RuntimeError):
+    """Raised when a program uses up its step budget (`max_steps`)."""
+
+
+class TailCall(ReturnValue):
+    """Completion produced by `mayar f(...)` inside `f` itself.
+
+    Instead of calling `f` again, the running call of `f` rebinds its
+    parameters to `arguments` and re-executes its body in the same
+    Environment. Under Hausalang's dynamic scoping this is indistinguishable
+    from a real call, but runs in constant stack.
+    """
+
+    __slots__ = ("arguments",)
+
+    def __init__(self, arguments: List[Any]):
+        super().__init__(None)
+        self.arguments = arguments
+
+
+class CallSite:
+    """Inline cache for a single FunctionCall node.
+
+    Remembers which Function the call resolved to, its arity and whether it
+    runs on a LeafFrame, so that a hot call can skip walking the environment
+    chain. The entry is valid only while `version` equals the global
+    function version.
+    """
+
+    __slots__ = ("node", "version", "function", "arity", "leaf")
+
+    def __init__(
+        self, node: parser.FunctionCall, function: parser.Function, leaf: bool
+    ):
+        self.node = node  # keeps id(node) from being reused while cached
+        self.version = _function_version
+        self.function = function
+        self.arity = len(function.parameters)
+        self.leaf = leaf
+
+
+# Operator implementations used once a BinaryOp site has seen numeric
+# operands. Integer "/" is floor division, matching apply_binary_op.
+_INT_OPERATIONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.floordiv,
+    "%": operator.mod,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+_FLOAT_OPERATIONS = dict(_INT_OPERATIONS, **{"/": operator.truediv})
+_COMPARISONS = {op: _INT_OPERATIONS[op] for op in ("==", "!=", ">", "<", ">=", "<=")}
+
+
+# Types whose Python truth value already matches Hausalang's (see
+# is_truthy), so a condition of one of these types can be tested directly.
+# bool comes first: it is what comparisons produce.
+_NATIVE_TRUTH_TYPES = frozenset((bool, int, float, str, type(None)))
+
+
+def is_comparison(expr: parser.Expression) -> bool:
+    """Return True if `expr` is statically a comparison (its value is a bool)."""
+    return isinstance(expr, FusedCondition) or (
+        isinstance(expr, parser.BinaryOp) and expr.operator in COMPARISON_OPERATORS
+    )
+
+
+class BinarySite:
+    """Type-specialised handler for a single BinaryOp node.
+
+    Created the first time the node sees two numeric operands, with a
+    handler for exactly those operand types. While later operands have the
+    same types the handler is called directly; the first mismatch clears the
+    recorded types and the node stays on the generic path for good.
+    """
+
+    __slots__ = ("node", "left_type", "right_type", "handler")
+
+    def __init__(
+        self,
+        node: parser.BinaryOp,
+        left_type: type,
+        right_type: type,
+        handler: Callable[[Any, Any], Any],
+    ):
+        self.node = node  # keeps id(node) from being reused while cached
+        self.left_type = left_type
+        self.right_type = right_type
+        self.handler = handler
+
+
+def find_tail_calls(func: parser.Function) -> List[parser.Return]:
+    """Find the self tail calls in a function body.
+
+    A self tail call is a `mayar` whose expression is a call to the function
+    itself with the right number of arguments. Nested blocks (if/else and
+    loop bodies) are searched; nested function definitions are not.
+
+    Args:
+        func: The Function definition to scan.
+
+    Returns:
+        The Return statements that are self tail calls.
+    """
+    found: List[parser.Return] = []
+    pending = list(func.body)
+    while pending:
+        stmt = pending.pop()
+        if isinstance(stmt, parser.Return):
+            call = stmt.expression
+            if (
+                isinstance(call, parser.FunctionCall)
+                and call.name == func.name
+                and len(call.arguments) == len(func.parameters)
+            ):
+                found.append(stmt)
+        elif isinstance(stmt, parser.If):
+            pending.extend(stmt.then_body)
+            pending.extend(stmt.else_body or [])
+        elif isinstance(stmt, (parser.While, parser.For)):
+            pending.extend(stmt.body)
+    return found
+
+
+class Snapshot:
+    """The variables and functions of an Environment at one point in time.
+
+    A snapshot shares its dicts with the environment it was taken from;
+    the environment copies them before its next change (copy-on-write), so
+    taking a snapshot is O(1) and a snapshot never changes.
+    """
+
+    __slots__ = ("variables", "functions")
+
+    def __init__(
+        self, variables: Dict[str, Any], functions: Dict[str, parser.Function]
+    ):
+        self.variables = variables
+        self.functions = functions
 
 
 class Environment:
@@ -39,8 +219,26 @@ class Environment:
     An environment maps variable names to values and function names to
     function definitions (AST nodes). When entering a new scope (function call),
     we create a new Environment with a parent reference.
+
+    Lookups walk the parent chain iteratively. A name found more than one
+    scope up is remembered in this environment's owner cache, and a lookup
+    that reaches a scope with a cached owner stops there, so reading a
+    global from deep recursion costs a couple of dict lookups instead of a
+    walk over every frame.
+
+    The caches need no explicit invalidation. Every scope above a running
+    environment is suspended in a call, so none of them can define a name
+    while it runs, and names are never removed. A definition in this
+    environment (or in a scope further down) shadows the cached owner
+    because each scope's own dict is checked before its cache.
     """
 
+    # True while `variables` and `functions` are shared with a Snapshot
+    _shared = False
+    # Scope each name found two or more levels up resolved to (lazy)
+    _variable_owners: Optional[Dict[str, "Environment"]] = None
+    _function_owners: Optional[Dict[str, "Environment"]] = None
+
     def __init__(self, parent: Optional["Environment"] = None):
         """Initialize an environment.
 
@@ -53,35 +251,142 @@ class Environment:
 
     def define_variable(self, name: str, value: Any) -> None:
         """Define a variable in this environment."""
+        if self._shared:
+            self.unshare()
         self.variables[name] = value
 
     def get_variable(self, name: str) -> Any:
         """Get a variable, searching parent scopes if necessary."""
-        if name in self.variables:
-            return self.variables[name]
-        if self.parent:
-            return self.parent.get_variable(name)
-        raise NameError(f"Undefined variable: {name}")
+        variables = self.variables
+        if name in variables:
+            return variables[name]
+        owners = self._variable_owners
+        if owners is not None and name in owners:
+            return owners[name].variables[name]
+        owner = self._variable_owner(name)
+        if owner is None:
+            raise NameError(f"Undefined variable: {name}")
+        return owner.variables[name]
+
+    def _variable_owner(self, name: str) -> Optional["Environment"]:
+        """Find the parent scope that defines variable `name`, or None."""
+        env = self.parent
+        while env is not None:
+            if name in env.variables:
+                break
+            owners = env._variable_owners
+            if owners is not None and name in owners:
+                env = owners[name]
+                break
+            env = env.parent
+        else:
+            return None
+        if env is not self.parent:
+            if self._variable_owners is None:
+                self._variable_owners = {}
+            self._variable_owners[name] = env
+        return env
 
     def define_function(self, name: str, func: parser.Function) -> None:
         """Define a function in this environment."""
+        global _function_version
+        _function_version += 1
+        if self._shared:
+            self.unshare()
         self.functions[name] = func
 
     def get_function(self, name: str) -> parser.Function:
         """Get a function, searching parent scopes if necessary."""
-        if name in self.functions:
-            return self.functions[name]
-        if self.parent:
-            return self.parent.get_function(name)
-        raise NameError(f"Undefined function: {name}")
+        func = self.lookup_function(name)
+        if func is None:
+            raise NameError(f"Undefined function: {name}")
+        return func
 
     def function_exists(self, name: str) -> bool:
         """Check if a function is defined."""
-        if name in self.functions:
-            return True
-        if self.parent:
-            return self.parent.function_exists(name)
-        return False
+        return self.lookup_function(name) is not None
+
+    def lookup_function(self, name: str) -> Optional[parser.Function]:
+        """Return the function `name` visible from here, or None."""
+        func = self.functions.get(name)
+        if func is not None:
+            return func
+        owners = self._function_owners
+        if owners is not None and name in owners:
+            return owners[name].functions[name]
+        env = self.parent
+        while env is not None:
+            if name in env.functions:
+                break
+            owners = env._function_owners
+            if owners is not None and name in owners:
+                env = owners[name]
+                break
+            env = env.parent
+        else:
+            return None
+        if env is not self.parent:
+            if self._function_owners is None:
+                self._function_owners = {}
+            self._function_owners[name] = env
+        return env.functions[name]
+
+    def snapshot(self) -> Snapshot:
+        """Capture this environment's variables and functions in O(1).
+
+        Parent environments are not included.
+        """
+        self._shared = True
+        return Snapshot(self.variables, self.functions)
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Return this environment to the state captured in `snapshot`.
+
+        The snapshot stays valid and can be restored again later.
+        """
+        global _function_version
+        _function_version += 1
+        self.variables = snapshot.variables
+        self.functions = snapshot.functions
+        self._shared = True
+
+    def writable_variables(self) -> Dict[str, Any]:
+        """Return `variables`, ready to be written to directly."""
+        if self._shared:
+            self.unshare()
+        return self.variables
+
+    def unshare(self) -> None:
+        """Take private copies of the dicts shared with a Snapshot."""
+        self.variables = dict(self.variables)
+        self.functions = dict(self.functions)
+        self._shared = False
+
+
+# The `functions` of every LeafFrame: leaf functions define none
+_NO_FUNCTIONS: Mapping[str, parser.Function] = MappingProxyType({})
+
+
+class LeafFrame(Environment):
+    """A reusable environment for a call to a leaf function.
+
+    A leaf function makes no calls and defines no functions (see
+    callgraph.is_leaf_function), so no scope is ever created below its
+    environment and nothing refers to it once the call returns. Finished
+    frames go back on the interpreter's free list and the next leaf call
+    reuses one, instead of building an Environment with two new dicts.
+    """
+
+    def __init__(self) -> None:
+        self.parent: Optional[Environment] = None
+        self.variables: Dict[str, Any] = {}
+        self.functions = _NO_FUNCTIONS  # type: ignore[assignment]
+
+    def reset(self) -> None:
+        """Forget the finished call, ready for the next one."""
+        self.parent = None
+        self.variables.clear()
+        self._variable_owners = None
 
 
 class Interpreter:
@@ -90,9 +395,63 @@ class Interpreter:
     Walks the AST and executes each node by dispatching to specialized methods.
     """
 
-    def __init__(self):
-        """Initialize the interpreter with a global environment."""
+    # Iterations after which a `kadai` loop is compiled (None: never)
+    hot_loop_threshold: Optional[int] = HOT_LOOP_THRESHOLD
+
+    def __init__(
+        self,
+        output: Optional[OutputSink] = None,
+        superinstructions: bool = True,
+        max_steps: Optional[int] = None,
+        memoize: bool = False,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+    ):
+        """Initialize the interpreter with a global environment.
+
+        Args:
+            output: Where `rubuta` output goes. Defaults to writing through
+                to the current sys.stdout.
+            superinstructions: Whether `interpret` fuses common statement
+                shapes into single nodes first (see superinstructions.py).
+            max_steps: Step budget for each `interpret` run, or None for no
+                limit. A step is one loop iteration or one function call;
+                running out raises StepLimitError.
+            memoize: Whether calls to pure functions are cached (see
+                memoize.py). Off by default, so naive recursion keeps its
+                real cost.
+            memo_size: Maximum number of cached results per function.
+        """
         self.global_env = Environment()
+        self.output = output if output is not None else StreamOutput()
+        self.superinstructions = superinstructions
+        self.max_steps = max_steps
+        # Steps left in the current run (None: unlimited)
+        self.steps_left: Optional[int] = None
+        self.memoize = memoize
+        self.memo_size = memo_size
+        # Result caches, by Function node id, valid for `_memo_version`
+        self._memos: Dict[int, FunctionMemo] = {}
+        self._memo_version = _function_version
+        self._purity = PurityAnalyzer(self.global_env.functions.get)
+        # Set once a function is defined inside another function. Such a
+        # definition can change what names mean to the functions it calls,
+        # so memoization is switched off for good.
+        self._nested_functions = False
+        # Return statements known to be self tail calls, by node id, mapped
+        # to the function they belong to (see `find_tail_calls`)
+        self._tail_calls: Dict[int, parser.Function] = {}
+        # Inline caches for call sites, by FunctionCall node id
+        self._call_sites: Dict[int, CallSite] = {}
+        # Functions whose calls run on a LeafFrame, by node id, and the
+        # finished frames ready for reuse
+        self._leaf_functions: Dict[int, parser.Function] = {}
+        self._free_frames: List[LeafFrame] = []
+        # Type-specialised operator handlers, by BinaryOp node id
+        self._binary_sites: Dict[int, BinarySite] = {}
+        # Compiled `kadai` loops, and iterations left before a loop is
+        # compiled, by While node id
+        self._hot_loops: Dict[int, HotLoop] = {}
+        self._loop_countdowns: Dict[int, Optional[int]] = {}
 
     # ========================================================================
     # Program Execution
@@ -104,7 +463,13 @@ class Interpreter:
         Args:
             program: The Program node from the parser.
         """
-        self.execute_program(program, self.global_env)
+        if self.superinstructions:
+            program = fuse_program(program)
+        self.steps_left = self.max_steps
+        try:
+            self.execute_program(program, self.global_env)
+        finally:
+            self.output.flush()
 
     def execute_program(self, program: parser.Program, env: Environment) -> None:
         """Execute all statements in a program.
@@ -114,13 +479,54 @@ class Interpreter:
             env: The environment for execution.
         """
         for statement in program.statements:
-            self.execute_statement(statement, env)
+            if self.execute_statement(statement, env) is not None:
+                raise RuntimeError("'mayar' can only be used inside a function")
+
+    def execute_block(
+        self, statements: List[parser.Statement], env: Environment
+    ) -> Optional[ReturnValue]:
+        """Execute a list of statements in order.
+
+        Args:
+            statements: The statements to execute.
+            env: The environment for execution.
+
+        Returns:
+            The ReturnValue of the first `mayar` executed, or None if the
+            block ran to completion.
+        """
+        for stmt in statements:
+            completion = self.execute_statement(stmt, env)
+            if completion is not None:
+                return completion
+        return None
+
+    def snapshot(self) -> Snapshot:
+        """Checkpoint the global variables and functions (O(1)).
+
+        Returns:
+            A Snapshot to pass to `restore`.
+        """
+        return self.global_env.snapshot()
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Roll the global variables and functions back to a snapshot.
+
+        The same snapshot can be restored any number of times, e.g. to run
+        many inputs against a program whose setup code ran only once.
+
+        Args:
+            snapshot: A Snapshot from this interpreter's `snapshot`.
+        """
+        self.global_env.restore(snapshot)
 
     # ========================================================================
     # Statement Execution
     # ========================================================================
 
-    def execute_statement(self, stmt: parser.Statement, env: Environment) -> None:
+    def execute_statement(
+        self, stmt: parser.Statement, env: Environment
+    ) -> Optional[ReturnValue]:
         """Execute a statement.
 
         Dispatches to the appropriate handler based on statement type.
@@ -128,24 +534,30 @@ class Interpreter:
         Args:
             stmt: The statement to execute.
             env: The environment for execution.
+
+        Returns:
+            A ReturnValue if a `mayar` statement was executed, otherwise None.
         """
         if isinstance(stmt, parser.Assignment):
             self.execute_assignment(stmt, env)
 
+        elif isinstance(stmt, Increment):
+            self.execute_increment(stmt, env)
+
         elif isinstance(stmt, parser.Print):
             self.execute_print(stmt, env)
 
         elif isinstance(stmt, parser.Return):
-            self.execute_return(stmt, env)
+            return self.execute_return(stmt, env)
 
         elif isinstance(stmt, parser.If):
-            self.execute_if(stmt, env)
+            return self.execute_if(stmt, env)
 
         elif isinstance(stmt, parser.While):
-            self.execute_while(stmt, env)
+            return self.execute_while(stmt, env)
 
         elif isinstance(stmt, parser.For):
-            self.execute_for(stmt, env)
+            return self.execute_for(stmt, env)
 
         elif isinstance(stmt, parser.Function):
             self.execute_function_def(stmt, env)
@@ -155,9 +567,14 @@ class Interpreter:
             # side effects but their return value is discarded
             self.eval_expression(stmt.expression, env)
 
+        elif isinstance(stmt, HoistedLoop):
+            return self.execute_hoisted_loop(stmt, env)
+
         else:
             raise RuntimeError(f"Unknown statement type: {type(stmt)}")
 
+        return None
+
     def execute_assignment(self, stmt: parser.Assignment, env: Environment) -> None:
         """Execute an assignment statement.
 
@@ -170,34 +587,57 @@ class Interpreter:
         value = self.eval_expression(stmt.value, env)
         env.define_variable(stmt.name, value)
 
+    def execute_increment(self, stmt: Increment, env: Environment) -> None:
+        """Execute a fused `x = x + c` / `x = x - c` statement.
+
+        Args:
+            stmt: The Increment statement.
+            env: The environment for execution.
+        """
+        value = env.get_variable(stmt.name)
+        if stmt.operator == "+":
+            env.define_variable(stmt.name, value + stmt.amount)
+        else:
+            env.define_variable(stmt.name, value - stmt.amount)
+
     def execute_print(self, stmt: parser.Print, env: Environment) -> None:
         """Execute a print statement.
 
-        Evaluates the expression and prints the result to stdout.
+        Evaluates the expression and writes the result to the output sink.
 
         Args:
             stmt: The Print statement.
             env: The environment for execution.
         """
         value = self.eval_expression(stmt.expression, env)
-        print(value, end="")
+        self.output.write(str(value))
 
-    def execute_return(self, stmt: parser.Return, env: Environment) -> None:
+    def execute_return(self, stmt: parser.Return, env: Environment) -> ReturnValue:
         """Execute a return statement.
 
-        Raises a ReturnValue exception to unwind back to the function call.
+        Produces a ReturnValue completion that enclosing executors propagate
+        back to the function call. A self tail call produces a TailCall
+        instead, which the running call turns into another pass over its body.
 
         Args:
             stmt: The Return statement.
             env: The environment for execution.
 
-        Raises:
+        Returns:
             ReturnValue: Always (this is the mechanism for return).
         """
-        value = self.eval_expression(stmt.expression, env)
-        raise ReturnValue(value)
-
-    def execute_if(self, stmt: parser.If, env: Environment) -> None:
+        target = self._tail_calls.get(id(stmt))
+        if target is None:
+            return ReturnValue(self.eval_expression(stmt.expression, env))
+
+        call = stmt.expression
+        arg_values = [self.eval_expression(arg, env) for arg in call.arguments]
+        if self.resolve_call_site(call, env).function is target:
+            return TailCall(arg_values)
+        # The name is shadowed here, so this is an ordinary call after all
+        return ReturnValue(self.call_function(call, arg_values, env))
+
+    def execute_if(self, stmt: parser.If, env: Environment) -> Optional[ReturnValue]:
         """Execute an if/else statement.
 
         Evaluates the condition, then executes either the then_body or else_body.
@@ -205,34 +645,144 @@ class Interpreter:
         Args:
             stmt: The If statement.
             env: The environment for execution.
+
+        Returns:
+            A ReturnValue if the executed branch returned, otherwise None.
         """
         condition = self.eval_expression(stmt.condition, env)
+        if type(condition) not in _NATIVE_TRUTH_TYPES:
+            condition = self.is_truthy(condition)
 
-        if self.is_truthy(condition):
+        if condition:
             # Execute then-body
-            for then_stmt in stmt.then_body:
-                self.execute_statement(then_stmt, env)
+            return self.execute_block(stmt.then_body, env)
         elif stmt.else_body:
             # Execute else-body (if it exists)
-            for else_stmt in stmt.else_body:
-                self.execute_statement(else_stmt, env)
+            return self.execute_block(stmt.else_body, env)
+        return None
+
+    def execute_hoisted_loop(
+        self, stmt: HoistedLoop, env: Environment
+    ) -> Optional[ReturnValue]:
+        """Execute a loop whose invariant expressions were hoisted.
+
+        Args:
+            stmt: The HoistedLoop statement.
+            env: The environment for execution.
+
+        Returns:
+            The loop's ReturnValue, if a `mayar` ran inside it.
+        """
+        if not self.define_temporaries(stmt, env):
+            return self.execute_statement(stmt.original, env)
+        try:
+            return self.execute_statement(stmt.loop, env)
+        finally:
+            self.drop_temporaries(stmt, env)
+
+    def define_temporaries(self, stmt: HoistedLoop, env: Environment) -> bool:
+        """Evaluate a HoistedLoop's temporaries and define them in `env`.
+
+        Returns:
+            False, with nothing defined, if evaluating any of them raised;
+            the caller then runs the original loop instead.
+        """
+        values = []
+        for _, expr in stmt.temporaries:
+            try:
+                values.append(self.eval_expression(expr, env))
+            except Exception:
+                return False
+        for (name, _), value in zip(stmt.temporaries, values):
+            env.define_variable(name, value)
+        return True
+
+    def drop_temporaries(self, stmt: HoistedLoop, env: Environment) -> None:
+        """Remove a HoistedLoop's temporaries from `env`."""
+        variables = env.writable_variables()
+        for name, _ in stmt.temporaries:
+            variables.pop(name, None)
 
-    def execute_while(self, stmt: parser.While, env: Environment) -> None:
+    def execute_while(
+        self, stmt: parser.While, env: Environment
+    ) -> Optional[ReturnValue]:
         """Execute a while loop.
 
         Re-evaluates the condition before each iteration. Executes the body
-        as long as the condition remains truthy.
+        as long as the condition remains truthy; a comparison condition is
+        tested directly, without `is_truthy`. Once a loop has run
+        `hot_loop_threshold` iterations in total, the rest of each run is
+        handed to its compiled version, if it has one (see hot_loops.py).
 
         Args:
             stmt: The While statement.
             env: The environment for execution.
+
+        Returns:
+            A ReturnValue if the body returned, otherwise None.
         """
-        while self.is_truthy(self.eval_expression(stmt.condition, env)):
+        key = id(stmt)
+        threshold = self.hot_loop_threshold
+        countdown = None
+        if threshold is not None:
+            countdown = self._loop_countdowns.get(key, threshold)
+        completion = None
+        condition = stmt.condition
+        comparison = is_comparison(condition)
+        while True:
+            value = self.eval_expression(condition, env)
+            if not comparison and type(value) not in _NATIVE_TRUTH_TYPES:
+                value = self.is_truthy(value)
+            if not value:
+                break
             # Execute loop body
-            for body_stmt in stmt.body:
-                self.execute_statement(body_stmt, env)
+            completion = self.execute_block(stmt.body, env)
+            if completion is not None:
+                break
+            if self.steps_left is not None:
+                self.count_step()
+            if countdown is not None:
+                countdown -= 1
+                if countdown <= 0:
+                    # Try at most once per run; later runs try again
+                    countdown = None
+                    if self.run_hot_loop(stmt, env):
+                        break
+        if threshold is not None:
+            self._loop_countdowns[key] = 0 if countdown is None else countdown
+        return completion
+
+    def run_hot_loop(self, stmt: parser.While, env: Environment) -> bool:
+        """Run the rest of a `kadai` loop through its compiled version.
+
+        The loop is compiled on first use for the types its variables have
+        now (and recompiled if a step budget is switched on or off). On
+        later runs the compiled version is only used if the types still
+        match; otherwise the caller stays on the generic path.
+
+        Args:
+            stmt: The While statement, between two iterations.
+            env: The environment the loop runs in.
+
+        Returns:
+            True if the compiled loop ran the loop to completion, False if
+            the caller must continue generically.
+        """
+        steps = self.steps_left
+        hot_loop = self._hot_loops.get(id(stmt))
+        if hot_loop is None or hot_loop.counted is not (steps is not None):
+            hot_loop = compile_loop(stmt, env.variables, steps is not None)
+            self._hot_loops[id(stmt)] = hot_loop
+        if hot_loop.run is None or not hot_loop.guard(env.variables):
+            return False
+        remaining = hot_loop.run(env.writable_variables(), self.output.write, steps)
+        if steps is not None:
+            self.steps_left = remaining
+            if remaining < 0:
+                self.raise_step_limit()
+        return True
 
-    def execute_for(self, stmt: parser.For, env: Environment) -> None:
+    def execute_for(self, stmt: parser.For, env: Environment) -> Optional[ReturnValue]:
         """Execute a for loop via AST rewriting to assignment + while loop.
 
         For loops are internally converted to:
@@ -241,12 +791,17 @@ class Interpreter:
                - Condition: var < end (ascending) or var > end (descending)
                - Body: original statements + increment/decrement
 
-        This approach reuses the proven while loop implementation.
+        This approach reuses the proven while loop implementation. When start,
+        end and step are all integers the same iterations are driven by a
+        native range() instead (see `_execute_int_range`).
 
         Args:
             stmt: The For statement.
             env: The environment for execution.
 
+        Returns:
+            A ReturnValue if the body returned, otherwise None.
+
         Raises:
             ValueError: If step is 0 or has invalid type.
             TypeError: If expressions don't evaluate to numbers.
@@ -269,43 +824,122 @@ class Interpreter:
         # Step 2: Initialize loop variable directly
         env.define_variable(stmt.var, start_value)
 
-        # Step 3: Determine direction and create condition + increment
-        if stmt.direction == "ascending":
-            # Validate step is positive for ascending
-            if step_value < 0:
+        # Step 3: Validate step direction (step must be positive either way)
+        if step_value < 0:
+            if stmt.direction == "ascending":
                 raise ValueError(
                     f"For loop: ascending (zuwa) direction requires positive step, "
                     f"got {step_value}"
                 )
+            raise ValueError(
+                f"For loop: descending (ba) direction requires positive step, "
+                f"got {step_value}"
+            )
+
+        # Step 4: Run the loop. All-integer bounds drive a native range();
+        # anything else goes through the general condition + increment loop.
+        if (
+            type(start_value) is int
+            and type(end_value) is int
+            and type(step_value) is int
+        ):
+            return self._execute_int_range(
+                stmt, env, start_value, end_value, step_value
+            )
+        return self._execute_for_loop(stmt, env, end_value, step_value)
 
+    def _execute_for_loop(
+        self, stmt: parser.For, env: Environment, end_value: Any, step_value: Any
+    ) -> Optional[ReturnValue]:
+        """Run a for loop as a while loop over its (already bound) variable.
+
+        Args:
+            stmt: The For statement.
+            env: The environment for execution.
+            end_value: The evaluated end bound.
+            step_value: The evaluated (positive) step.
+
+        Returns:
+            A ReturnValue if the body returned, otherwise None.
+        """
+        if stmt.direction == "ascending":
             # Execute loop: while var < end
-            while self.is_truthy(env.get_variable(stmt.var) < end_value):
+            while env.get_variable(stmt.var) < end_value:
                 # Execute original body
-                for body_stmt in stmt.body:
-                    self.execute_statement(body_stmt, env)
+                completion = self.execute_block(stmt.body, env)
+                if completion is not None:
+                    return completion
+                if self.steps_left is not None:
+                    self.count_step()
 
                 # Increment: var = var + step
                 current = env.get_variable(stmt.var)
                 env.define_variable(stmt.var, current + step_value)
 
         else:  # descending
-            # Validate step is positive for descending (we negate it)
-            if step_value < 0:
-                raise ValueError(
-                    f"For loop: descending (ba) direction requires positive step, "
-                    f"got {step_value}"
-                )
-
             # Execute loop: while var > end
-            while self.is_truthy(env.get_variable(stmt.var) > end_value):
+            while env.get_variable(stmt.var) > end_value:
                 # Execute original body
-                for body_stmt in stmt.body:
-                    self.execute_statement(body_stmt, env)
+                completion = self.execute_block(stmt.body, env)
+                if completion is not None:
+                    return completion
+                if self.steps_left is not None:
+                    self.count_step()
 
                 # Decrement: var = var - step
                 current = env.get_variable(stmt.var)
                 env.define_variable(stmt.var, current - step_value)
 
+        return None
+
+    def _execute_int_range(
+        self, stmt: parser.For, env: Environment, start: int, end: int, step: int
+    ) -> Optional[ReturnValue]:
+        """Run a for loop whose start, end and step are all integers.
+
+        The loop variable is bound once per iteration from a native range()
+        instead of being re-read, compared and incremented through the
+        environment. If the body rebinds the loop variable, the remaining
+        iterations are handed to the general loop, which continues from the
+        rebound value exactly as if the fast path had never been taken.
+
+        Args:
+            stmt: The For statement.
+            env: The environment for execution.
+            start: The integer start value (already bound to the variable).
+            end: The integer end bound.
+            step: The positive integer step.
+
+        Returns:
+            A ReturnValue if the body returned, otherwise None.
+        """
+        name = stmt.var
+        body = stmt.body
+        values = range(start, end, step if stmt.direction == "ascending" else -step)
+
+        for value in values:
+            env.define_variable(name, value)
+            completion = self.execute_block(body, env)
+            if completion is not None:
+                return completion
+            if self.steps_left is not None:
+                self.count_step()
+            if env.variables[name] is not value:
+                # Body reassigned the loop variable: advance from its new
+                # value and let the general loop take over.
+                current = env.variables[name]
+                if stmt.direction == "ascending":
+                    env.define_variable(name, current + step)
+                else:
+                    env.define_variable(name, current - step)
+                return self._execute_for_loop(stmt, env, end, step)
+
+        if values:
+            # Leave the variable where the general loop would: one step past
+            # the last value that satisfied the condition.
+            env.define_variable(name, values[-1] + values.step)
+        return None
+
     def execute_function_def(self, stmt: parser.Function, env: Environment) -> None:
         """Execute a function definition.
 
@@ -316,6 +950,12 @@ class Interpreter:
             env: The environment for execution.
         """
         env.define_function(stmt.name, stmt)
+        for ret in find_tail_calls(stmt):
+            self._tail_calls[id(ret)] = stmt
+        if is_leaf_function(stmt):
+            self._leaf_functions[id(stmt)] = stmt
+        if env is not self.global_env:
+            self._nested_functions = True
 
     # ========================================================================
     # Expression Evaluation
@@ -344,14 +984,22 @@ class Interpreter:
             return env.get_variable(expr.name)
 
         elif isinstance(expr, parser.BinaryOp):
+            if type(expr) is TypedBinaryOp:
+                return self.eval_typed_binary_op(expr, env)
             return self.eval_binary_op(expr, env)
 
+        elif isinstance(expr, FusedCondition):
+            return self.eval_fused_condition(expr, env)
+
         elif isinstance(expr, parser.UnaryOp):
             return self.eval_unary_op(expr, env)
 
         elif isinstance(expr, parser.FunctionCall):
             return self.eval_function_call(expr, env)
 
+        elif isinstance(expr, Let):
+            return self.eval_let(expr, env)
+
         else:
             raise RuntimeError(f"Unknown expression type: {type(expr)}")
 
@@ -365,11 +1013,107 @@ class Interpreter:
         Returns:
             The result of the operation.
         """
-        left = self.eval_expression(expr.left, env)
-        right = self.eval_expression(expr.right, env)
+        # Names and numbers are by far the most common operands; read them
+        # directly instead of going through eval_expression's dispatch.
+        left = expr.left
+        if type(left) is parser.Identifier:
+            left = env.get_variable(left.name)
+        elif type(left) is parser.Number:
+            left = left.value
+        else:
+            left = self.eval_expression(left, env)
+        right = expr.right
+        if type(right) is parser.Identifier:
+            right = env.get_variable(right.name)
+        elif type(right) is parser.Number:
+            right = right.value
+        else:
+            right = self.eval_expression(right, env)
+
+        site = self._binary_sites.get(id(expr))
+        if (
+            site is not None
+            and type(left) is site.left_type
+            and type(right) is site.right_type
+        ):
+            return site.handler(left, right)
+        return self.observe_binary_op(expr, site, left, right)
+
+    def eval_typed_binary_op(self, expr: TypedBinaryOp, env: Environment) -> Any:
+        """Evaluate a binary operation whose operand types are known statically.
 
-        op = expr.operator
+        Args:
+            expr: The TypedBinaryOp expression.
+            env: The environment for execution.
 
+        Returns:
+            The result of the operation.
+        """
+        left = expr.left
+        if type(left) is parser.Identifier:
+            left = env.get_variable(left.name)
+        elif type(left) is parser.Number:
+            left = left.value
+        else:
+            left = self.eval_expression(left, env)
+        right = expr.right
+        if type(right) is parser.Identifier:
+            right = env.get_variable(right.name)
+        elif type(right) is parser.Number:
+            right = right.value
+        else:
+            right = self.eval_expression(right, env)
+        return expr.operation(left, right)
+
+    def observe_binary_op(
+        self, expr: parser.BinaryOp, site: Optional[BinarySite], left: Any, right: Any
+    ) -> Any:
+        """Generic binary operation that also records operand types.
+
+        The first evaluation of a node with two int or float (not bool)
+        operands installs a BinarySite for those types. A later evaluation
+        that misses the site's types deoptimises it permanently.
+
+        Args:
+            expr: The BinaryOp expression.
+            site: The node's current BinarySite, if any.
+            left: The left operand value.
+            right: The right operand value.
+
+        Returns:
+            The result of the operation.
+        """
+        if site is None:
+            left_type = type(left)
+            right_type = type(right)
+            if left_type is int and right_type is int:
+                operations = _INT_OPERATIONS
+            elif left_type in (int, float) and right_type in (int, float):
+                operations = _FLOAT_OPERATIONS
+            else:
+                operations = {}
+            handler = operations.get(expr.operator)
+            if handler is not None:
+                self._binary_sites[id(expr)] = BinarySite(
+                    expr, left_type, right_type, handler
+                )
+        elif site.left_type is not None:
+            # Operand types changed: stay generic from now on
+            site.left_type = site.right_type = None
+
+        return self.apply_binary_op(expr.operator, left, right)
+
+    def apply_binary_op(self, op: str, left: Any, right: Any) -> Any:
+        """Apply a binary operator to two already-evaluated operands.
+
+        Args:
+            op: The operator symbol.
+            left: The left operand value.
+            right: The right operand value.
+
+        Returns:
+            The result of the operation.
+        """
         # Arithmetic operators
         if op == "+":
             return left + right
@@ -403,6 +1147,41 @@ class Interpreter:
         else:
             raise RuntimeError(f"Unknown operator: {op}")
 
+    def eval_fused_condition(self, expr: FusedCondition, env: Environment) -> Any:
+        """Evaluate a fused comparison (CompareConst, CompareNames, ModuloTest).
+
+        Args:
+            expr: The fused condition.
+            env: The environment for execution.
+
+        Returns:
+            The result of the comparison.
+        """
+        if type(expr) is CompareConst:
+            return _COMPARISONS[expr.operator](env.get_variable(expr.name), expr.value)
+
+        elif type(expr) is CompareNames:
+            return _COMPARISONS[expr.operator](
+                env.get_variable(expr.left), env.get_variable(expr.right)
+            )
+
+        elif type(expr) is ModuloTest:
+            dividend = expr.dividend
+            if type(dividend) is parser.Identifier:
+                dividend = env.get_variable(dividend.name)
+            else:
+                dividend = dividend.value
+            divisor = expr.divisor
+            if type(divisor) is parser.Identifier:
+                divisor = env.get_variable(divisor.name)
+            else:
+                divisor = divisor.value
+            if expr.operator == "==":
+                return dividend % divisor == expr.value
+            return dividend % divisor != expr.value
+
+        raise RuntimeError(f"Unknown expression type: {type(expr)}")
+
     def eval_unary_op(self, expr: parser.UnaryOp, env: Environment) -> Any:
         """Evaluate a unary operation.
 
@@ -414,13 +1193,53 @@ class Interpreter:
             The result of the operation.
         """
         operand = self.eval_expression(expr.operand, env)
+        return self.apply_unary_op(expr.operator, operand)
+
+    def apply_unary_op(self, op: str, operand: Any) -> Any:
+        """Apply a unary operator to an already-evaluated operand.
+
+        Args:
+            op: The operator symbol.
+            operand: The operand value.
 
-        if expr.operator == "-":
+        Returns:
+            The result of the operation.
+        """
+        if op == "-":
             return -operand
-        elif expr.operator == "+":
+        elif op == "+":
             return +operand
         else:
-            raise RuntimeError(f"Unknown unary operator: {expr.operator}")
+            raise RuntimeError(f"Unknown unary operator: {op}")
+
+    def eval_let(self, expr: Let, env: Environment) -> Any:
+        """Evaluate an inlined function call (see optimizer.Let).
+
+        Args:
+            expr: The Let expression.
+            env: The environment for execution.
+
+        Returns:
+            The value of the Let's body.
+        """
+        bound = False
+        try:
+            for name, value in expr.bindings:
+                value = self.eval_expression(value, env)
+                if name is not None:
+                    env.define_variable(name, value)
+                    bound = True
+            return self.eval_expression(expr.body, env)
+        finally:
+            if bound:
+                self.drop_bindings(expr, env)
+
+    def drop_bindings(self, expr: Let, env: Environment) -> None:
+        """Remove a Let's temporaries from `env`."""
+        variables = env.writable_variables()
+        for name, _ in expr.bindings:
+            if name is not None:
+                variables.pop(name, None)
 
     def eval_function_call(self, expr: parser.FunctionCall, env: Environment) -> Any:
         """Evaluate a function call.
@@ -437,17 +1256,126 @@ class Interpreter:
         """
         # Evaluate arguments
         arg_values = [self.eval_expression(arg, env) for arg in expr.arguments]
+        return self.call_function(expr, arg_values, env)
+
+    def call_function(
+        self, expr: parser.FunctionCall, arg_values: List[Any], env: Environment
+    ) -> Any:
+        """Call a function with already-evaluated arguments.
+
+        Args:
+            expr: The FunctionCall expression.
+            arg_values: The argument values.
+            env: The environment of the call site.
+
+        Returns:
+            The return value of the function (or None if no return statement).
+        """
+        memo = self.function_memo(expr, env) if self.memoize else None
+        if memo is not None:
+            key = memo.key(arg_values)
+            if key in memo.cache:
+                memo.hits += 1
+                memo.cache.move_to_end(key)
+                return memo.cache[key]
+            memo.misses += 1
+
+        func, func_env = self.enter_function(expr, arg_values, env)
+
+        # Execute the function body
+        completion = self.execute_block(func.body, func_env)
+        while type(completion) is TailCall:
+            # Self tail call: rebind the parameters and run the body again
+            if self.steps_left is not None:
+                self.count_step()
+            for param_name, arg_value in zip(func.parameters, completion.arguments):
+                func_env.define_variable(param_name, arg_value)
+            completion = self.execute_block(func.body, func_env)
+
+        if type(func_env) is LeafFrame:
+            self.release_frame(func_env)
+
+        # Function returned a value, or None if no return statement
+        value = completion.value if completion is not None else None
+        if memo is not None:
+            memo.store(key, value)
+        return value
+
+    def function_memo(
+        self, expr: parser.FunctionCall, env: Environment
+    ) -> Optional[FunctionMemo]:
+        """Return the result cache for a call, if its function is pure.
+
+        All caches are dropped whenever any function is (re)defined, since
+        that can change which functions are pure.
+
+        Args:
+            expr: The FunctionCall expression.
+            env: The environment of the call site.
 
+        Returns:
+            The FunctionMemo of the called function, or None if the call
+            must not be memoized.
+        """
+        if self._nested_functions:
+            return None
+        if self._memo_version != _function_version:
+            self._memos.clear()
+            self._purity = PurityAnalyzer(self.global_env.functions.get)
+            self._memo_version = _function_version
+
+        func = self.resolve_call_site(expr, env).function
+        memo = self._memos.get(id(func))
+        if memo is None:
+            memo = FunctionMemo(func, self._purity.is_pure(func), self.memo_size)
+            self._memos[id(func)] = memo
+        return memo if memo.pure else None
+
+    def memo_stats(self) -> List[MemoStats]:
+        """Return cache statistics for every memoized function.
+
+        Statistics start over whenever a function is (re)defined.
+        """
+        return [memo.stats() for memo in self._memos.values() if memo.pure]
+
+    def enter_function(
+        self, expr: parser.FunctionCall, arg_values: List[Any], env: Environment
+    ) -> Tuple[parser.Function, Environment]:
+        """Resolve a call's target and build the environment for its body.
+
+        Args:
+            expr: The FunctionCall expression.
+            arg_values: The already-evaluated argument values.
+            env: The environment of the call site.
+
+        Returns:
+            The called Function and a new Environment with its parameters
+            bound, or a LeafFrame for a leaf function (see `release_frame`).
+        """
         # Look up the function
-        func = env.get_function(expr.name)
+        site = self.resolve_call_site(expr, env)
+        func = site.function
 
         # Check argument count
-        if len(arg_values) != len(func.parameters):
+        if len(arg_values) != site.arity:
             raise ValueError(
-                f"Function {expr.name} expects {len(func.parameters)} arguments, "
+                f"Function {expr.name} expects {site.arity} arguments, "
                 f"got {len(arg_values)}"
             )
 
+        if self.steps_left is not None:
+            self.count_step()
+
+        if site.leaf:
+            # Reuse a finished leaf frame if there is one
+            free = self._free_frames
+            func_env = free.pop() if free else LeafFrame()
+            func_env.parent = env
+            variables = func_env.variables
+            for param_name, arg_value in zip(func.parameters, arg_values):
+                variables[param_name] = arg_value
+            return func, func_env
+
         # Create a new environment for the function with current environment as parent
         func_env = Environment(parent=env)
 
@@ -455,21 +1383,78 @@ class Interpreter:
         for param_name, arg_value in zip(func.parameters, arg_values):
             func_env.define_variable(param_name, arg_value)
 
-        # Execute the function body
-        try:
-            for stmt in func.body:
-                self.execute_statement(stmt, func_env)
-        except ReturnValue as ret:
-            # Function returned a value
-            return ret.value
+        return func, func_env
 
-        # If no return statement, return None
-        return None
+    def release_frame(self, frame: LeafFrame) -> None:
+        """Put the frame of a returned leaf call back on the free list.
+
+        Only calls that return normally release their frame; after an error
+        the frame is simply left to the garbage collector.
+        """
+        frame.reset()
+        self._free_frames.append(frame)
+
+    def resolve_call_site(
+        self, expr: parser.FunctionCall, env: Environment
+    ) -> CallSite:
+        """Find the function a call refers to, using the site's inline cache.
+
+        Only resolutions that reach the global environment are cached. With
+        dynamic scoping, a function defined inside another function is
+        visible only while that call is running, so caching it would leak it
+        into later calls from the same site. Every definition bumps the
+        global version, which invalidates all cached sites.
+
+        Args:
+            expr: The FunctionCall expression.
+            env: The environment of the call site.
+
+        Returns:
+            A CallSite describing the resolved function.
+
+        Raises:
+            NameError: If no function with that name is visible from `env`.
+        """
+        site = self._call_sites.get(id(expr))
+        if site is not None and site.version == _function_version:
+            return site
+
+        name = expr.name
+        scope = env
+        while scope is not None:
+            func = scope.functions.get(name)
+            if func is not None:
+                site = CallSite(expr, func, id(func) in self._leaf_functions)
+                if scope.parent is None:
+                    self._call_sites[id(expr)] = site
+                return site
+            scope = scope.parent
+        raise NameError(f"Undefined function: {name}")
 
     # ========================================================================
     # Utilities
     # ========================================================================
 
+    def count_step(self) -> None:
+        """Use up one step of the budget.
+
+        Called at every loop back-edge and function entry, but only while a
+        budget is set (`steps_left` is not None).
+
+        Raises:
+            StepLimitError: If the budget is used up.
+        """
+        self.steps_left -= 1
+        if self.steps_left < 0:
+            self.raise_step_limit()
+
+    def raise_step_limit(self) -> None:
+        """Raise the StepLimitError for this run's budget."""
+        raise StepLimitError(
+            f"Step limit exceeded: program ran for more than "
+            f"{self.max_steps} steps (possible infinite loop)"
+        )
+
     def is_truthy(self, value: Any) -> bool:
         """Determine if a value is truthy in Hausalang.
 
@@ -483,6 +1468,9 @@ class Interpreter:
         Returns:
             True if the value is truthy, False otherwise.
         """
+        if type(value) in _NATIVE_TRUTH_TYPES:
+            # Python agrees with the rules above for these types
+            return bool(value)
         if value is False or value is None:
             return False
         if value == 0 or value == "":
@@ -591,6 +1579,21 @@ def _infer_runtime_error_kind(exc: Exception) -> tuple:
         kind = ErrorKind.INVALID_OPERAND_TYPE
         help_text = "Ensure variable types match the operation (strings vs. numbers)"
 
+    # OutputLimitError: Program wrote more than the sink allows
+    elif isinstance(exc, OutputLimitError):
+        kind = ErrorKind.OUTPUT_LIMIT_EXCEEDED
+        help_text = "Print less output, or print inside fewer loop iterations"
+
+    # StepLimitError: Step budget used up (before RuntimeError, its base)
+    elif isinstance(exc, StepLimitError):
+        kind = ErrorKind.INFINITE_LOOP
+        help_text = "Check that every loop condition eventually becomes false"
+
+    # RecursionError: Too many nested calls (before RuntimeError, its base)
+    elif isinstance(exc, RecursionError):
+        kind = ErrorKind.STACK_OVERFLOW
+        help_text = "Check that recursive functions reach a base case"
+
     # RuntimeError: Unknown operators or statements
     elif isinstance(exc, RuntimeError):
         if "operator" in exc_str:
@@ -611,7 +1614,14 @@ def _infer_runtime_error_kind(exc: Exception) -> tuple:
     return kind, context_frames, help_text
 
 
-def interpret_program(source_code: str) -> None:
+def interpret_program(
+    source_code: str,
+    interpreter: Optional[Interpreter] = None,
+    max_steps: Optional[int] = None,
+    opt_level: int = 0,
+    optimizer_stats: Optional[OptimizerStats] = None,
+    check_names: bool = False,
+) -> None:
     """Parse and interpret a Hausalang program.
 
     This is the main entry point: takes source code, lexes it, parses it to
@@ -623,11 +1633,27 @@ def interpret_program(source_code: str) -> None:
 
     Args:
         source_code: The Hausalang source code as a string.
+        interpreter: Optional interpreter to run the program with (for
+            example a StackInterpreter). Defaults to a fresh Interpreter.
+        max_steps: Step budget for this run (see Interpreter), overriding
+            the interpreter's own `max_steps` when given. The interpreter's
+            `max_steps` is unchanged afterwards.
+        opt_level: Optimization level, 0 (the default) to 2: which optimizer
+            passes run over the program before it is interpreted (see
+            OptimizerOptions.for_level).
+        optimizer_stats: Collects the rewrites, time and node count change
+            of each optimizer pass.
+        check_names: Check the program for undefined variables and
+            functions before running any of it (see checker.py).
 
     Raises:
         ContextualError: If the code has any error (inherits from SyntaxError,
                         NameError, ValueError, etc. depending on error type)
+        UndefinedNamesError: If `check_names` is set and the program uses
+            names that cannot be defined; lists every such use.
+        ValueError: If `opt_level` is not an optimization level.
     """
+    options = OptimizerOptions.for_level(opt_level)
     try:
         # Lex the source code
         tokens = tokenize_program(source_code)
@@ -635,9 +1661,33 @@ def interpret_program(source_code: str) -> None:
         # Parse tokens to produce AST
         program = parser.parse(tokens)
 
-        # Interpret the AST
-        interpreter = Interpreter()
-        interpreter.interpret(program)
+        if interpreter is None:
+            interpreter = Interpreter()
+
+        # Report undefined names up front; names the interpreter already
+        # has from earlier runs count as defined
+        if check_names:
+            errors = find_undefined_names(
+                program,
+                interpreter.global_env.variables,
+                interpreter.global_env.functions,
+            )
+            if errors:
+                raise UndefinedNamesError(errors)
+
+        # Run the optimizer passes of the chosen level
+        if options.any_enabled():
+            program = optimize(program, options, optimizer_stats)
+
+        # Interpret the AST. A budget given here applies to this run only,
+        # so later runs on the same interpreter keep its own
+        own_max_steps = interpreter.max_steps
+        if max_steps is not None:
+            interpreter.max_steps = max_steps
+        try:
+            interpreter.interpret(program)
+        finally:
+            interpreter.max_steps = own_max_steps
 
     except ContextualError:
         # Already wrapped by lexer or parser - re-raise as-is
@@ -0,0 +1,222 @@
+"""
+Memoization of Pure Functions for Hausalang
+
+Opt-in support for caching the results of `aiki` functions whose result can
+only depend on their arguments. Naive recursive programs (fib, factorial,
+path counting) then run in linear instead of exponential time.
+
+A function is pure when its body:
+- never runs `rubuta` and never defines a function
+- only reads its parameters and local variables that are definitely
+  assigned at that point (under dynamic scoping any other name would be
+  read from whichever function called it)
+- only calls functions that are pure themselves
+
+Assignments always create local variables in Hausalang, so a function can
+never write a caller's or a global variable.
+
+Results are cached per function in a bounded LRU, keyed on the argument
+values and their types (so `f(1)` and `f(1.0)` stay apart).
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import parser
+from .optimizer import HoistedLoop, Let
+from .superinstructions import CompareConst, CompareNames, Increment, ModuloTest
+
+# Maximum number of cached results per function
+DEFAULT_MEMO_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class MemoStats:
+    """Cache statistics for one memoized function."""
+
+    function: str
+    hits: int
+    misses: int
+    size: int
+
+
+class FunctionMemo:
+    """LRU cache of the results of one function.
+
+    A FunctionMemo is also kept for impure functions, with `pure` False, so
+    that the purity analysis runs only once per function.
+    """
+
+    __slots__ = ("function", "pure", "maxsize", "cache", "hits", "misses")
+
+    def __init__(self, function: parser.Function, pure: bool, maxsize: int):
+        self.function = function  # keeps id(function) from being reused
+        self.pure = pure
+        self.maxsize = maxsize
+        self.cache: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(arg_values: List[Any]) -> Tuple[Any, ...]:
+        """Return the cache key for a list of argument values."""
+        return tuple(arg_values) + tuple(map(type, arg_values))
+
+    def store(self, key: Tuple[Any, ...], value: Any) -> None:
+        """Cache a result, evicting the least recently used one if full."""
+        self.cache[key] = value
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def stats(self) -> MemoStats:
+        """Return the current statistics."""
+        return MemoStats(self.function.name, self.hits, self.misses, len(self.cache))
+
+
+class PurityAnalyzer:
+    """Decides which functions are pure.
+
+    Functions are looked up by name with `lookup`; recursive and mutually
+    recursive functions are pure if nothing else makes them impure.
+    """
+
+    def __init__(self, lookup: Callable[[str], Optional[parser.Function]]):
+        self.lookup = lookup
+        self._results: Dict[int, bool] = {}
+        self._in_progress: Set[int] = set()
+
+    def is_pure(self, func: parser.Function) -> bool:
+        """Return True if `func` is pure.
+
+        Args:
+            func: The Function definition.
+
+        Returns:
+            True if calls to `func` may be memoized.
+        """
+        result = self._results.get(id(func))
+        if result is not None:
+            return result
+        if id(func) in self._in_progress:
+            return True
+
+        self._in_progress.add(id(func))
+        try:
+            result = self.block(func.body, set(func.parameters)) is not None
+        finally:
+            self._in_progress.discard(id(func))
+        self._results[id(func)] = result
+        return result
+
+    def block(
+        self, statements: List[parser.Statement], assigned: Set[str]
+    ) -> Optional[Set[str]]:
+        """Check a block.
+
+        Args:
+            statements: The statements to check.
+            assigned: Names definitely assigned before the block.
+
+        Returns:
+            The names definitely assigned after the block, or None if the
+            block is impure.
+        """
+        assigned = set(assigned)
+        for stmt in statements:
+            if not self.statement(stmt, assigned):
+                return None
+        return assigned
+
+    def statement(self, stmt: parser.Statement, assigned: Set[str]) -> bool:
+        """Check a statement, adding the names it assigns to `assigned`."""
+        if isinstance(stmt, parser.Assignment):
+            if not self.expression(stmt.value, assigned):
+                return False
+            assigned.add(stmt.name)
+
+        elif isinstance(stmt, Increment):
+            return stmt.name in assigned
+
+        elif isinstance(stmt, (parser.Return, parser.ExpressionStatement)):
+            return self.expression(stmt.expression, assigned)
+
+        elif isinstance(stmt, parser.If):
+            if not self.expression(stmt.condition, assigned):
+                return False
+            then_assigned = self.block(stmt.then_body, assigned)
+            else_assigned = self.block(stmt.else_body or [], assigned)
+            if then_assigned is None or else_assigned is None:
+                return False
+            assigned |= then_assigned & else_assigned
+
+        elif isinstance(stmt, parser.While):
+            if not self.expression(stmt.condition, assigned):
+                return False
+            return self.block(stmt.body, assigned) is not None
+
+        elif isinstance(stmt, parser.For):
+            bounds = [stmt.start, stmt.end] + ([stmt.step] if stmt.step else [])
+            if not all(self.expression(bound, assigned) for bound in bounds):
+                return False
+            assigned.add(stmt.var)
+            return self.block(stmt.body, assigned) is not None
+
+        elif isinstance(stmt, HoistedLoop):
+            for name, value in stmt.temporaries:
+                if not self.expression(value, assigned):
+                    return False
+                assigned.add(name)
+            return self.statement(stmt.loop, assigned)
+
+        else:
+            # rubuta, nested aiki, or anything unknown
+            return False
+
+        return True
+
+    def expression(self, expr: parser.Expression, assigned: Set[str]) -> bool:
+        """Check that an expression only reads assigned names and pure calls."""
+        if isinstance(expr, (parser.Number, parser.String, parser.NoneValue)):
+            return True
+
+        elif isinstance(expr, parser.Identifier):
+            return expr.name in assigned
+
+        elif isinstance(expr, parser.BinaryOp):
+            return self.expression(expr.left, assigned) and self.expression(
+                expr.right, assigned
+            )
+
+        elif isinstance(expr, parser.UnaryOp):
+            return self.expression(expr.operand, assigned)
+
+        elif isinstance(expr, parser.FunctionCall):
+            callee = self.lookup(expr.name)
+            return (
+                callee is not None
+                and all(self.expression(arg, assigned) for arg in expr.arguments)
+                and self.is_pure(callee)
+            )
+
+        elif isinstance(expr, Let):
+            bound = set(assigned)
+            for name, value in expr.bindings:
+                if not self.expression(value, assigned):
+                    return False
+                if name is not None:
+                    bound.add(name)
+            return self.expression(expr.body, bound)
+
+        elif isinstance(expr, CompareConst):
+            return expr.name in assigned
+
+        elif isinstance(expr, CompareNames):
+            return expr.left in assigned and expr.right in assigned
+
+        elif isinstance(expr, ModuloTest):
+            return self.expression(expr.dividend, assigned) and self.expression(
+                expr.divisor, assigned
+            )
+
+        return False
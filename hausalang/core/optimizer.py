@@ -0,0 +1,1019 @@
+"""
+AST Optimizer for Hausalang
+
+This module rewrites a parsed Program before it is interpreted, so that work
+which does not depend on run-time values is done once instead of every time
+a statement runs.
+
+Passes (each has a flag in OptimizerOptions):
+- constant_folding: operators applied to literals are replaced by their
+  result, e.g. `60 * 60 * 24` becomes `86400`
+- constant_propagation: reads of a global variable that is assigned exactly
+  once, at the top level, to a literal are replaced by that literal where
+  the assignment is known to have run
+- inlining: calls to small functions whose body is a single `mayar` of an
+  operator expression are replaced by that expression (see Let)
+- algebraic_simplification: identities such as `x + 0` and `x * 1` are
+  removed where the operand types make them exact (see simplifier.py)
+- dead_code: `idan` statements with a literal condition are replaced by the
+  branch that runs, `kadai` loops with a false literal condition are
+  dropped, and statements that can never be reached are removed
+- loop_invariant_motion: operator expressions in a `kadai`/`don` loop whose
+  operands the loop never assigns are computed once, before the loop, into
+  hidden temporaries (see HoistedLoop)
+- common_subexpressions: an operator expression that occurs more than once
+  in one expression is evaluated once (see simplifier.py)
+- type_specialization: operators whose operand types are known statically
+  become TypedBinaryOp nodes (see type_inference.py)
+
+Key Design:
+- Every rewrite keeps behaviour exactly, including errors: an operation
+  that would fail at run time (`1 / 0`, `"a" - 1`) is left in place so it
+  fails at the same point with the same message
+- Integer `/` folds to floor division, just as the interpreter evaluates it
+- Passes run in registry order, and the pipeline repeats while a round
+  still changes the program, so propagated constants get folded too
+- Rewritten nodes keep the line and column of the node they replace
+
+Constant propagation and inlining assume the Program is the whole program.
+A REPL session, where later input can reassign any global or redefine any
+function, must switch them off.
+"""
+
+import operator
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import parser
+
+# Longest string constant folding may create; longer results stay as
+# expressions so a never-executed `"ab" * 1000000` costs nothing up front
+MAX_FOLDED_STRING = 1024
+
+# Maximum number of times the pass pipeline runs over a program
+MAX_ROUNDS = 4
+
+# Largest `mayar` expression, in nodes, of a function that gets inlined
+MAX_INLINE_SIZE = 16
+
+_LITERALS = (parser.Number, parser.String, parser.NoneValue)
+
+_OPERATIONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "%": operator.mod,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+
+
+# Optimization levels, as selected with -O0, -O1 and -O2
+OPT_LEVELS = (0, 1, 2)
+
+# Passes of -O1: the cheap rewrites that need no type inference
+_LEVEL_1_PASSES = ("constant_folding", "constant_propagation", "inlining", "dead_code")
+
+# Passes that assume the Program is the whole program (see above)
+_WHOLE_PROGRAM_PASSES = ("constant_propagation", "inlining")
+
+
+@dataclass(frozen=True)
+class OptimizerOptions:
+    """Which optimization passes run."""
+
+    constant_folding: bool = True
+    constant_propagation: bool = True
+    inlining: bool = True
+    algebraic_simplification: bool = True
+    dead_code: bool = True
+    loop_invariant_motion: bool = True
+    common_subexpressions: bool = True
+    type_specialization: bool = True
+
+    @classmethod
+    def for_level(cls, level: int, whole_program: bool = True) -> "OptimizerOptions":
+        """Return the passes of an optimization level.
+
+        -O0 runs no passes, -O1 the cheap rewrites that need no type
+        inference (folding, propagation, inlining and dead code), and -O2
+        every pass.
+
+        Args:
+            level: One of OPT_LEVELS.
+            whole_program: False if the program is only part of one, such
+                as REPL input; constant propagation and inlining are then
+                off at every level.
+
+        Raises:
+            ValueError: If `level` is not an optimization level.
+        """
+        if level not in OPT_LEVELS:
+            raise ValueError(
+                f"Unknown optimization level: {level!r} (expected 0, 1 or 2)"
+            )
+        flags = {
+            name: level == 2 or (level == 1 and name in _LEVEL_1_PASSES)
+            for name, _ in PASSES
+        }
+        if not whole_program:
+            flags.update(dict.fromkeys(_WHOLE_PROGRAM_PASSES, False))
+        return cls(**flags)
+
+    def any_enabled(self) -> bool:
+        """Return True if at least one pass is switched on."""
+        return any(getattr(self, name) for name, _ in PASSES)
+
+
+class OptimizerStats:
+    """Counts, times and sizes the work of the optimization passes.
+
+    Node counts are of the tree the interpreter runs: the fallback copy of
+    the loop a HoistedLoop keeps is not counted.
+    """
+
+    def __init__(self) -> None:
+        # Rewrite counts by OptimizerOptions flag name
+        self.rewrites: Dict[str, int] = {}
+        # Time spent in each pass, over all rounds
+        self.seconds: Dict[str, float] = {}
+        # Change in node count made by each pass (negative when it shrank
+        # the tree)
+        self.node_changes: Dict[str, int] = {}
+        # Tree size before and after the whole pipeline, and the number of
+        # rounds it ran
+        self.nodes_before = 0
+        self.nodes_after = 0
+        self.rounds = 0
+
+    def count(self, name: str, number: int = 1) -> None:
+        """Record `number` rewrites made by pass `name`."""
+        self.rewrites[name] = self.rewrites.get(name, 0) + number
+
+    def start(self, program: parser.Program, names: List[str]) -> None:
+        """Reset the totals for a pipeline of passes `names` over `program`."""
+        self.nodes_before = self.nodes_after = count_nodes(program)
+        self.rounds = 0
+        for name in names:
+            self.count(name, 0)
+            self.seconds.setdefault(name, 0.0)
+            self.node_changes.setdefault(name, 0)
+
+    def run_pass(
+        self, name: str, function: "PassFunction", program: parser.Program
+    ) -> parser.Program:
+        """Run pass `name` over `program`, timing it and sizing its result."""
+        start = time.perf_counter()
+        program = function(program, self)
+        self.seconds[name] = self.seconds.get(name, 0.0) + (time.perf_counter() - start)
+        nodes = count_nodes(program)
+        change = nodes - self.nodes_after
+        self.node_changes[name] = self.node_changes.get(name, 0) + change
+        self.nodes_after = nodes
+        return program
+
+    def passes(self) -> List[str]:
+        """Return the names of the passes with statistics, in pipeline order."""
+        return [name for name, _ in PASSES if name in self.rewrites]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the statistics as plain data (for JSON responses)."""
+        return {
+            "rounds": self.rounds,
+            "nodes_before": self.nodes_before,
+            "nodes_after": self.nodes_after,
+            "passes": {
+                name: {
+                    "rewrites": self.rewrites[name],
+                    "node_change": self.node_changes.get(name, 0),
+                    "milliseconds": round(self.seconds.get(name, 0.0) * 1000, 3),
+                }
+                for name in self.passes()
+            },
+        }
+
+    def format(self) -> str:
+        """Return a report with one line per pass."""
+        lines = [
+            f"Optimizer: {self.rounds} rounds, "
+            f"{self.nodes_before} -> {self.nodes_after} nodes"
+        ]
+        width = max((len(name) for name in self.passes()), default=0)
+        for name in self.passes():
+            lines.append(
+                f"  {name + ':':<{width + 1}} {self.rewrites[name]:5d} rewrites"
+                f" {self.node_changes.get(name, 0):+6d} nodes"
+                f" {self.seconds.get(name, 0.0) * 1000:8.2f} ms"
+            )
+        return "\n".join(lines)
+
+
+# ============================================================================
+# Optimizer Node Definitions
+# ============================================================================
+
+# Prefix of hidden temporaries; `$` cannot start a name in Hausalang source
+TEMPORARY_PREFIX = "$"
+
+
+@dataclass(frozen=True)
+class HoistedLoop(parser.ASTNode):
+    """A loop with its invariant expressions computed up front.
+
+    Each temporary is evaluated in order and stored as a variable before
+    `loop` runs; `loop` reads them back as plain Identifiers. The
+    temporaries are removed again once the loop has finished.
+
+    Evaluating a temporary early must not change which error a program
+    raises or when. So if any temporary raises, none is defined and
+    `original`, the loop as it was before hoisting, runs instead and fails
+    at the point it always did.
+    """
+
+    temporaries: List[Tuple[str, "parser.Expression"]]
+    loop: "parser.Statement"  # While or For
+    original: "parser.Statement"
+
+
+@dataclass(frozen=True)
+class Let(parser.ASTNode):
+    """An inlined function call.
+
+    The bindings are evaluated in order, as the call's arguments were, and
+    then `body`, the function's `mayar` expression with its parameters
+    replaced, gives the value. A named binding stores its value in a hidden
+    temporary that `body` reads; these are removed again once `body` has
+    been evaluated. An unnamed binding is a plain variable that `body`
+    reads directly, and is evaluated first only so that an undefined name
+    fails at the same point as before.
+    """
+
+    bindings: List[Tuple[Optional[str], "parser.Expression"]]
+    body: "parser.Expression"
+
+
+# ============================================================================
+# Tree Rewriting
+# ============================================================================
+
+
+class Rewriter:
+    """Rebuilds a program bottom-up.
+
+    Subclasses override `statement` or `expression`, call the base method
+    to rewrite the children, and then rewrite the node itself. A subclass
+    that implements a pass sets `pass_name` and calls `rewrote` for every
+    rewrite it makes.
+    """
+
+    # OptimizerOptions flag of the pass, for OptimizerStats
+    pass_name = ""
+
+    def __init__(self, stats: Optional[OptimizerStats] = None):
+        self.stats = stats
+
+    def rewrote(self, number: int = 1) -> None:
+        """Count rewrites made by this pass, if stats are being kept."""
+        if self.stats is not None:
+            self.stats.count(self.pass_name, number)
+
+    def program(self, program: parser.Program) -> parser.Program:
+        return replace(program, statements=self.block(program.statements))
+
+    def block(self, statements: List[parser.Statement]) -> List[parser.Statement]:
+        return [self.statement(stmt) for stmt in statements]
+
+    def statement(self, stmt: parser.Statement) -> parser.Statement:
+        if isinstance(stmt, parser.Assignment):
+            return replace(stmt, value=self.expression(stmt.value))
+
+        elif isinstance(
+            stmt, (parser.Print, parser.Return, parser.ExpressionStatement)
+        ):
+            return replace(stmt, expression=self.expression(stmt.expression))
+
+        elif isinstance(stmt, parser.If):
+            return replace(
+                stmt,
+                condition=self.expression(stmt.condition),
+                then_body=self.block(stmt.then_body),
+                else_body=self.block(stmt.else_body) if stmt.else_body else None,
+            )
+
+        elif isinstance(stmt, parser.While):
+            return replace(
+                stmt,
+                condition=self.expression(stmt.condition),
+                body=self.block(stmt.body),
+            )
+
+        elif isinstance(stmt, parser.For):
+            return replace(
+                stmt,
+                start=self.expression(stmt.start),
+                end=self.expression(stmt.end),
+                step=self.expression(stmt.step) if stmt.step is not None else None,
+                body=self.block(stmt.body),
+            )
+
+        elif isinstance(stmt, parser.Function):
+            return replace(stmt, body=self.block(stmt.body))
+
+        elif isinstance(stmt, HoistedLoop):
+            # `original` is left exactly as it was hoisted
+            return replace(
+                stmt,
+                temporaries=[
+                    (name, self.expression(value)) for name, value in stmt.temporaries
+                ],
+                loop=self.statement(stmt.loop),
+            )
+
+        return stmt
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        if isinstance(expr, parser.BinaryOp):
+            return replace(
+                expr, left=self.expression(expr.left), right=self.expression(expr.right)
+            )
+
+        elif isinstance(expr, parser.UnaryOp):
+            return replace(expr, operand=self.expression(expr.operand))
+
+        elif isinstance(expr, parser.FunctionCall):
+            return replace(
+                expr, arguments=[self.expression(arg) for arg in expr.arguments]
+            )
+
+        elif isinstance(expr, Let):
+            return replace(
+                expr,
+                bindings=[
+                    (name, self.expression(value)) for name, value in expr.bindings
+                ],
+                body=self.expression(expr.body),
+            )
+
+        return expr
+
+
+def literal_value(expr: parser.Expression) -> Any:
+    """Return the value of a literal node (Number, String or NoneValue)."""
+    if isinstance(expr, parser.NoneValue):
+        return None
+    return expr.value
+
+
+def make_literal(value: Any, node: parser.ASTNode) -> Optional[parser.Expression]:
+    """Build a literal node for `value` at the position of `node`.
+
+    Returns:
+        The literal, or None if `value` has no literal form (or is a string
+        longer than MAX_FOLDED_STRING).
+    """
+    if value is None:
+        return parser.NoneValue(line=node.line, column=node.column)
+    if isinstance(value, (int, float)):
+        return parser.Number(line=node.line, column=node.column, value=value)
+    if isinstance(value, str) and len(value) <= MAX_FOLDED_STRING:
+        return parser.String(line=node.line, column=node.column, value=value)
+    return None
+
+
+# ============================================================================
+# Constant Folding
+# ============================================================================
+
+
+def fold_binary(op: str, left: Any, right: Any) -> Any:
+    """Apply a binary operator the way Interpreter.apply_binary_op does.
+
+    Raises:
+        Whatever the operation raises at run time (e.g. ZeroDivisionError).
+    """
+    if op == "/":
+        if isinstance(left, int) and isinstance(right, int):
+            return left // right
+        return left / right
+    return _OPERATIONS[op](left, right)
+
+
+def fold_unary(op: str, operand: Any) -> Any:
+    """Apply a unary operator the way Interpreter.apply_unary_op does."""
+    if op == "-":
+        return -operand
+    if op == "+":
+        return +operand
+    raise RuntimeError(f"Unknown unary operator: {op}")
+
+
+class ConstantFolder(Rewriter):
+    """Replaces operators applied to literals with their result."""
+
+    pass_name = "constant_folding"
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        expr = super().expression(expr)
+        try:
+            if (
+                isinstance(expr, parser.BinaryOp)
+                and isinstance(expr.left, _LITERALS)
+                and isinstance(expr.right, _LITERALS)
+            ):
+                value = fold_binary(
+                    expr.operator, literal_value(expr.left), literal_value(expr.right)
+                )
+            elif isinstance(expr, parser.UnaryOp) and isinstance(
+                expr.operand, _LITERALS
+            ):
+                value = fold_unary(expr.operator, literal_value(expr.operand))
+            else:
+                return expr
+        except Exception:
+            # Leave it to fail at run time, with the interpreter's error
+            return expr
+        literal = make_literal(value, expr)
+        if literal is None:
+            return expr
+        self.rewrote()
+        return literal
+
+
+def fold_constants(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Constant folding pass."""
+    return ConstantFolder(stats).program(program)
+
+
+# ============================================================================
+# Constant Propagation
+# ============================================================================
+
+
+def count_bindings(program: parser.Program) -> Dict[str, int]:
+    """Count the places that bind each variable name.
+
+    Assignments, `don` loop variables and function parameters all bind a
+    name. Under dynamic scoping a binding anywhere, even a parameter of an
+    unrelated function, can shadow a global for the functions it calls.
+
+    Returns:
+        Binding counts by name.
+    """
+    counts: Dict[str, int] = {}
+
+    def bind(name: str) -> None:
+        counts[name] = counts.get(name, 0) + 1
+
+    pending: List[Any] = list(program.statements)
+    while pending:
+        stmt = pending.pop()
+        if isinstance(stmt, parser.Assignment):
+            bind(stmt.name)
+        elif isinstance(stmt, parser.If):
+            pending.extend(stmt.then_body)
+            pending.extend(stmt.else_body or [])
+        elif isinstance(stmt, parser.While):
+            pending.extend(stmt.body)
+        elif isinstance(stmt, parser.For):
+            bind(stmt.var)
+            pending.extend(stmt.body)
+        elif isinstance(stmt, parser.Function):
+            for name in stmt.parameters:
+                bind(name)
+            pending.extend(stmt.body)
+        elif isinstance(stmt, HoistedLoop):
+            pending.append(stmt.loop)
+    return counts
+
+
+class ConstantSubstituter(Rewriter):
+    """Replaces reads of known constants with their literal."""
+
+    pass_name = "constant_propagation"
+
+    def __init__(
+        self,
+        constants: Dict[str, parser.Expression],
+        stats: Optional[OptimizerStats] = None,
+    ):
+        super().__init__(stats)
+        self.constants = constants
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        if isinstance(expr, parser.Identifier):
+            literal = self.constants.get(expr.name)
+            if literal is not None:
+                self.rewrote()
+                return replace(literal, line=expr.line, column=expr.column)
+            return expr
+        return super().expression(expr)
+
+
+def propagate_constants(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Constant propagation pass.
+
+    A variable is a constant if it is bound exactly once in the whole
+    program, by a top-level assignment of a literal. Its reads are replaced
+    in the top-level statements after that assignment, including the bodies
+    of functions defined there: such a function can only be called once
+    its definition, and so the assignment, has run. Functions defined
+    earlier are left alone, since calling one before the assignment must
+    still fail.
+    """
+    counts = count_bindings(program)
+    substituter = ConstantSubstituter({}, stats)
+    statements = []
+    for stmt in program.statements:
+        if substituter.constants:
+            stmt = substituter.statement(stmt)
+        statements.append(stmt)
+        if (
+            isinstance(stmt, parser.Assignment)
+            and counts[stmt.name] == 1
+            and isinstance(stmt.value, _LITERALS)
+        ):
+            substituter.constants[stmt.name] = stmt.value
+    return replace(program, statements=statements)
+
+
+# ============================================================================
+# Inlining
+# ============================================================================
+
+
+def expression_size(expr: parser.Expression) -> Optional[int]:
+    """Count the nodes of an expression of literals, names and operators.
+
+    Returns:
+        The number of nodes, or None if the expression contains anything
+        else, such as a function call.
+    """
+    if isinstance(expr, (parser.Identifier,) + _LITERALS):
+        return 1
+    if isinstance(expr, parser.BinaryOp):
+        left = expression_size(expr.left)
+        right = expression_size(expr.right)
+        if left is None or right is None:
+            return None
+        return left + right + 1
+    if isinstance(expr, parser.UnaryOp):
+        operand = expression_size(expr.operand)
+        return operand + 1 if operand is not None else None
+    return None
+
+
+def inline_body(func: parser.Function) -> Optional[parser.Expression]:
+    """Return the expression calls to `func` can be replaced with, if any.
+
+    That is the `mayar` expression of a function whose whole body is one
+    `mayar` of at most MAX_INLINE_SIZE nodes without calls. Such a function
+    is never recursive, and nothing it evaluates can see its scope: any
+    name other than a parameter is read from the caller's scope whether
+    the call is inlined or not.
+    """
+    if len(func.body) != 1 or not isinstance(func.body[0], parser.Return):
+        return None
+    if len(set(func.parameters)) != len(func.parameters):
+        return None
+    body = func.body[0].expression
+    size = expression_size(body)
+    if size is None or size > MAX_INLINE_SIZE:
+        return None
+    return body
+
+
+def inline_call(
+    call: parser.FunctionCall, func: parser.Function, body: parser.Expression
+) -> parser.Expression:
+    """Build the expression that replaces `call`, a call to `func`.
+
+    Literal arguments are substituted into `body` directly. Other
+    arguments become the bindings of a Let: plain variables are evaluated
+    in place and substituted too (the callee cannot assign them), anything
+    else is stored in a temporary named after the parameter and the
+    position of the call.
+    """
+    bindings: List[Tuple[Optional[str], parser.Expression]] = []
+    arguments: Dict[str, parser.Expression] = {}
+    for name, argument in zip(func.parameters, call.arguments):
+        if isinstance(argument, _LITERALS):
+            arguments[name] = argument
+        elif isinstance(argument, parser.Identifier):
+            bindings.append((None, argument))
+            arguments[name] = argument
+        else:
+            temporary = f"{TEMPORARY_PREFIX}{name}@{call.line}:{call.column}"
+            bindings.append((temporary, argument))
+            arguments[name] = parser.Identifier(
+                line=argument.line, column=argument.column, name=temporary
+            )
+    body = ConstantSubstituter(arguments).expression(body)
+    if not bindings:
+        return replace(body, line=call.line, column=call.column)
+    return Let(line=call.line, column=call.column, bindings=bindings, body=body)
+
+
+class Inliner(Rewriter):
+    """Replaces calls to small functions with their `mayar` expression."""
+
+    pass_name = "inlining"
+
+    def __init__(self, stats: Optional[OptimizerStats] = None):
+        super().__init__(stats)
+        self.functions: Dict[str, Tuple[parser.Function, parser.Expression]] = {}
+
+    def program(self, program: parser.Program) -> parser.Program:
+        graph = program.call_graph
+        statements = []
+        for stmt in program.statements:
+            if self.functions:
+                stmt = self.statement(stmt)
+            statements.append(stmt)
+            if (
+                isinstance(stmt, parser.Function)
+                and graph.functions[stmt.name].definitions == 1
+            ):
+                body = inline_body(stmt)
+                if body is not None:
+                    self.functions[stmt.name] = (stmt, body)
+        return replace(program, statements=statements)
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        expr = super().expression(expr)
+        if isinstance(expr, parser.FunctionCall):
+            entry = self.functions.get(expr.name)
+            if entry is not None and len(expr.arguments) == len(entry[0].parameters):
+                self.rewrote()
+                return inline_call(expr, *entry)
+        return expr
+
+
+def inline_functions(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Inlining pass.
+
+    Only functions defined exactly once in the whole program, by a
+    top-level statement, are inlined, and only into the top-level
+    statements after that definition (for the same reasons as in
+    `propagate_constants`). A call with the wrong number of arguments is
+    left to fail at run time.
+    """
+    return Inliner(stats).program(program)
+
+
+# ============================================================================
+# Dead Code Elimination
+# ============================================================================
+
+
+def is_literal_truthy(expr: parser.Expression) -> Optional[bool]:
+    """Return the truthiness of a literal condition, or None if not literal.
+
+    For literals Python's truthiness matches Interpreter.is_truthy.
+    """
+    if isinstance(expr, _LITERALS):
+        return bool(literal_value(expr))
+    return None
+
+
+def ends_block(stmt: parser.Statement) -> bool:
+    """Return True if nothing after `stmt` in the same block can run.
+
+    That is the case after a `mayar`, after an `idan` whose branches all
+    end that way, and after a `kadai` loop with a true literal condition
+    (Hausalang has no `break`, so such a loop is only left by `mayar` or an
+    error).
+    """
+    if isinstance(stmt, parser.Return):
+        return True
+    if isinstance(stmt, parser.If):
+        return (
+            bool(stmt.then_body)
+            and bool(stmt.else_body)
+            and ends_block(stmt.then_body[-1])
+            and ends_block(stmt.else_body[-1])
+        )
+    if isinstance(stmt, parser.While):
+        return is_literal_truthy(stmt.condition) is True
+    if isinstance(stmt, HoistedLoop):
+        return ends_block(stmt.loop)
+    return False
+
+
+class DeadCodeEliminator(Rewriter):
+    """Removes branches and statements that can never run."""
+
+    pass_name = "dead_code"
+
+    def block(self, statements: List[parser.Statement]) -> List[parser.Statement]:
+        result: List[parser.Statement] = []
+        for index, stmt in enumerate(statements):
+            stmt = self.statement(stmt)
+            if isinstance(stmt, parser.If):
+                taken = is_literal_truthy(stmt.condition)
+                if taken is True:
+                    result.extend(stmt.then_body)
+                elif taken is False:
+                    result.extend(stmt.else_body or [])
+                else:
+                    result.append(stmt)
+                if taken is not None:
+                    self.rewrote()
+            elif (
+                isinstance(stmt, parser.While)
+                and is_literal_truthy(stmt.condition) is False
+            ):
+                self.rewrote()
+                continue
+            else:
+                result.append(stmt)
+            if result and ends_block(result[-1]):
+                if index + 1 < len(statements):
+                    self.rewrote(len(statements) - index - 1)
+                break
+        return result
+
+
+def eliminate_dead_code(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Dead code elimination pass."""
+    return DeadCodeEliminator(stats).program(program)
+
+
+# ============================================================================
+# Loop-Invariant Code Motion
+# ============================================================================
+
+
+def assigned_names(stmt: parser.Statement) -> Set[str]:
+    """Return the names a statement may assign in the scope it runs in.
+
+    Bodies of functions defined inside are skipped: they run in their own
+    scope, and assignments in Hausalang are always local.
+    """
+    names: Set[str] = set()
+    pending: List[Any] = [stmt]
+    while pending:
+        stmt = pending.pop()
+        if isinstance(stmt, parser.Assignment):
+            names.add(stmt.name)
+        elif isinstance(stmt, parser.If):
+            pending.extend(stmt.then_body)
+            pending.extend(stmt.else_body or [])
+        elif isinstance(stmt, parser.While):
+            pending.extend(stmt.body)
+        elif isinstance(stmt, parser.For):
+            names.add(stmt.var)
+            pending.extend(stmt.body)
+        elif isinstance(stmt, HoistedLoop):
+            names.update(name for name, _ in stmt.temporaries)
+            pending.append(stmt.loop)
+    return names
+
+
+def is_invariant(expr: parser.Expression, assigned: Set[str]) -> bool:
+    """Return True if `expr` has the same value on every loop iteration.
+
+    Function calls are never invariant: they may print, and their result
+    may depend on names the loop assigns (scoping is dynamic).
+    """
+    if isinstance(expr, _LITERALS):
+        return True
+    if isinstance(expr, parser.Identifier):
+        return expr.name not in assigned
+    if isinstance(expr, parser.BinaryOp):
+        return is_invariant(expr.left, assigned) and is_invariant(expr.right, assigned)
+    if isinstance(expr, parser.UnaryOp):
+        return is_invariant(expr.operand, assigned)
+    return False
+
+
+class _Hoister(Rewriter):
+    """Replaces the invariant expressions of one loop with temporaries."""
+
+    def __init__(self, mover: "LoopInvariantMover", assigned: Set[str]):
+        super().__init__()
+        self.mover = mover
+        self.assigned = assigned
+        self.temporaries: List[Tuple[str, parser.Expression]] = []
+
+    def statement(self, stmt: parser.Statement) -> parser.Statement:
+        if isinstance(stmt, parser.Function):
+            return stmt
+        return super().statement(stmt)
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        if isinstance(expr, (parser.BinaryOp, parser.UnaryOp)) and is_invariant(
+            expr, self.assigned
+        ):
+            name = self.mover.new_temporary()
+            self.temporaries.append((name, expr))
+            return parser.Identifier(line=expr.line, column=expr.column, name=name)
+        if isinstance(expr, Let):
+            # A Let's temporaries are assigned every time it is evaluated
+            assigned = self.assigned
+            self.assigned = assigned | {name for name, _ in expr.bindings if name}
+            expr = super().expression(expr)
+            self.assigned = assigned
+            return expr
+        return super().expression(expr)
+
+
+class LoopInvariantMover(Rewriter):
+    """Hoists invariant expressions out of loops, innermost loops first."""
+
+    pass_name = "loop_invariant_motion"
+
+    def __init__(self, stats: Optional[OptimizerStats] = None):
+        super().__init__(stats)
+        self.temporaries = 0
+
+    def program(self, program: parser.Program) -> parser.Program:
+        # Continue numbering after the temporaries of earlier rounds
+        for stmt in _walk_statements(program.statements):
+            if isinstance(stmt, HoistedLoop):
+                for name, _ in stmt.temporaries:
+                    index = int(name[len(TEMPORARY_PREFIX) :])
+                    self.temporaries = max(self.temporaries, index)
+        return super().program(program)
+
+    def new_temporary(self) -> str:
+        self.temporaries += 1
+        return f"{TEMPORARY_PREFIX}{self.temporaries}"
+
+    def statement(self, stmt: parser.Statement) -> parser.Statement:
+        stmt = super().statement(stmt)
+        if not isinstance(stmt, (parser.While, parser.For)):
+            return stmt
+
+        hoister = _Hoister(self, assigned_names(stmt))
+        if isinstance(stmt, parser.While):
+            loop = replace(
+                stmt,
+                condition=hoister.expression(stmt.condition),
+                body=hoister.block(stmt.body),
+            )
+        else:
+            loop = replace(stmt, body=hoister.block(stmt.body))
+        if not hoister.temporaries:
+            return stmt
+        self.rewrote(len(hoister.temporaries))
+        return HoistedLoop(
+            line=stmt.line,
+            column=stmt.column,
+            temporaries=hoister.temporaries,
+            loop=loop,
+            original=stmt,
+        )
+
+
+def _walk_statements(statements: List[parser.Statement]):
+    """Yield every statement in a block, nested ones included."""
+    pending = list(statements)
+    while pending:
+        stmt = pending.pop()
+        yield stmt
+        if isinstance(stmt, parser.If):
+            pending.extend(stmt.then_body)
+            pending.extend(stmt.else_body or [])
+        elif isinstance(stmt, (parser.While, parser.For, parser.Function)):
+            pending.extend(stmt.body)
+        elif isinstance(stmt, HoistedLoop):
+            pending.append(stmt.loop)
+            pending.append(stmt.original)
+
+
+def hoist_loop_invariants(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Loop-invariant code motion pass."""
+    return LoopInvariantMover(stats).program(program)
+
+
+# The passes below build on type_inference, which builds on this module, so
+# they are imported on first use
+
+
+def simplify_algebra(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Algebraic simplification pass (see simplifier.py)."""
+    from .simplifier import simplify_algebra as simplify
+
+    return simplify(program, stats)
+
+
+def share_subexpressions(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Common subexpression elimination pass (see simplifier.py)."""
+    from .simplifier import share_subexpressions as share
+
+    return share(program, stats)
+
+
+def specialize_types(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Type specialization pass (see type_inference.py)."""
+    from .type_inference import specialize_types as specialize
+
+    return specialize(program, stats)
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+PassFunction = Callable[[parser.Program, Optional[OptimizerStats]], parser.Program]
+
+# Passes in the order they run, by the name of their OptimizerOptions flag
+PASSES: List[Tuple[str, PassFunction]] = [
+    ("constant_folding", fold_constants),
+    ("constant_propagation", propagate_constants),
+    ("inlining", inline_functions),
+    ("algebraic_simplification", simplify_algebra),
+    ("dead_code", eliminate_dead_code),
+    ("loop_invariant_motion", hoist_loop_invariants),
+    ("common_subexpressions", share_subexpressions),
+    ("type_specialization", specialize_types),
+]
+
+
+def enabled_passes(options: OptimizerOptions) -> List[Tuple[str, PassFunction]]:
+    """Return the names and functions of the passes switched on in `options`."""
+    return [(flag, function) for flag, function in PASSES if getattr(options, flag)]
+
+
+def optimize(
+    program: parser.Program,
+    options: Optional[OptimizerOptions] = None,
+    stats: Optional[OptimizerStats] = None,
+) -> parser.Program:
+    """Run the optimization passes over a program.
+
+    Args:
+        program: The Program node from the parser.
+        options: Which passes run. Defaults to all of them.
+        stats: If given, the rewrites, time and node count change of each
+            pass are recorded here.
+
+    Returns:
+        The optimized Program, or `program` itself if its expressions nest
+        too deeply for the passes (which recurse over them) to rewrite. The
+        input is not modified.
+    """
+    passes = enabled_passes(options or OptimizerOptions())
+    original = program
+    if stats is not None:
+        stats.start(program, [flag for flag, _ in passes])
+        rewrites = dict(stats.rewrites)
+        node_changes = dict(stats.node_changes)
+    try:
+        for _ in range(MAX_ROUNDS):
+            before = program
+            for flag, function in passes:
+                if stats is None:
+                    program = function(program, None)
+                else:
+                    program = stats.run_pass(flag, function, program)
+            if stats is not None:
+                stats.rounds += 1
+            if program == before:
+                break
+    except RecursionError:
+        # StackInterpreter runs expressions of any depth, so an optimizer
+        # that cannot must not stop the program from running
+        if stats is not None:
+            stats.rewrites = rewrites
+            stats.node_changes = node_changes
+            stats.nodes_after = stats.nodes_before
+        return original
+    return program
+
+
+def count_nodes(node: Any) -> int:
+    """Count the AST nodes in a tree (see OptimizerStats)."""
+    count = 0
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (list, tuple)):
+            pending.extend(node)
+        elif isinstance(node, parser.ASTNode):
+            count += 1
+            for name, value in vars(node).items():
+                if not (isinstance(node, HoistedLoop) and name == "original"):
+                    pending.append(value)
+    return count
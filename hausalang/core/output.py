@@ -0,0 +1,171 @@
+"""
+Output Sinks for Hausalang
+
+`rubuta` statements do not call print() directly. The Interpreter owns an
+OutputSink and hands it the text of every `rubuta`; the sink decides where
+the text goes and when it is actually written.
+
+Available sinks:
+- StreamOutput: writes to a text stream (sys.stdout by default), optionally
+  in large blocks instead of once per `rubuta`
+- BufferOutput: keeps output in memory (e.g. to return it from a web API)
+- CallbackOutput: passes output to a function in chunks
+
+Every sink can enforce `max_output`, a limit on the number of characters a
+program may write. Exceeding it raises OutputLimitError, which the public
+API reports as ErrorKind.OUTPUT_LIMIT_EXCEEDED.
+"""
+
+import sys
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, TextIO
+
+# Block size used when a buffered sink is asked for "large-block" writes
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+class OutputLimitError(RuntimeError):
+    """Raised when a program writes more than the sink's `max_output`."""
+
+
+class OutputSink(ABC):
+    """Base class for destinations of `rubuta` output.
+
+    Subclasses implement `_emit` (receive text) and may override `flush`.
+    """
+
+    def __init__(self, max_output: Optional[int] = None):
+        """Initialize the sink.
+
+        Args:
+            max_output: Maximum number of characters that may be written,
+                or None for no limit.
+        """
+        self.max_output = max_output
+        self.written = 0
+
+    def write(self, text: str) -> None:
+        """Accept text written by the program.
+
+        Raises:
+            OutputLimitError: If the text would take the total output past
+                `max_output`. The part that still fits is kept.
+        """
+        self.written += len(text)
+        if self.max_output is not None and self.written > self.max_output:
+            overflow = self.written - self.max_output
+            self.written = self.max_output
+            if overflow < len(text):
+                self._emit(text[: len(text) - overflow])
+            raise OutputLimitError(
+                f"Output limit exceeded: program wrote more than "
+                f"{self.max_output} characters"
+            )
+        self._emit(text)
+
+    @abstractmethod
+    def _emit(self, text: str) -> None:
+        """Deliver `text`, already checked against `max_output`."""
+
+    def flush(self) -> None:
+        """Deliver any pending output."""
+
+
+class StreamOutput(OutputSink):
+    """Write output to a text stream.
+
+    With `block_size=0` (the default) every `rubuta` is written immediately.
+    A positive `block_size` collects output and writes it in blocks of at
+    least that many characters, plus a final partial block on `flush()`.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        block_size: int = 0,
+        max_output: Optional[int] = None,
+    ):
+        """Initialize the sink.
+
+        Args:
+            stream: Stream to write to. None means whatever `sys.stdout` is
+                at the time of writing, so redirection keeps working.
+            block_size: Minimum size of each write; 0 writes through.
+            max_output: Maximum number of characters, or None.
+        """
+        super().__init__(max_output)
+        self.stream = stream
+        self.block_size = block_size
+        self._pending: List[str] = []
+        self._pending_size = 0
+
+    def _emit(self, text: str) -> None:
+        if not self.block_size:
+            (self.stream or sys.stdout).write(text)
+            return
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self.block_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            stream = self.stream or sys.stdout
+            stream.write("".join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+            stream.flush()
+
+
+class BufferOutput(OutputSink):
+    """Keep output in memory; read it back with `getvalue()`."""
+
+    def __init__(self, max_output: Optional[int] = None):
+        super().__init__(max_output)
+        self._parts: List[str] = []
+
+    def _emit(self, text: str) -> None:
+        self._parts.append(text)
+
+    def getvalue(self) -> str:
+        """Return everything written so far."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+
+class CallbackOutput(OutputSink):
+    """Pass output to a callback in chunks of about `chunk_size` characters."""
+
+    def __init__(
+        self,
+        callback: Callable[[str], None],
+        chunk_size: int = DEFAULT_BLOCK_SIZE,
+        max_output: Optional[int] = None,
+    ):
+        """Initialize the sink.
+
+        Args:
+            callback: Called with each chunk of output text.
+            chunk_size: Output is collected until at least this many
+                characters are pending; 0 calls back on every write.
+            max_output: Maximum number of characters, or None.
+        """
+        super().__init__(max_output)
+        self.callback = callback
+        self.chunk_size = chunk_size
+        self._pending: List[str] = []
+        self._pending_size = 0
+
+    def _emit(self, text: str) -> None:
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            chunk = "".join(self._pending)
+            self._pending = []
+            self._pending_size = 0
+            self.callback(chunk)
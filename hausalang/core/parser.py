@@ -11,8 +11,8 @@ Key Design Principles:
 - AST nodes are immutable NamedTuples for clarity
 """
 
-from typing import List, Optional, Union
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Union
+from dataclasses import dataclass, field, replace
 
 from .lexer import Token
 from .errors import (
@@ -22,6 +22,9 @@ from .errors import (
     WithExpectedFrame,
 )
 
+if TYPE_CHECKING:
+    from .callgraph import CallGraph
+
 
 # ============================================================================
 # AST Node Definitions
@@ -41,6 +44,23 @@ class Program(ASTNode):
     """Root node: represents the entire program."""
 
     statements: List["Statement"]
+    # Cached analysis of this tree; copies made with replace() start empty
+    _call_graph: Optional["CallGraph"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def call_graph(self) -> "CallGraph":
+        """The call graph of the program's functions (see callgraph.py).
+
+        Built on first use and then cached with the tree.
+        """
+        if self._call_graph is None:
+            # callgraph.py imports this module
+            from .callgraph import build_call_graph
+
+            object.__setattr__(self, "_call_graph", build_call_graph(self))
+        return self._call_graph
 
 
 # Expressions (produce values)
@@ -602,8 +622,10 @@ class Parser:
         # Check for elif / else clauses
         else_body = None
 
-        # Handle any number of `kuma` (elif) clauses by chaining If nodes
-        current_if_node = None
+        # Handle any number of `kuma` (elif) clauses. AST nodes are frozen,
+        # so the chain of If nodes is built from the innermost one once
+        # every clause has been parsed.
+        elif_clauses = []
         while self.match("KEYWORD_ELIF"):
             # consume 'kuma'
             self.advance()
@@ -628,23 +650,16 @@ class Parser:
             elif_then = self.parse_block()
             self.expect("DEDENT", "Expected DEDENT after elif block")
 
-            new_if = If(
-                condition=elif_condition,
-                then_body=elif_then,
-                else_body=None,
-                line=colon_token.line if colon_token else if_token.line,
-                column=colon_token.column if colon_token else if_token.column,
+            elif_clauses.append(
+                If(
+                    condition=elif_condition,
+                    then_body=elif_then,
+                    else_body=None,
+                    line=colon_token.line if colon_token else if_token.line,
+                    column=colon_token.column if colon_token else if_token.column,
+                )
             )
 
-            if current_if_node is None:
-                # attach as the primary else_body (as a single-statement list)
-                else_body = [new_if]
-                current_if_node = new_if
-            else:
-                # chain onto the previous elif's else_body
-                current_if_node.else_body = [new_if]
-                current_if_node = new_if
-
         # Finally handle a plain else: 'in ba haka ba'
         if self.match("KEYWORD_ELSE"):
             # 'in ba haka ba' is tokenized as 4 separate KEYWORD_ELSE tokens
@@ -675,10 +690,11 @@ class Parser:
             # Expect DEDENT
             self.expect("DEDENT", "Expected DEDENT after else block")
 
-            if current_if_node is None:
-                else_body = else_block
-            else:
-                current_if_node.else_body = else_block
+            else_body = else_block
+
+        for elif_node in reversed(elif_clauses):
+            else_body = [replace(elif_node, else_body=else_body)]
+
         return If(
             condition=condition,
             then_body=then_body,
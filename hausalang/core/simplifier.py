@@ -0,0 +1,369 @@
+"""
+Algebraic Simplification for Hausalang
+
+Two optimizer passes that rewrite operator expressions using the operand
+types inferred by type_inference.py:
+
+- algebraic_simplification: operations that return their operand
+  unchanged, such as `x + 0`, `x * 1`, `x / 1`, `"" + s`, `+x` and `-(-x)`,
+  are replaced by that operand
+- common_subexpressions: an operator expression that occurs more than once
+  in the same expression is evaluated once, into a hidden temporary that
+  every occurrence reads (see optimizer.Let)
+
+Key Design:
+- An identity only holds for some operand types: `x + 0` turns a float
+  -0.0 into 0.0 and a bool into an int, and `x * 1.0` turns an int into a
+  float. A rewrite therefore needs the operand's type to be known exactly
+  and listed for that identity
+- A shared subexpression is computed before the rest of its expression,
+  so only subexpressions that can never raise are shared: every operand
+  type is known exactly (so names are assigned) and no operation can fail
+  for those types. Computing one early can then not change which error a
+  program raises, or when
+- There is no strength reduction of `x * 2` into `x + x`: in the
+  interpreters every operator costs the same, so only removing operations
+  saves time. (`i % 2 == 0` is already a ModuloTest superinstruction.)
+"""
+
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from . import parser
+from .optimizer import (
+    TEMPORARY_PREFIX,
+    Let,
+    OptimizerStats,
+    Rewriter,
+    literal_value,
+)
+from .type_inference import TypeInfo, TypeSet, infer_types
+
+_LITERALS = (parser.Number, parser.String, parser.NoneValue)
+
+_NUMBERS: FrozenSet[type] = frozenset((int, float))
+
+
+# Literals are told apart by type and repr: 0 == 0.0 == -0.0 == False, but
+# they are not interchangeable here
+LiteralKey = Tuple[type, str]
+
+
+def _identities(
+    table: List[Tuple[str, Any, FrozenSet[type]]]
+) -> Dict[Tuple[str, LiteralKey], FrozenSet[type]]:
+    return {(op, (type(value), repr(value))): types for op, value, types in table}
+
+
+# `x <op> literal` is `x` when x has one of the listed types
+_RIGHT_IDENTITIES = _identities(
+    [
+        ("+", 0, frozenset((int,))),
+        ("+", "", frozenset((str,))),
+        ("-", 0, _NUMBERS),
+        ("-", 0.0, frozenset((float,))),
+        ("*", 1, _NUMBERS),
+        ("*", 1.0, frozenset((float,))),
+        ("/", 1, _NUMBERS),
+        ("/", 1.0, frozenset((float,))),
+    ]
+)
+
+# `literal <op> x` is `x` when x has one of the listed types
+_LEFT_IDENTITIES = _identities(
+    [
+        ("+", 0, frozenset((int,))),
+        ("+", "", frozenset((str,))),
+        ("*", 1, _NUMBERS),
+        ("*", 1.0, frozenset((float,))),
+    ]
+)
+
+# Fewest operator evaluations sharing a subexpression must save. Binding
+# and reading back a temporary costs about as much as two or three typed
+# operations, so `(i * i + 1) * (i * i + 1)` is left alone
+MIN_SAVED_OPERATIONS = 3
+
+
+def _exact(types: TypeSet) -> Optional[type]:
+    """Return the only type in `types`, or None if there are several."""
+    if len(types) != 1:
+        return None
+    (only,) = types
+    return only
+
+
+def _literal_key(expr: parser.Expression) -> Optional[LiteralKey]:
+    if not isinstance(expr, _LITERALS):
+        return None
+    value = literal_value(expr)
+    return type(value), repr(value)
+
+
+# ============================================================================
+# Algebraic Simplification
+# ============================================================================
+
+
+class _Simplifier(Rewriter):
+    """Replaces identity operations with their operand."""
+
+    pass_name = "algebraic_simplification"
+
+    def __init__(self, info: TypeInfo, stats: Optional[OptimizerStats] = None):
+        super().__init__(stats)
+        self.info = info
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        # Types are looked up on the original nodes, before they are rebuilt
+        if isinstance(expr, parser.BinaryOp):
+            left_type, right_type = map(_exact, self.info.operand_types(expr))
+            expr = super().expression(expr)
+            operand = self.binary_identity(expr, left_type, right_type)
+        elif isinstance(expr, parser.UnaryOp):
+            inner = expr.operand
+            if isinstance(inner, parser.UnaryOp) and inner.operator == "-":
+                inner_type = _exact(self.info.type_of(inner.operand))
+            else:
+                inner_type = None
+            operand_type = _exact(self.info.type_of(inner))
+            expr = super().expression(expr)
+            operand = self.unary_identity(expr, operand_type, inner_type)
+        else:
+            return super().expression(expr)
+
+        if operand is None:
+            return expr
+        self.rewrote()
+        return operand
+
+    def binary_identity(
+        self,
+        expr: parser.BinaryOp,
+        left_type: Optional[type],
+        right_type: Optional[type],
+    ) -> Optional[parser.Expression]:
+        """Return the operand `expr` always evaluates to, if any."""
+        right = _literal_key(expr.right)
+        if right is not None:
+            types = _RIGHT_IDENTITIES.get((expr.operator, right))
+            if types is not None and left_type in types:
+                return expr.left
+        left = _literal_key(expr.left)
+        if left is not None:
+            types = _LEFT_IDENTITIES.get((expr.operator, left))
+            if types is not None and right_type in types:
+                return expr.right
+        return None
+
+    def unary_identity(
+        self,
+        expr: parser.UnaryOp,
+        operand_type: Optional[type],
+        inner_type: Optional[type],
+    ) -> Optional[parser.Expression]:
+        """Return the expression `+x` or `-(-x)` always evaluates to, if any."""
+        if expr.operator == "+" and operand_type in _NUMBERS:
+            return expr.operand
+        if (
+            expr.operator == "-"
+            and isinstance(expr.operand, parser.UnaryOp)
+            and expr.operand.operator == "-"
+            and inner_type in _NUMBERS
+        ):
+            return expr.operand.operand
+        return None
+
+
+def simplify_algebra(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Algebraic simplification pass."""
+    return _Simplifier(infer_types(program), stats).program(program)
+
+
+# ============================================================================
+# Common Subexpression Elimination
+# ============================================================================
+
+# Operand type pairs for which an operator never raises. Mixed int and float
+# arithmetic is left out: converting a huge int to float overflows
+_ORDERED = frozenset([(a, b) for a in _NUMBERS for b in _NUMBERS] + [(str, str)])
+_SAFE_OPERANDS: Dict[str, FrozenSet[Tuple[type, type]]] = {
+    "+": frozenset(((int, int), (float, float), (str, str))),
+    "-": frozenset(((int, int), (float, float))),
+    "*": frozenset(((int, int), (float, float))),
+    "<": _ORDERED,
+    ">": _ORDERED,
+    "<=": _ORDERED,
+    ">=": _ORDERED,
+}
+
+
+class _SubexpressionSharer(Rewriter):
+    """Evaluates repeated safe subexpressions of an expression once."""
+
+    pass_name = "common_subexpressions"
+
+    def __init__(
+        self,
+        info: TypeInfo,
+        temporaries: int,
+        stats: Optional[OptimizerStats] = None,
+    ):
+        super().__init__(stats)
+        self.info = info
+        self.temporaries = temporaries
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        # Called once for every whole expression of a statement
+        occurrences: Dict[Any, List[parser.Expression]] = {}
+        self.collect(expr, occurrences)
+
+        shared: Dict[int, str] = {}
+        bindings: List[Tuple[Optional[str], parser.Expression]] = []
+        inside: Set[int] = set()
+        for key in sorted(occurrences, key=_operator_count, reverse=True):
+            nodes = occurrences[key]
+            if (len(nodes) - 1) * _operator_count(key) < MIN_SAVED_OPERATIONS:
+                continue
+            if any(id(node) in inside for node in nodes):
+                # Part of a larger shared subexpression; a later round
+                # shares whatever repeats are left
+                continue
+            self.temporaries += 1
+            name = f"{TEMPORARY_PREFIX}cse{self.temporaries}"
+            bindings.append((name, nodes[0]))
+            for node in nodes:
+                shared[id(node)] = name
+                _add_descendants(node, inside)
+
+        if not bindings:
+            return expr
+        self.rewrote(len(bindings))
+        body = _Replacer(shared).expression(expr)
+        return Let(line=expr.line, column=expr.column, bindings=bindings, body=body)
+
+    def collect(
+        self, expr: parser.Expression, occurrences: Dict[Any, List[parser.Expression]]
+    ) -> Optional[Any]:
+        """Record every safe operator subexpression of `expr` by its shape.
+
+        Returns:
+            The shape of `expr` if it is safe to evaluate early, else None.
+        """
+        key: Optional[Any] = None
+        if isinstance(expr, _LITERALS):
+            value = literal_value(expr)
+            return ("literal", type(value), repr(value))
+
+        elif isinstance(expr, parser.Identifier):
+            if expr.name.startswith(TEMPORARY_PREFIX):
+                # May be a temporary of a Let inside this expression
+                return None
+            return ("name", expr.name)
+
+        elif isinstance(expr, parser.BinaryOp):
+            left_types, right_types = self.info.operand_types(expr)
+            left = self.collect(expr.left, occurrences)
+            right = self.collect(expr.right, occurrences)
+            operands = (_exact(left_types), _exact(right_types))
+            if left is not None and right is not None and self.safe(expr, operands):
+                key = (expr.operator, left, right)
+
+        elif isinstance(expr, parser.UnaryOp):
+            operand = self.collect(expr.operand, occurrences)
+            if operand is not None and _exact(self.info.type_of(expr.operand)) in (
+                int,
+                float,
+            ):
+                key = ("unary", expr.operator, operand)
+
+        elif isinstance(expr, parser.FunctionCall):
+            for argument in expr.arguments:
+                self.collect(argument, occurrences)
+
+        elif isinstance(expr, Let):
+            for _, value in expr.bindings:
+                self.collect(value, occurrences)
+            self.collect(expr.body, occurrences)
+
+        if key is not None:
+            occurrences.setdefault(key, []).append(expr)
+        return key
+
+    def safe(
+        self, expr: parser.BinaryOp, operands: Tuple[Optional[type], Optional[type]]
+    ) -> bool:
+        """Return True if `expr` cannot raise for its operand types."""
+        if None in operands:
+            return False
+        if expr.operator in ("==", "!="):
+            return True
+        if expr.operator in ("/", "%"):
+            # Only a division by a non-zero literal of the same type
+            left_type, right_type = operands
+            return (
+                left_type in _NUMBERS
+                and left_type is right_type
+                and isinstance(expr.right, parser.Number)
+                and expr.right.value != 0
+            )
+        return operands in _SAFE_OPERANDS.get(expr.operator, ())
+
+
+class _Replacer(Rewriter):
+    """Replaces the given nodes, by id, with reads of their temporary."""
+
+    def __init__(self, names: Dict[int, str]):
+        super().__init__()
+        self.names = names
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        name = self.names.get(id(expr))
+        if name is not None:
+            return parser.Identifier(line=expr.line, column=expr.column, name=name)
+        return super().expression(expr)
+
+
+def _operator_count(key: Any) -> int:
+    """Count the operators in a subexpression shape built by `collect`."""
+    if key[0] in ("literal", "name"):
+        return 0
+    return 1 + sum(_operator_count(part) for part in key[1:] if type(part) is tuple)
+
+
+def _add_descendants(expr: parser.Expression, ids: Set[int]) -> None:
+    """Add the ids of the nodes strictly inside `expr` to `ids`."""
+    for value in vars(expr).values():
+        if isinstance(value, parser.ASTNode):
+            ids.add(id(value))
+            _add_descendants(value, ids)
+
+
+def _last_temporary(node: Any) -> int:
+    """Return the highest `$cseN` temporary number used under `node`."""
+    last = 0
+    if isinstance(node, Let):
+        for name, _ in node.bindings:
+            if name is not None and name.startswith(TEMPORARY_PREFIX + "cse"):
+                last = max(last, int(name[len(TEMPORARY_PREFIX) + 3 :]))
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            last = max(last, _last_temporary(item))
+    elif isinstance(node, parser.ASTNode):
+        for value in vars(node).values():
+            if isinstance(value, (list, tuple, parser.ASTNode)):
+                last = max(last, _last_temporary(value))
+    return last
+
+
+def share_subexpressions(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Common subexpression elimination pass.
+
+    Temporaries are numbered program-wide, after those of earlier rounds,
+    so a Let never rebinds a temporary of a Let around it.
+    """
+    info = infer_types(program)
+    return _SubexpressionSharer(info, _last_temporary(program), stats).program(program)
@@ -0,0 +1,387 @@
+"""
+Explicit-Stack Interpreter for Hausalang
+
+This module implements an evaluation mode that executes the same AST as
+`Interpreter` without using Python recursion for nested expressions,
+statements or Hausalang function calls.
+
+Key Design:
+- Every compound node is evaluated by a generator "frame"
+- A frame asks for a sub-result by yielding the child's frame (or, for
+  leaves such as numbers and names, the child's value directly)
+- A single driver loop keeps the pending frames on a heap-allocated list and
+  resumes the top frame with the result of the frame that just finished
+- Call depth is therefore limited by memory and `max_call_depth`, not by
+  CPython's recursion limit; exceeding it raises RecursionError, which the
+  public API reports as ErrorKind.STACK_OVERFLOW
+
+Performance: every nested expression and block costs a generator frame,
+and two of `Interpreter`'s loop fast paths are not used here. `kadai`
+loops are never handed to their compiled versions (hot_loops.py), and
+`don` loops over integers step the loop variable through the environment
+instead of a native range(). Loop-heavy programs therefore run several
+times slower than on `Interpreter`; choose this engine for deep
+recursion (main.py --stack, or "stack" in a /api/execute request).
+"""
+
+from types import GeneratorType
+from typing import Any, Generator, List, Optional
+
+from . import parser
+from .interpreter import (
+    Environment,
+    Interpreter,
+    LeafFrame,
+    ReturnValue,
+    TailCall,
+    is_comparison,
+)
+from .optimizer import HoistedLoop, Let
+from .output import OutputSink
+from .superinstructions import FusedCondition, Increment
+from .type_inference import TypedBinaryOp
+
+# Default bound on nested Hausalang calls. Each level costs a handful of
+# small generator objects, so this is far above what CPython's own recursion
+# limit allows the tree-walking interpreter.
+DEFAULT_MAX_CALL_DEPTH = 100_000
+
+Frame = Generator[Any, Any, Any]
+
+
+class StackInterpreter(Interpreter):
+    """Interpreter whose evaluation stack lives on the heap.
+
+    Drop-in replacement for `Interpreter`: `interpret`, `execute_statement`
+    and `eval_expression` keep their signatures, but run on an explicit
+    frame stack.
+    """
+
+    def __init__(
+        self,
+        max_call_depth: Optional[int] = DEFAULT_MAX_CALL_DEPTH,
+        output: Optional[OutputSink] = None,
+        max_steps: Optional[int] = None,
+        memoize: bool = False,
+    ):
+        """Initialize the interpreter.
+
+        Args:
+            max_call_depth: Maximum number of nested function calls, or None
+                for no limit other than available memory.
+            output: Where `rubuta` output goes (see Interpreter).
+            max_steps: Step budget for each run (see Interpreter).
+            memoize: Whether calls to pure functions are cached (see
+                Interpreter).
+        """
+        super().__init__(output=output, max_steps=max_steps, memoize=memoize)
+        self.max_call_depth = max_call_depth
+        self.call_depth = 0
+
+    # ========================================================================
+    # Entry Points
+    # ========================================================================
+
+    def execute_statement(
+        self, stmt: parser.Statement, env: Environment
+    ) -> Optional[ReturnValue]:
+        """Execute a statement on the explicit stack."""
+        return self.run_frame(self.statement_frame(stmt, env))
+
+    def eval_expression(self, expr: parser.Expression, env: Environment) -> Any:
+        """Evaluate an expression on the explicit stack."""
+        return self.run_frame(self.expression_frame(expr, env))
+
+    def run_frame(self, frame: Any) -> Any:
+        """Drive a frame (and every frame it spawns) to completion.
+
+        Args:
+            frame: A generator frame, or an already-computed value.
+
+        Returns:
+            The value produced by the frame.
+        """
+        if type(frame) is not GeneratorType:
+            return frame
+
+        stack: List[Frame] = [frame]
+        value = None
+        depth = self.call_depth
+        try:
+            while True:
+                try:
+                    child = stack[-1].send(value)
+                except StopIteration as done:
+                    stack.pop()
+                    value = done.value
+                    if not stack:
+                        return value
+                    continue
+
+                if type(child) is GeneratorType:
+                    stack.append(child)
+                    value = None
+                else:
+                    # Leaf result: hand it straight back to the same frame
+                    value = child
+        except BaseException:
+            # The frames waiting on the failed one never resume. Close them,
+            # innermost first, so their `finally` clauses (which remove
+            # hidden temporaries) run now, as they would during unwinding
+            for abandoned in reversed(stack):
+                abandoned.close()
+            raise
+        finally:
+            # Unwinding on error abandons the suspended call frames
+            self.call_depth = depth
+
+    # ========================================================================
+    # Statement Frames
+    # ========================================================================
+
+    def block_frame(self, statements: List[parser.Statement], env: Environment):
+        """Frame that executes a list of statements in order."""
+        for stmt in statements:
+            completion = yield self.statement_frame(stmt, env)
+            if completion is not None:
+                return completion
+        return None
+
+    def statement_frame(self, stmt: parser.Statement, env: Environment):
+        """Frame that executes a single statement."""
+        if isinstance(stmt, parser.Assignment):
+            value = yield self.expression_frame(stmt.value, env)
+            env.define_variable(stmt.name, value)
+
+        elif isinstance(stmt, Increment):
+            self.execute_increment(stmt, env)
+
+        elif isinstance(stmt, parser.Print):
+            value = yield self.expression_frame(stmt.expression, env)
+            self.output.write(str(value))
+
+        elif isinstance(stmt, parser.Return):
+            return (yield self.return_frame(stmt, env))
+
+        elif isinstance(stmt, parser.If):
+            condition = yield self.expression_frame(stmt.condition, env)
+            if not is_comparison(stmt.condition):
+                condition = self.is_truthy(condition)
+            if condition:
+                return (yield self.block_frame(stmt.then_body, env))
+            elif stmt.else_body:
+                return (yield self.block_frame(stmt.else_body, env))
+
+        elif isinstance(stmt, parser.While):
+            comparison = is_comparison(stmt.condition)
+            while True:
+                condition = yield self.expression_frame(stmt.condition, env)
+                if not (condition if comparison else self.is_truthy(condition)):
+                    break
+                completion = yield self.block_frame(stmt.body, env)
+                if completion is not None:
+                    return completion
+                if self.steps_left is not None:
+                    self.count_step()
+
+        elif isinstance(stmt, parser.For):
+            return (yield self.for_frame(stmt, env))
+
+        elif isinstance(stmt, parser.Function):
+            self.execute_function_def(stmt, env)
+
+        elif isinstance(stmt, parser.ExpressionStatement):
+            yield self.expression_frame(stmt.expression, env)
+
+        elif isinstance(stmt, HoistedLoop):
+            if not self.define_temporaries(stmt, env):
+                return (yield self.statement_frame(stmt.original, env))
+            try:
+                return (yield self.statement_frame(stmt.loop, env))
+            finally:
+                self.drop_temporaries(stmt, env)
+
+        else:
+            raise RuntimeError(f"Unknown statement type: {type(stmt)}")
+
+        return None
+
+    def return_frame(self, stmt: parser.Return, env: Environment):
+        """Frame that executes a return (same semantics as execute_return)."""
+        target = self._tail_calls.get(id(stmt))
+        if target is None:
+            value = yield self.expression_frame(stmt.expression, env)
+            return ReturnValue(value)
+
+        call = stmt.expression
+        arg_values = []
+        for arg in call.arguments:
+            arg_values.append((yield self.expression_frame(arg, env)))
+        if self.resolve_call_site(call, env).function is target:
+            return TailCall(arg_values)
+        value = yield self.invoke_frame(call, arg_values, env)
+        return ReturnValue(value)
+
+    def for_frame(self, stmt: parser.For, env: Environment):
+        """Frame that executes a for loop (same semantics as execute_for)."""
+        start_value = yield self.expression_frame(stmt.start, env)
+        end_value = yield self.expression_frame(stmt.end, env)
+
+        step_value = 1
+        if stmt.step is not None:
+            step_value = yield self.expression_frame(stmt.step, env)
+
+        if step_value == 0:
+            raise ValueError("For loop step cannot be zero")
+        if not isinstance(step_value, (int, float)):
+            raise TypeError(f"For loop step must be numeric, got {type(step_value)}")
+
+        env.define_variable(stmt.var, start_value)
+
+        if step_value < 0:
+            if stmt.direction == "ascending":
+                raise ValueError(
+                    f"For loop: ascending (zuwa) direction requires positive step, "
+                    f"got {step_value}"
+                )
+            raise ValueError(
+                f"For loop: descending (ba) direction requires positive step, "
+                f"got {step_value}"
+            )
+
+        ascending = stmt.direction == "ascending"
+        while (
+            env.get_variable(stmt.var) < end_value
+            if ascending
+            else env.get_variable(stmt.var) > end_value
+        ):
+            completion = yield self.block_frame(stmt.body, env)
+            if completion is not None:
+                return completion
+            if self.steps_left is not None:
+                self.count_step()
+
+            current = env.get_variable(stmt.var)
+            if ascending:
+                env.define_variable(stmt.var, current + step_value)
+            else:
+                env.define_variable(stmt.var, current - step_value)
+
+        return None
+
+    # ========================================================================
+    # Expression Frames
+    # ========================================================================
+
+    def expression_frame(self, expr: parser.Expression, env: Environment) -> Any:
+        """Return a frame that evaluates `expr`.
+
+        Leaves (and fused conditions, whose operands are all leaves) are
+        evaluated immediately and returned as plain values, so the common
+        case of a name or literal operand never allocates a frame.
+        """
+        if isinstance(expr, parser.Number):
+            return expr.value
+
+        elif isinstance(expr, parser.String):
+            return expr.value
+
+        elif isinstance(expr, parser.NoneValue):
+            return None
+
+        elif isinstance(expr, parser.Identifier):
+            return env.get_variable(expr.name)
+
+        elif isinstance(expr, parser.BinaryOp):
+            return self.binary_frame(expr, env)
+
+        elif isinstance(expr, FusedCondition):
+            return self.eval_fused_condition(expr, env)
+
+        elif isinstance(expr, parser.UnaryOp):
+            return self.unary_frame(expr, env)
+
+        elif isinstance(expr, parser.FunctionCall):
+            return self.call_frame(expr, env)
+
+        elif isinstance(expr, Let):
+            return self.let_frame(expr, env)
+
+        else:
+            raise RuntimeError(f"Unknown expression type: {type(expr)}")
+
+    def binary_frame(self, expr: parser.BinaryOp, env: Environment):
+        """Frame that evaluates a binary operation."""
+        left = yield self.expression_frame(expr.left, env)
+        right = yield self.expression_frame(expr.right, env)
+        if type(expr) is TypedBinaryOp:
+            return expr.operation(left, right)
+        return self.apply_binary_op(expr.operator, left, right)
+
+    def unary_frame(self, expr: parser.UnaryOp, env: Environment):
+        """Frame that evaluates a unary operation."""
+        operand = yield self.expression_frame(expr.operand, env)
+        return self.apply_unary_op(expr.operator, operand)
+
+    def let_frame(self, expr: Let, env: Environment):
+        """Frame that evaluates an inlined call (same semantics as eval_let)."""
+        bound = False
+        try:
+            for name, value in expr.bindings:
+                value = yield self.expression_frame(value, env)
+                if name is not None:
+                    env.define_variable(name, value)
+                    bound = True
+            return (yield self.expression_frame(expr.body, env))
+        finally:
+            if bound:
+                self.drop_bindings(expr, env)
+
+    def call_frame(self, expr: parser.FunctionCall, env: Environment):
+        """Frame that evaluates a function call."""
+        arg_values = []
+        for arg in expr.arguments:
+            arg_values.append((yield self.expression_frame(arg, env)))
+        return (yield self.invoke_frame(expr, arg_values, env))
+
+    def invoke_frame(
+        self, expr: parser.FunctionCall, arg_values: List[Any], env: Environment
+    ):
+        """Frame that runs a function body with already-evaluated arguments.
+
+        Raises:
+            RecursionError: If the call would exceed `max_call_depth`.
+        """
+        memo = self.function_memo(expr, env) if self.memoize else None
+        if memo is not None:
+            key = memo.key(arg_values)
+            if key in memo.cache:
+                memo.hits += 1
+                memo.cache.move_to_end(key)
+                return memo.cache[key]
+            memo.misses += 1
+
+        func, func_env = self.enter_function(expr, arg_values, env)
+
+        if self.max_call_depth is not None and self.call_depth >= self.max_call_depth:
+            raise RecursionError(
+                f"Maximum call depth exceeded ({self.max_call_depth}) "
+                f"in function {expr.name}"
+            )
+
+        self.call_depth += 1
+        completion = yield self.block_frame(func.body, func_env)
+        while type(completion) is TailCall:
+            if self.steps_left is not None:
+                self.count_step()
+            for param_name, arg_value in zip(func.parameters, completion.arguments):
+                func_env.define_variable(param_name, arg_value)
+            completion = yield self.block_frame(func.body, func_env)
+        self.call_depth -= 1
+        if type(func_env) is LeafFrame:
+            self.release_frame(func_env)
+
+        value = completion.value if completion is not None else None
+        if memo is not None:
+            memo.store(key, value)
+        return value
@@ -0,0 +1,218 @@
+"""
+Superinstructions for Hausalang
+
+This module implements a rewriting pass that replaces a few very common
+statement and condition shapes with fused AST nodes. The interpreter runs a
+fused node in one step instead of dispatching on every child node and
+looking each name up separately.
+
+Fused shapes:
+- `x = x + c` and `x = x - c` (c a number literal) become Increment
+- `x < c` as an `idan`/`kadai` condition becomes CompareConst
+- `x < y` as an `idan`/`kadai` condition becomes CompareNames
+- `a % b == c` and `a % b != c` as a condition become ModuloTest
+
+(`<` stands for any comparison operator.) Fused nodes keep the line and
+column of the node they replace and evaluate exactly like it, including
+the errors they raise.
+"""
+
+from dataclasses import dataclass, replace
+from typing import List, Optional, Union
+
+from . import parser
+from .optimizer import HoistedLoop
+
+COMPARISON_OPERATORS = ("==", "!=", ">", "<", ">=", "<=")
+
+
+# ============================================================================
+# Fused Node Definitions
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class Increment(parser.ASTNode):
+    """`name = name + amount` or `name = name - amount`."""
+
+    name: str
+    operator: str  # "+" or "-"
+    amount: Union[int, float]
+
+
+@dataclass(frozen=True)
+class FusedCondition(parser.ASTNode):
+    """Base class for fused comparison expressions."""
+
+
+@dataclass(frozen=True)
+class CompareConst(FusedCondition):
+    """`name <operator> value` where value is a number literal."""
+
+    name: str
+    operator: str  # comparison operator
+    value: Union[int, float]
+
+
+@dataclass(frozen=True)
+class CompareNames(FusedCondition):
+    """`left <operator> right` where both sides are variable names."""
+
+    left: str
+    operator: str  # comparison operator
+    right: str
+
+
+@dataclass(frozen=True)
+class ModuloTest(FusedCondition):
+    """`dividend % divisor <operator> value` with operator "==" or "!=".
+
+    The dividend and divisor are Identifier or Number nodes.
+    """
+
+    dividend: "parser.Expression"
+    divisor: "parser.Expression"
+    operator: str  # "==" or "!="
+    value: Union[int, float]
+
+
+# ============================================================================
+# Fusion Pass
+# ============================================================================
+
+
+def fuse_program(program: parser.Program) -> parser.Program:
+    """Return a copy of a program with superinstructions fused in.
+
+    Args:
+        program: The Program node from the parser.
+
+    Returns:
+        A new Program; nodes that have nothing to fuse are shared with the
+        original.
+    """
+    return replace(program, statements=fuse_block(program.statements))
+
+
+def fuse_block(statements: List[parser.Statement]) -> List[parser.Statement]:
+    """Fuse every statement in a block (recursively)."""
+    return [fuse_statement(stmt) for stmt in statements]
+
+
+def fuse_statement(stmt: parser.Statement) -> parser.Statement:
+    """Fuse a single statement and the blocks nested inside it.
+
+    Args:
+        stmt: The statement to rewrite.
+
+    Returns:
+        The fused statement, or `stmt` itself if nothing matched.
+    """
+    if isinstance(stmt, parser.Assignment):
+        return fuse_assignment(stmt) or stmt
+
+    elif isinstance(stmt, parser.If):
+        return replace(
+            stmt,
+            condition=fuse_condition(stmt.condition),
+            then_body=fuse_block(stmt.then_body),
+            else_body=fuse_block(stmt.else_body) if stmt.else_body else None,
+        )
+
+    elif isinstance(stmt, parser.While):
+        return replace(
+            stmt,
+            condition=fuse_condition(stmt.condition),
+            body=fuse_block(stmt.body),
+        )
+
+    elif isinstance(stmt, (parser.For, parser.Function)):
+        return replace(stmt, body=fuse_block(stmt.body))
+
+    elif isinstance(stmt, HoistedLoop):
+        return replace(
+            stmt,
+            loop=fuse_statement(stmt.loop),
+            original=fuse_statement(stmt.original),
+        )
+
+    return stmt
+
+
+def fuse_assignment(stmt: parser.Assignment) -> Optional[Increment]:
+    """Fuse `x = x + c` / `x = x - c`, or return None."""
+    value = stmt.value
+    if (
+        isinstance(value, parser.BinaryOp)
+        and value.operator in ("+", "-")
+        and isinstance(value.left, parser.Identifier)
+        and value.left.name == stmt.name
+        and isinstance(value.right, parser.Number)
+    ):
+        return Increment(
+            line=stmt.line,
+            column=stmt.column,
+            name=stmt.name,
+            operator=value.operator,
+            amount=value.right.value,
+        )
+    return None
+
+
+def fuse_condition(expr: parser.Expression) -> parser.Expression:
+    """Fuse an `idan`/`kadai` condition.
+
+    Args:
+        expr: The condition expression.
+
+    Returns:
+        A FusedCondition, or `expr` itself if it has none of the fused shapes.
+    """
+    if (
+        not isinstance(expr, parser.BinaryOp)
+        or expr.operator not in COMPARISON_OPERATORS
+    ):
+        return expr
+
+    left = expr.left
+    right = expr.right
+    if isinstance(left, parser.Identifier):
+        if isinstance(right, parser.Number):
+            return CompareConst(
+                line=expr.line,
+                column=expr.column,
+                name=left.name,
+                operator=expr.operator,
+                value=right.value,
+            )
+        if isinstance(right, parser.Identifier):
+            return CompareNames(
+                line=expr.line,
+                column=expr.column,
+                left=left.name,
+                operator=expr.operator,
+                right=right.name,
+            )
+
+    elif (
+        expr.operator in ("==", "!=")
+        and isinstance(left, parser.BinaryOp)
+        and left.operator == "%"
+        and _is_operand(left.left)
+        and _is_operand(left.right)
+        and isinstance(right, parser.Number)
+    ):
+        return ModuloTest(
+            line=expr.line,
+            column=expr.column,
+            dividend=left.left,
+            divisor=left.right,
+            operator=expr.operator,
+            value=right.value,
+        )
+
+    return expr
+
+
+def _is_operand(expr: parser.Expression) -> bool:
+    return isinstance(expr, (parser.Identifier, parser.Number))
@@ -0,0 +1,98 @@
+"""
+Wall-Clock Limits for Hausalang Programs
+
+The step budget (`Interpreter.max_steps`) bounds how many loop iterations
+and calls a program makes, not the work each of them does: a loop that
+squares an integer or doubles a string forty times stays far under any
+budget and still runs practically forever. A single big-int operation
+cannot be interrupted from inside the process, so a hard limit on running
+time needs a separate process that can be killed.
+
+`call_with_time_limit` runs a function in a child process and kills the
+child if it has not finished in time. Servers running untrusted code use
+it as a backstop alongside the step budget, which still stops ordinary
+runaway loops early and reports them as ErrorKind.INFINITE_LOOP.
+
+Children are started with "spawn", never by forking: the web server calls
+in from worker threads, and a child forked from a multi-threaded process
+can deadlock on a lock another thread held at the time of the fork.
+"""
+
+import multiprocessing
+from typing import Any, Callable
+
+
+class TimeLimitError(RuntimeError):
+    """Raised when a call runs past its wall-clock limit."""
+
+
+def _call_and_send(sender: Any, function: Callable, args: tuple, kwargs: dict):
+    """Run in the child: call `function` and send back its outcome."""
+    try:
+        outcome = (True, function(*args, **kwargs))
+    except BaseException as e:
+        outcome = (False, e)
+    try:
+        sender.send(outcome)
+    except Exception as e:
+        # The result or exception could not be pickled
+        ok, value = outcome
+        message = str(value) if not ok else f"Result could not be sent: {e}"
+        sender.send((False, RuntimeError(message)))
+    finally:
+        sender.close()
+
+
+def call_with_time_limit(
+    seconds: float, function: Callable, *args: Any, **kwargs: Any
+) -> Any:
+    """Call `function(*args, **kwargs)` in a child process, with a time limit.
+
+    The function, its arguments and its result must be picklable, and the
+    function importable from its module by a fresh interpreter. Output
+    the function writes goes to the child's stdout and stderr, so return
+    it (for example from a BufferOutput) instead.
+
+    Args:
+        seconds: Wall-clock limit for the call, including starting the
+            child.
+        function: The function to call; a module-level function.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        What the function returned.
+
+    Raises:
+        TimeLimitError: If the call did not finish within `seconds`; the
+            child is killed.
+        RuntimeError: If the child died without a result, or its exception
+            could not be pickled (the message is kept).
+        Exception: Whatever the function raised, if it can be pickled.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_call_and_send, args=(sender, function, args, kwargs), daemon=True
+    )
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(seconds):
+            raise TimeLimitError(f"Program ran for more than {seconds} seconds")
+        try:
+            ok, value = receiver.recv()
+        except EOFError:
+            process.join()
+            raise RuntimeError(
+                f"Program process exited without a result "
+                f"(exit code {process.exitcode})"
+            ) from None
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+    if not ok:
+        raise value
+    return value
@@ -0,0 +1,444 @@
+"""
+Static Type Inference for Hausalang
+
+Hausalang values are ints, floats, strings, booleans (from comparisons) and
+None, so the type of most expressions can be worked out before running a
+program. This module infers, for every expression, the set of types its
+value can have, and uses that to:
+
+- specialise BinaryOp nodes whose operand types are known exactly into
+  TypedBinaryOp nodes, which the interpreters evaluate without looking at
+  the operand types again (see the type_specialization optimizer pass)
+- report operations that fail with INVALID_OPERAND_TYPE whatever values
+  they see, before the program runs (see `check_types`)
+
+Key Design:
+- The analysis is flow-sensitive: it follows assignments in order, joins
+  the two branches of an `idan`, and iterates loops to a fixed point
+- Only names definitely assigned in the current scope have known types.
+  Scoping is dynamic, so any other name can come from whichever function
+  is calling and is treated as unknown (any type); the same goes for
+  function parameters and call results
+- Result types come from applying each operator to one sample value of
+  every type, so they follow Python's (and so the interpreter's) rules,
+  including int `/` being floor division
+"""
+
+import itertools
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from . import parser
+from .errors import ContextualError, ErrorKind, SourceLocation
+from .optimizer import (
+    HoistedLoop,
+    Let,
+    OptimizerStats,
+    Rewriter,
+    fold_binary,
+    fold_unary,
+)
+
+TypeSet = FrozenSet[type]
+
+NONE_TYPE = type(None)
+
+# Every type a Hausalang value can have
+ANY: TypeSet = frozenset((int, float, str, bool, NONE_TYPE))
+
+_SAMPLES: Dict[type, Any] = {int: 3, float: 2.5, str: "s", bool: True, NONE_TYPE: None}
+
+_BINARY_OPERATORS = ("+", "-", "*", "/", "%", "==", "!=", ">", "<", ">=", "<=")
+
+_PYTHON_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "%": operator.mod,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+
+
+def _result_type(op: str, left: type, right: type) -> Optional[type]:
+    """Return the type of `left op right`, or None if it raises TypeError."""
+    if op == "%" and left is str:
+        # String formatting: whether it fails depends on the string
+        return str
+    try:
+        return type(fold_binary(op, _SAMPLES[left], _SAMPLES[right]))
+    except TypeError:
+        return None
+
+
+# (operator, left type, right type) -> result type, None for a type error
+BINARY_RESULTS: Dict[Tuple[str, type, type], Optional[type]] = {
+    (op, left, right): _result_type(op, left, right)
+    for op in _BINARY_OPERATORS
+    for left in ANY
+    for right in ANY
+}
+
+
+def _unary_result_type(op: str, operand: type) -> Optional[type]:
+    try:
+        return type(fold_unary(op, _SAMPLES[operand]))
+    except TypeError:
+        return None
+
+
+UNARY_RESULTS: Dict[Tuple[str, type], Optional[type]] = {
+    (op, operand): _unary_result_type(op, operand)
+    for op in ("-", "+")
+    for operand in ANY
+}
+
+
+def binary_operation(op: str, left: type, right: type) -> Callable[[Any, Any], Any]:
+    """Return the Python function that evaluates `op` for these operand types.
+
+    Applied to values of those types it behaves exactly like
+    Interpreter.apply_binary_op, errors included.
+    """
+    if op == "/":
+        if issubclass(left, int) and issubclass(right, int):
+            return operator.floordiv
+        return operator.truediv
+    return _PYTHON_OPERATORS[op]
+
+
+@dataclass(frozen=True)
+class TypedBinaryOp(parser.BinaryOp):
+    """A BinaryOp whose operand types are known before the program runs.
+
+    `operation` computes the result directly from the two operand values.
+    """
+
+    left_type: type
+    right_type: type
+    operation: Callable[[Any, Any], Any] = field(compare=False, repr=False)
+
+
+# ============================================================================
+# Inference
+# ============================================================================
+
+State = Dict[str, TypeSet]
+
+
+def join(first: State, second: State) -> State:
+    """Merge the states at the end of two paths.
+
+    A name assigned on only one path may be unassigned after the merge, and
+    then reads whatever the calling scope has, so it is dropped (unknown).
+    """
+    return {
+        name: types | second[name] for name, types in first.items() if name in second
+    }
+
+
+class TypeInfo:
+    """The result of type inference over a program.
+
+    Attributes:
+        variables: The types of the top-level variables after the program
+            (unknown names are missing).
+        errors: Operations that raise a type error whatever their operand
+            values are, as ContextualErrors of kind INVALID_OPERAND_TYPE.
+    """
+
+    def __init__(self) -> None:
+        self.variables: State = {}
+        self.errors: List[ContextualError] = []
+        # Expression types by node id, with the node (keeps the id in use)
+        self._types: Dict[int, Tuple[parser.Expression, TypeSet]] = {}
+        # Operand types of every BinaryOp and UnaryOp, by node id
+        self._operands: Dict[int, Tuple[parser.BinaryOp, TypeSet, TypeSet]] = {}
+        self._unary_operands: Dict[int, Tuple[parser.UnaryOp, TypeSet]] = {}
+
+    def type_of(self, expr: parser.Expression) -> TypeSet:
+        """Return the types `expr` can have (ANY if it was not analysed)."""
+        entry = self._types.get(id(expr))
+        return entry[1] if entry is not None else ANY
+
+    def operand_types(self, expr: parser.BinaryOp) -> Tuple[TypeSet, TypeSet]:
+        """Return the types the operands of a BinaryOp can have."""
+        entry = self._operands.get(id(expr))
+        return (entry[1], entry[2]) if entry is not None else (ANY, ANY)
+
+
+class TypeInferencer:
+    """Computes a TypeInfo for a program."""
+
+    def __init__(self) -> None:
+        self.info = TypeInfo()
+
+    def program(self, program: parser.Program) -> TypeInfo:
+        self.info.variables = self.block(program.statements, {})
+        self.info.errors = self.find_errors()
+        return self.info
+
+    # -- statements ---------------------------------------------------------
+
+    def block(self, statements: List[parser.Statement], state: State) -> State:
+        for stmt in statements:
+            state = self.statement(stmt, state)
+        return state
+
+    def statement(self, stmt: parser.Statement, state: State) -> State:
+        """Analyse a statement; return the state after it."""
+        if isinstance(stmt, parser.Assignment):
+            value = self.expression(stmt.value, state)
+            return {**state, stmt.name: value}
+
+        elif isinstance(
+            stmt, (parser.Print, parser.Return, parser.ExpressionStatement)
+        ):
+            self.expression(stmt.expression, state)
+
+        elif isinstance(stmt, parser.If):
+            self.expression(stmt.condition, state)
+            return join(
+                self.block(stmt.then_body, state),
+                self.block(stmt.else_body or [], state),
+            )
+
+        elif isinstance(stmt, parser.While):
+            return self.loop(stmt, state)
+
+        elif isinstance(stmt, parser.For):
+            start = self.expression(stmt.start, state)
+            self.expression(stmt.end, state)
+            if stmt.step is not None:
+                self.expression(stmt.step, state)
+            return self.loop(stmt, {**state, stmt.var: start})
+
+        elif isinstance(stmt, parser.Function):
+            # The body runs in its own scope, where only the parameters are
+            # defined (and their types are unknown)
+            self.block(stmt.body, {name: ANY for name in stmt.parameters})
+
+        elif isinstance(stmt, HoistedLoop):
+            hoisted = dict(state)
+            for name, value in stmt.temporaries:
+                hoisted[name] = self.expression(value, state)
+            return join(
+                self.statement(stmt.loop, hoisted),
+                self.statement(stmt.original, state),
+            )
+
+        return state
+
+    def loop(self, stmt: parser.Statement, state: State) -> State:
+        """Iterate a While or For loop to a fixed point.
+
+        Returns:
+            The state at the loop head, which is also the state after it.
+        """
+        head = state
+        while True:
+            if isinstance(stmt, parser.While):
+                self.expression(stmt.condition, head)
+            after = self.block(stmt.body, head)
+            if isinstance(stmt, parser.For) and stmt.var in after:
+                step = (
+                    self.expression(stmt.step, state)
+                    if stmt.step is not None
+                    else frozenset((int,))
+                )
+                sign = "+" if stmt.direction == "ascending" else "-"
+                after = {**after, stmt.var: self.binary(sign, after[stmt.var], step)}
+            merged = join(head, after)
+            if merged == head:
+                return head
+            head = merged
+
+    # -- expressions --------------------------------------------------------
+
+    def expression(self, expr: parser.Expression, state: State) -> TypeSet:
+        """Analyse an expression; return and record the types of its value."""
+        if isinstance(expr, (parser.Number, parser.String)):
+            types = frozenset((type(expr.value),))
+
+        elif isinstance(expr, parser.NoneValue):
+            types = frozenset((NONE_TYPE,))
+
+        elif isinstance(expr, parser.Identifier):
+            types = state.get(expr.name, ANY)
+
+        elif isinstance(expr, parser.BinaryOp):
+            left = self.expression(expr.left, state)
+            right = self.expression(expr.right, state)
+            previous = self.info._operands.get(id(expr))
+            if previous is not None:
+                left, right = left | previous[1], right | previous[2]
+            self.info._operands[id(expr)] = (expr, left, right)
+            types = self.binary(expr.operator, left, right)
+
+        elif isinstance(expr, parser.UnaryOp):
+            operand = self.expression(expr.operand, state)
+            previous = self.info._unary_operands.get(id(expr))
+            if previous is not None:
+                operand = operand | previous[1]
+            self.info._unary_operands[id(expr)] = (expr, operand)
+            types = self.unary(expr.operator, operand)
+
+        elif isinstance(expr, parser.FunctionCall):
+            for arg in expr.arguments:
+                self.expression(arg, state)
+            types = ANY
+
+        elif isinstance(expr, Let):
+            bound = dict(state)
+            for name, value in expr.bindings:
+                value_types = self.expression(value, state)
+                if name is not None:
+                    bound[name] = value_types
+            types = self.expression(expr.body, bound)
+
+        else:
+            types = ANY
+
+        # An expression that always fails produces no value; ANY keeps one
+        # error from being reported again by every expression using it
+        types = types or ANY
+        previous_entry = self.info._types.get(id(expr))
+        if previous_entry is not None:
+            types = types | previous_entry[1]
+        self.info._types[id(expr)] = (expr, types)
+        return types
+
+    def binary(self, op: str, left: TypeSet, right: TypeSet) -> TypeSet:
+        """Return the result types of `op` over all operand type pairs."""
+        results = (
+            BINARY_RESULTS.get((op, left_type, right_type))
+            for left_type, right_type in itertools.product(left, right)
+        )
+        return frozenset(result for result in results if result is not None)
+
+    def unary(self, op: str, operand: TypeSet) -> TypeSet:
+        """Return the result types of a unary `op` over all operand types."""
+        results = (UNARY_RESULTS.get((op, operand_type)) for operand_type in operand)
+        return frozenset(result for result in results if result is not None)
+
+    # -- errors -------------------------------------------------------------
+
+    def find_errors(self) -> List[ContextualError]:
+        errors = []
+        for expr, left, right in self.info._operands.values():
+            if not self.binary(expr.operator, left, right):
+                errors.append(
+                    _type_error(
+                        expr,
+                        f"Operator '{expr.operator}' cannot be applied to "
+                        f"{_describe(left)} and {_describe(right)}",
+                    )
+                )
+        for expr, operand in self.info._unary_operands.values():
+            if not self.unary(expr.operator, operand):
+                errors.append(
+                    _type_error(
+                        expr,
+                        f"Unary operator '{expr.operator}' cannot be applied to "
+                        f"{_describe(operand)}",
+                    )
+                )
+        errors.sort(key=lambda error: (error.location.line, error.location.column))
+        return errors
+
+
+def _type_error(expr: parser.Expression, message: str) -> ContextualError:
+    return ContextualError(
+        kind=ErrorKind.INVALID_OPERAND_TYPE,
+        message=message,
+        location=SourceLocation(
+            file_path="<input>", line=expr.line, column=expr.column
+        ),
+        help="Ensure variable types match the operation (strings vs. numbers)",
+    )
+
+
+def _describe(types: TypeSet) -> str:
+    names = {
+        int: "int",
+        float: "float",
+        str: "str",
+        bool: "bool",
+        NONE_TYPE: "None",
+    }
+    return " or ".join(sorted(names[t] for t in types))
+
+
+def infer_types(program: parser.Program) -> TypeInfo:
+    """Infer the types of every expression in a program.
+
+    Args:
+        program: The Program node (parsed, optionally optimized).
+
+    Returns:
+        A TypeInfo.
+    """
+    return TypeInferencer().program(program)
+
+
+def check_types(program: parser.Program) -> List[ContextualError]:
+    """Find the operations in a program that always raise a type error.
+
+    Args:
+        program: The Program node.
+
+    Returns:
+        INVALID_OPERAND_TYPE errors in source order; empty if none.
+    """
+    return infer_types(program).errors
+
+
+# ============================================================================
+# Specialization Pass
+# ============================================================================
+
+
+class _Specializer(Rewriter):
+    """Turns BinaryOps with exactly known operand types into TypedBinaryOps."""
+
+    pass_name = "type_specialization"
+
+    def __init__(self, info: TypeInfo, stats: Optional[OptimizerStats] = None):
+        super().__init__(stats)
+        self.info = info
+
+    def expression(self, expr: parser.Expression) -> parser.Expression:
+        operands = self.info._operands.get(id(expr))
+        expr = super().expression(expr)
+        if operands is None or type(expr) is not parser.BinaryOp:
+            return expr
+        _, left, right = operands
+        if len(left) != 1 or len(right) != 1:
+            return expr
+        (left_type,) = left
+        (right_type,) = right
+        if BINARY_RESULTS.get((expr.operator, left_type, right_type)) is None:
+            return expr
+        self.rewrote()
+        return TypedBinaryOp(
+            line=expr.line,
+            column=expr.column,
+            left=expr.left,
+            operator=expr.operator,
+            right=expr.right,
+            left_type=left_type,
+            right_type=right_type,
+            operation=binary_operation(expr.operator, left_type, right_type),
+        )
+
+
+def specialize_types(
+    program: parser.Program, stats: Optional[OptimizerStats] = None
+) -> parser.Program:
+    """Type specialization pass."""
+    return _Specializer(infer_types(program), stats).program(program)
@@ -1,11 +1,13 @@
 """Directive processor for REPL Phase 2.
 
-Provides implementations for :vars, :funcs, :history, :load, :clear, :save, :info, :help
+Provides implementations for :vars, :funcs, :history, :load, :clear, :save, :info,
+:memo, :opt, :snapshot, :restore, :help
 """
 
 from __future__ import annotations
 
 from typing import Optional
+from hausalang.core.optimizer import OPT_LEVELS
 from hausalang.repl.session import ReplSession
 
 
@@ -90,7 +92,46 @@ class DirectiveProcessor:
                 return f"Function {name}() defined"
             return f"No such name: {name}"
 
+        if cmd == "snapshot":
+            name = args[0] if args else "default"
+            self.session.save_snapshot(name)
+            return f"Snapshot saved: {name}"
+
+        if cmd == "restore":
+            name = args[0] if args else "default"
+            if self.session.restore_snapshot(name):
+                return f"Restored snapshot: {name}"
+            return f"No such snapshot: {name}"
+
+        if cmd == "memo":
+            interpreter = self.session.interpreter
+            if args and args[0] in ("on", "off"):
+                interpreter.memoize = args[0] == "on"
+                return f"Memoization {args[0]}."
+            if args:
+                return "Usage: :memo [on|off]"
+            state = "on" if interpreter.memoize else "off"
+            out_lines = [f"Memoization is {state}."]
+            for stats in interpreter.memo_stats():
+                out_lines.append(
+                    f"{stats.function}(): {stats.hits} hits, "
+                    f"{stats.misses} misses, {stats.size} cached"
+                )
+            return "\n".join(out_lines)
+
+        if cmd == "opt":
+            if args and args[0] in [str(level) for level in OPT_LEVELS]:
+                self.session.opt_level = int(args[0])
+                self.session.opt_stats = None
+                return f"Optimization level {args[0]}."
+            if args:
+                return "Usage: :opt [0|1|2]"
+            out_lines = [f"Optimization level is {self.session.opt_level}."]
+            if self.session.opt_stats is not None:
+                out_lines.append(self.session.opt_stats.format())
+            return "\n".join(out_lines)
+
         if cmd == "help":
-            return ":vars, :funcs, :history [N], :load <file>, :save <file>, :clear, :info <name>, :exit"
+            return ":vars, :funcs, :history [N], :load <file>, :save <file>, :clear, :info <name>, :memo [on|off], :opt [0|1|2], :snapshot [name], :restore [name], :exit"
 
         return f"Unknown directive: :{cmd}"
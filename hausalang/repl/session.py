@@ -18,7 +18,8 @@ from typing import Any, Optional
 
 from ..core.lexer import tokenize_program
 from ..core import parser
-from ..core.interpreter import Interpreter
+from ..core.interpreter import Interpreter, Snapshot
+from ..core.optimizer import OptimizerOptions, OptimizerStats, optimize
 from ..core.errors import ContextualError
 from ..core.formatters import format_pretty
 
@@ -42,8 +43,14 @@ class ReplSession:
 
     def __init__(self, use_colors: Optional[bool] = None):
         self.interpreter = Interpreter()
+        # Named checkpoints of the session state (see :snapshot / :restore)
+        self.snapshots: dict[str, Snapshot] = {}
         self.history: list[str] = []
         self.command_count = 0
+        # Optimization level of the input (see :opt), and the optimizer
+        # statistics of the last optimized input
+        self.opt_level = 0
+        self.opt_stats: Optional[OptimizerStats] = None
         # auto-detect color support
         if use_colors is None:
             self.use_colors = sys.stdout.isatty()
@@ -68,7 +75,7 @@ class ReplSession:
 
         try:
             tokens = tokenize_program(source)
-            program = parser.parse(tokens)
+            program = self.optimize(parser.parse(tokens))
 
             # If program contains a single ExpressionStatement, evaluate and
             # return the expression value (REPL shows expression results by default).
@@ -76,9 +83,13 @@ class ReplSession:
                 program.statements[0], parser.ExpressionStatement
             ):
                 expr_stmt = program.statements[0]
-                value = self.interpreter.eval_expression(
-                    expr_stmt.expression, self.interpreter.global_env
-                )
+                try:
+                    value = self.interpreter.eval_expression(
+                        expr_stmt.expression, self.interpreter.global_env
+                    )
+                finally:
+                    # `interpret` flushes on its own; direct evaluation doesn't
+                    self.interpreter.output.flush()
                 elapsed = (time.time() - start) * 1000.0
                 return ExecutionResult(success=True, output=value, elapsed_ms=elapsed)
 
@@ -111,6 +122,19 @@ class ReplSession:
             elapsed = (time.time() - start) * 1000.0
             return ExecutionResult(success=False, error=ce, elapsed_ms=elapsed)
 
+    def optimize(self, program: parser.Program) -> parser.Program:
+        """Run the optimizer passes of `opt_level` over one input.
+
+        An input is only part of the session's program: later input can
+        reassign any variable or redefine any function, so the passes that
+        assume a whole program never run here.
+        """
+        options = OptimizerOptions.for_level(self.opt_level, whole_program=False)
+        if not options.any_enabled():
+            return program
+        self.opt_stats = OptimizerStats()
+        return optimize(program, options, self.opt_stats)
+
     def format_result(self, result: ExecutionResult) -> str:
         """Format ExecutionResult for display in interactive REPL.
 
@@ -146,15 +170,31 @@ class ReplSession:
     # Session management helpers
     # -------------------------
     def clear_state(self) -> None:
-        """Reset the session state (new Interpreter and empty history).
+        """Reset the session state (no variables or functions, empty history).
 
-        This preserves the REPL session object but clears all variables and
-        functions (useful for `:clear` directive).
+        This preserves the REPL session object, its interpreter and saved
+        snapshots but clears all variables and functions (useful for
+        `:clear` directive).
         """
-        self.interpreter = Interpreter()
+        self.interpreter.restore(Snapshot({}, {}))
         self.history = []
         self.command_count = 0
 
+    def save_snapshot(self, name: str) -> None:
+        """Checkpoint the current variables and functions under `name`."""
+        self.snapshots[name] = self.interpreter.snapshot()
+
+    def restore_snapshot(self, name: str) -> bool:
+        """Roll back to the snapshot saved under `name`.
+
+        Returns False if there is no such snapshot.
+        """
+        snapshot = self.snapshots.get(name)
+        if snapshot is None:
+            return False
+        self.interpreter.restore(snapshot)
+        return True
+
     def load_file(self, path: str) -> int:
         """Load a .ha file and execute its contents in the current session.
 
@@ -165,7 +205,7 @@ class ReplSession:
             src = f.read()
 
         tokens = tokenize_program(src)
-        program = parser.parse(tokens)
+        program = self.optimize(parser.parse(tokens))
         # Execute program (appends to current environment)
         self.interpreter.interpret(program)
         return len(program.statements)
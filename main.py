@@ -1,7 +1,10 @@
 import sys
-from core.interpreter import interpret_program
-from core.errors import ContextualError, SourceLocation
-from core.formatters import ErrorFormatter
+from hausalang.core.interpreter import Interpreter, interpret_program
+from hausalang.core.optimizer import OPT_LEVELS, OptimizerStats
+from hausalang.core.errors import ContextualError, SourceLocation
+from hausalang.core.formatters import ErrorFormatter
+from hausalang.core.output import DEFAULT_BLOCK_SIZE, StreamOutput
+from hausalang.core.stack_interpreter import StackInterpreter
 
 
 def main():
@@ -10,16 +13,45 @@ def main():
     Reads a .ha file, interprets it, and handles any errors that occur.
     Errors are formatted using ErrorFormatter for better readability.
 
+    Options:
+      --memo: Cache the results of pure functions (see core/memoize.py)
+      -O0, -O1, -O2: Optimization level (see core/optimizer.py); -O0, no
+        optimization, is the default
+      --opt-stats: Print the rewrites, node count change and time of each
+        optimizer pass to stderr; implies -O2 unless a level is given
+      --check-names: Report every undefined variable and function before
+        running anything (see core/checker.py)
+      --stack: Run on StackInterpreter, whose recursion depth is limited by
+        memory rather than Python's stack; loops run slower (see
+        core/stack_interpreter.py)
+
     Exit codes:
       0: Success
       1: User error (syntax, runtime, file not found, etc.)
       2: Internal/system error
     """
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    memoize = "--memo" in args
+    opt_stats = "--opt-stats" in args
+    check_names = "--check-names" in args
+    engine = StackInterpreter if "--stack" in args else Interpreter
+    levels = [arg for arg in args if arg.startswith("-O")]
+    flags = ("--memo", "--opt-stats", "--check-names", "--stack") + tuple(levels)
+    args = [arg for arg in args if arg not in flags]
+
+    opt_level = 2 if opt_stats else 0
+    if levels:
+        level = levels[-1][2:]
+        if level not in [str(number) for number in OPT_LEVELS]:
+            print("Kuskure: -O dole ya kasance -O0, -O1 ko -O2")
+            return 1
+        opt_level = int(level)
+
+    if not args:
         print("Kuskure: Babu fayil da aka bayar")
         return 1
 
-    filename = sys.argv[1]
+    filename = args[0]
 
     if not filename.endswith(".ha"):
         print("Kuskure: Fayil dole ya kasance .ha")
@@ -28,7 +60,20 @@ def main():
     try:
         with open(filename, "r", encoding="utf-8") as f:
             code = f.read()
-            interpret_program(code)
+        # Collect output and write it in large blocks rather than per rubuta
+        output = StreamOutput(sys.stdout, block_size=DEFAULT_BLOCK_SIZE)
+        stats = OptimizerStats() if opt_stats else None
+        try:
+            interpret_program(
+                code,
+                interpreter=engine(output=output, memoize=memoize),
+                opt_level=opt_level,
+                optimizer_stats=stats,
+                check_names=check_names,
+            )
+        finally:
+            if stats is not None and stats.rewrites:
+                print(stats.format(), file=sys.stderr)
         return 0  # Success
 
     except ContextualError as e:
@@ -0,0 +1,260 @@
+"""Micro-benchmarks for the Hausalang interpreter.
+
+Each benchmark is a small Hausalang program. The program is lexed, parsed
+and optimized once; only interpretation is timed (best of N runs, output
+discarded). With -O1 or -O2 the time the optimizer took is shown too, to
+weigh it against the run time it saves.
+
+Usage:
+    python scripts/benchmark.py              # run every benchmark
+    python scripts/benchmark.py fib          # run selected benchmarks
+    python scripts/benchmark.py -n 10 fib    # best of 10 runs
+    python scripts/benchmark.py -b           # capture output in a BufferOutput
+    python scripts/benchmark.py --no-fuse    # disable superinstructions
+    python scripts/benchmark.py -O2          # optimize at level 2 first
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from hausalang.core import parser  # noqa: E402
+from hausalang.core.interpreter import Interpreter  # noqa: E402
+from hausalang.core.lexer import tokenize_program  # noqa: E402
+from hausalang.core.optimizer import (  # noqa: E402
+    OPT_LEVELS,
+    OptimizerOptions,
+    optimize,
+)
+from hausalang.core.output import BufferOutput  # noqa: E402
+
+BENCHMARKS = {
+    "fib": """
+aiki fib(n):
+    idan n < 2:
+        mayar n
+    mayar fib(n - 1) + fib(n - 2)
+
+rubuta fib(20)
+""",
+    "nested_for": """
+total = 0
+don i = 0 zuwa 150:
+    don j = 0 zuwa 150:
+        total = total + j
+rubuta total
+""",
+    "tail_countdown": """
+aiki countdown(n, acc):
+    idan n == 0:
+        mayar acc
+    mayar countdown(n - 1, acc + n)
+
+k = 0
+kadai k < 300:
+    countdown(120, 0)
+    k = k + 1
+""",
+    "calls_in_loop": """
+aiki square(x):
+    mayar x * x
+
+aiki sum_squares(n):
+    s = 0
+    don i = 0 zuwa n:
+        s = s + square(i)
+    mayar s
+
+rubuta sum_squares(20000)
+""",
+    "deep_calls": """
+aiki square(x):
+    mayar x * x
+
+aiki descend(depth):
+    idan depth > 0:
+        mayar descend(depth - 1) + 0
+    s = 0
+    don i = 0 zuwa 5000:
+        s = s + square(i)
+    mayar s
+
+rubuta descend(50)
+""",
+    "deep_globals": """
+scale = 3
+offset = 1
+
+aiki descend(depth):
+    idan depth > 0:
+        mayar descend(depth - 1) + offset
+    s = 0
+    don i = 0 zuwa 5000:
+        s = s + i * scale + offset
+    mayar s
+
+total = 0
+don round = 0 zuwa 20:
+    total = total + descend(80)
+rubuta total
+""",
+    "collatz": """
+longest = 0
+don start = 1 zuwa 300:
+    n = start
+    steps = 0
+    kadai n != 1:
+        idan n % 2 == 0:
+            n = n / 2
+        in ba haka ba:
+            n = n * 3 + 1
+        steps = steps + 1
+    idan steps > longest:
+        longest = steps
+rubuta longest
+""",
+    "primes": """
+count = 0
+n = 2
+kadai n < 1500:
+    d = 2
+    prime = 1
+    kadai d * d <= n:
+        idan n % d == 0:
+            prime = 0
+            d = n
+        d = d + 1
+    count = count + prime
+    n = n + 1
+rubuta count
+""",
+    "while_grid": """
+total = 0
+row = 1
+kadai row <= 150:
+    col = 1
+    kadai col <= 150:
+        idan col % 3 == 0:
+            total = total + row
+        col = col + 1
+    row = row + 1
+rubuta total
+""",
+    "countdown_loop": """
+n = 30000
+evens = 0
+kadai n > 0:
+    idan n % 2 == 0:
+        evens = evens + 1
+    n = n - 1
+rubuta evens
+""",
+    "branches": """
+a = 0
+b = 0
+c = 0
+odd = 0
+don i = 0 zuwa 15000:
+    odd = i % 2
+    idan odd:
+        a = a + 1
+    in ba haka ba:
+        idan a > b:
+            b = b + 1
+    idan i > 7500:
+        c = c + 1
+    idan b:
+        c = c - 1
+rubuta a + b + c
+""",
+    "invariant_loop": """
+width = 40
+height = 25
+total = 0
+i = 0
+kadai i < 20000:
+    total = total + (width * height + width * 2) % 97 + i
+    i = i + 1
+rubuta total
+""",
+    "print_loop": """
+don i = 0 zuwa 20000:
+    rubuta i
+    rubuta " "
+""",
+}
+
+
+def time_program(source, repeat, buffered=False, fuse=True, opt_level=0):
+    """Return the best wall-clock time (seconds) of `repeat` runs.
+
+    Also returns the best time (seconds) of `repeat` optimizations at
+    `opt_level`.
+    """
+    parsed = parser.parse(tokenize_program(source))
+    options = OptimizerOptions.for_level(opt_level)
+    program = parsed
+    optimizing = 0.0
+    if options.any_enabled():
+        optimizing = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            program = optimize(parsed, options)
+            optimizing = min(optimizing, time.perf_counter() - start)
+    best = float("inf")
+    for _ in range(repeat):
+        interpreter = Interpreter(
+            output=BufferOutput() if buffered else None, superinstructions=fuse
+        )
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            interpreter.interpret(program)
+        best = min(best, time.perf_counter() - start)
+    return best, optimizing
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    ap.add_argument("-n", "--repeat", type=int, default=5)
+    ap.add_argument(
+        "-b", "--buffered", action="store_true", help="capture output in memory"
+    )
+    ap.add_argument("--no-fuse", action="store_true", help="disable superinstructions")
+    ap.add_argument(
+        "-O",
+        dest="opt_level",
+        type=int,
+        choices=OPT_LEVELS,
+        default=0,
+        help="optimization level (default: 0)",
+    )
+    args = ap.parse_args(argv)
+
+    names = args.names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            ap.error(f"unknown benchmark: {name}")
+        elapsed, optimizing = time_program(
+            BENCHMARKS[name],
+            args.repeat,
+            args.buffered,
+            not args.no_fuse,
+            args.opt_level,
+        )
+        line = f"{name:<24} {elapsed * 1000:10.2f} ms"
+        if args.opt_level:
+            line += f"   (optimizer {optimizing * 1000:.2f} ms)"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
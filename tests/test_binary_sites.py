@@ -0,0 +1,62 @@
+"""Tests for type-specialised BinaryOp handlers."""
+
+import pytest
+
+from hausalang.core.interpreter import Interpreter
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.parser import parse
+
+
+def run(code):
+    interpreter = Interpreter()
+    program = parse(tokenize_program(code))
+    interpreter.interpret(program)
+    return interpreter
+
+
+def sites(interpreter):
+    return [
+        (site.node.operator, site.left_type, site.right_type)
+        for site in interpreter._binary_sites.values()
+    ]
+
+
+class TestSpecialisation:
+    """Sites specialise on numeric operands and keep generic semantics"""
+
+    def test_int_site_keeps_floor_division(self):
+        interpreter = run("x = 0\ndon i = 0 zuwa 5:\n    x = x + i / 2")
+        assert interpreter.global_env.get_variable("x") == 4
+        assert ("/", int, int) in sites(interpreter)
+
+    def test_float_site_uses_true_division(self):
+        interpreter = run("x = 0.0\ndon i = 0 zuwa 4:\n    x = x + 1.0 / 4.0")
+        assert interpreter.global_env.get_variable("x") == 1.0
+        assert ("/", float, float) in sites(interpreter)
+
+    def test_type_change_deoptimises_site(self):
+        code = """
+aiki half(n):
+    mayar n / 2
+
+a = half(7)
+b = half(7.0)
+c = half(9)
+"""
+        interpreter = run(code)
+        env = interpreter.global_env
+        assert (env.get_variable("a"), env.get_variable("b")) == (3, 3.5)
+        assert env.get_variable("c") == 4
+        assert sites(interpreter) == [("/", None, None)]
+
+    def test_strings_and_bools_stay_generic(self):
+        interpreter = run('s = "a" + "b"\nt = (1 < 2) + 1')
+        assert interpreter.global_env.get_variable("s") == "ab"
+        assert interpreter.global_env.get_variable("t") == 2
+        assert ("+", str, str) not in sites(interpreter)
+        assert ("+", bool, int) not in sites(interpreter)
+
+    def test_division_by_zero_on_specialised_site(self):
+        code = "aiki div(a, b):\n    mayar a / b\nx = div(4, 2)\ny = div(1, 0)"
+        with pytest.raises(ZeroDivisionError):
+            run(code)
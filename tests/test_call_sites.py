@@ -0,0 +1,56 @@
+"""Tests for call-site inline caches in the interpreter."""
+
+from hausalang.core.errors import ErrorKind
+from hausalang.core.interpreter import CallSite
+from hausalang.repl.session import ReplSession
+
+
+class TestCallSiteCache:
+    """Cached calls always see the function the scope chain would find"""
+
+    def test_hot_call_is_cached(self):
+        s = ReplSession()
+        s.execute("aiki inc(x):\n    mayar x + 1")
+        s.execute("n = 0\nkadai n < 10:\n    n = inc(n)")
+        assert s.get_variable("n") == 10
+        sites = s.interpreter._call_sites.values()
+        assert [site.function.name for site in sites] == ["inc"]
+        assert all(isinstance(site, CallSite) and site.arity == 1 for site in sites)
+
+    def test_redefinition_invalidates_cache(self):
+        s = ReplSession()
+        s.execute("aiki f():\n    mayar 1")
+        s.execute("aiki g():\n    mayar f()")
+        assert s.execute("g()").output == 1
+        s.execute("aiki f():\n    mayar 2")
+        assert s.execute("g()").output == 2
+
+    def test_local_function_does_not_leak_from_cache(self):
+        s = ReplSession()
+        s.execute(
+            """
+aiki g():
+    mayar "global"
+
+aiki f():
+    mayar g()
+
+aiki p():
+    aiki g():
+        mayar "local"
+    mayar f()
+"""
+        )
+        assert s.execute("f()").output == "global"
+        assert s.execute("p()").output == "local"
+        assert s.execute("f()").output == "global"
+
+    def test_arity_checked_on_cached_site(self):
+        s = ReplSession()
+        s.execute("aiki f(a):\n    mayar a")
+        s.execute("aiki call():\n    mayar f(1)")
+        assert s.execute("call()").output == 1
+        s.execute("aiki f(a, b):\n    mayar a")
+        r = s.execute("call()")
+        assert not r.success
+        assert r.error.kind == ErrorKind.WRONG_ARGUMENT_COUNT
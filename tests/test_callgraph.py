@@ -0,0 +1,191 @@
+"""Tests for the call graph analysis."""
+
+import dataclasses
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.callgraph import build_call_graph, is_leaf_function
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.optimizer import optimize
+
+PROGRAM = """
+aiki fib(n):
+    idan n < 2:
+        mayar n
+    mayar fib(n - 1) + fib(n - 2)
+
+aiki even(n):
+    idan n == 0:
+        mayar 1
+    mayar odd(n - 1)
+
+aiki odd(n):
+    idan n == 0:
+        mayar 0
+    mayar even(n - 1)
+
+aiki square(n):
+    mayar n * n
+
+aiki show(n):
+    rubuta n
+
+aiki report(n):
+    show(square(n))
+
+rubuta fib(10) + even(4)
+report(3)
+"""
+
+
+def parse(code):
+    return parser.parse(tokenize_program(code))
+
+
+def summary(code, name):
+    return parse(code).call_graph.get(name)
+
+
+class TestCallGraph:
+    """build_call_graph and Program.call_graph"""
+
+    def test_calls(self):
+        graph = parse(PROGRAM).call_graph
+        assert set(graph.functions) == {
+            "fib",
+            "even",
+            "odd",
+            "square",
+            "show",
+            "report",
+        }
+        assert graph.get("report").calls == {"show", "square"}
+        assert graph.get("fib").calls == {"fib"}
+        assert graph.top_level_calls == {"fib", "even", "report"}
+        assert graph.get("missing") is None
+
+    @pytest.mark.parametrize(
+        "name, direct, mutual",
+        [
+            ("fib", True, False),
+            ("even", False, True),
+            ("odd", False, True),
+            ("square", False, False),
+            ("report", False, False),
+        ],
+    )
+    def test_recursion(self, name, direct, mutual):
+        function = summary(PROGRAM, name)
+        assert (function.directly_recursive, function.mutually_recursive) == (
+            direct,
+            mutual,
+        )
+        assert function.recursive == (direct or mutual)
+
+    def test_recursive_functions(self):
+        assert parse(PROGRAM).call_graph.recursive_functions() == {
+            "fib",
+            "even",
+            "odd",
+        }
+
+    def test_leaves(self):
+        graph = parse(PROGRAM).call_graph
+        leaves = {name for name, function in graph.functions.items() if function.leaf}
+        assert leaves == {"square", "show"}
+
+    def test_prints(self):
+        graph = parse(PROGRAM).call_graph
+        assert graph.get("show").prints_directly
+        assert not graph.get("report").prints_directly
+        assert graph.get("report").prints
+        assert not any(graph.get(name).prints for name in ("fib", "even", "square"))
+
+    def test_prints_through_a_cycle(self):
+        code = (
+            "aiki a(n):\n    mayar b(n)\n"
+            "aiki b(n):\n    idan n:\n        c(n)\n    mayar a(n - 1)\n"
+            "aiki c(n):\n    rubuta n\n"
+            "aiki d(n):\n    mayar a(n)\n"
+        )
+        graph = parse(code).call_graph
+        assert all(graph.get(name).prints for name in "abcd")
+        assert graph.get("c").mutually_recursive is False
+
+    def test_nested_and_repeated_definitions(self):
+        code = (
+            "aiki outer(n):\n    aiki inner(m):\n        rubuta m\n    mayar n\n"
+            "aiki f(n):\n    mayar n\n"
+            "idan 1:\n    aiki f(n):\n        mayar f(n)\n"
+        )
+        graph = parse(code).call_graph
+        # The nested body belongs to inner, not outer
+        assert graph.get("inner").prints
+        assert not graph.get("outer").prints
+        assert graph.get("outer").leaf
+        # Every definition of f counts
+        assert graph.get("f").definitions == 2
+        assert graph.get("f").directly_recursive
+
+    def test_undefined_callees(self):
+        function = summary("aiki f(n):\n    mayar g(n)\n", "f")
+        assert function.calls == {"g"}
+        assert not function.leaf
+        assert not function.recursive
+
+    def test_long_call_chain(self):
+        code = "".join(f"aiki f{i}(n):\n    mayar f{i + 1}(n)\n" for i in range(3000))
+        code += "aiki f3000(n):\n    rubuta n\n"
+        graph = parse(code).call_graph
+        assert graph.get("f0").prints
+        assert not graph.recursive_functions()
+
+    def test_optimized_nodes_are_walked(self):
+        code = (
+            "aiki f(n):\n    k = 3\n    t = 0\n    i = 0\n"
+            "    kadai i < n:\n        t = t + g(k * k)\n        i = i + 1\n"
+            "    mayar t\n"
+            "aiki g(n):\n    rubuta n\n    mayar f(n)\n"
+        )
+        graph = optimize(parse(code)).call_graph
+        assert graph.get("f").calls == {"g"}
+        assert graph.get("f").mutually_recursive
+        assert graph.get("f").prints
+
+    @pytest.mark.parametrize(
+        "body, leaf",
+        [
+            ("    mayar n * n\n", True),
+            ("    idan n:\n        rubuta n\n    mayar n\n", True),
+            ("    mayar f(n)\n", False),
+            ("    kadai n:\n        n = g(n)\n", False),
+            ("    aiki h(m):\n        mayar m\n    mayar n\n", False),
+        ],
+    )
+    def test_is_leaf_function(self, body, leaf):
+        (function,) = parse("aiki f(n):\n" + body).statements
+        assert is_leaf_function(function) is leaf
+
+
+class TestCaching:
+    """The summary is immutable and cached with the tree"""
+
+    def test_cached_per_tree(self):
+        program = parse(PROGRAM)
+        assert program.call_graph is program.call_graph
+        copy = dataclasses.replace(program, statements=program.statements[:1])
+        assert set(copy.call_graph.functions) == {"fib"}
+
+    def test_not_part_of_the_tree(self):
+        program = parse(PROGRAM)
+        program.call_graph
+        assert program == parse(PROGRAM)
+        assert "_call_graph" not in repr(program)
+
+    def test_immutable(self):
+        graph = build_call_graph(parse(PROGRAM))
+        with pytest.raises(TypeError):
+            graph.functions["fib"] = None
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            graph.get("fib").leaf = True
@@ -0,0 +1,194 @@
+"""Tests for the static undefined name checker."""
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.checker import UndefinedNamesError, find_undefined_names
+from hausalang.core.errors import ContextualError, ErrorKind, KvFrame
+from hausalang.core.interpreter import Interpreter, interpret_program
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.output import BufferOutput
+
+
+def undefined(code, **known):
+    """Return (kind, name, line, column) for each undefined name use."""
+    program = parser.parse(tokenize_program(code))
+    return [
+        (
+            error.kind,
+            error.context_frames[0].value,
+            error.location.line,
+            error.location.column,
+        )
+        for error in find_undefined_names(program, **known)
+    ]
+
+
+VARIABLE = ErrorKind.UNDEFINED_VARIABLE
+FUNCTION = ErrorKind.UNDEFINED_FUNCTION
+
+
+class TestTopLevel:
+    """Names used by the top-level statements"""
+
+    def test_every_use_is_reported_in_source_order(self):
+        code = "rubuta x\nx = 1\nrubuta y + f(x)\nrubuta y\n"
+        assert undefined(code) == [
+            (VARIABLE, "x", 1, 7),
+            (VARIABLE, "y", 3, 7),
+            (FUNCTION, "f", 3, 11),
+            (VARIABLE, "y", 4, 7),
+        ]
+
+    def test_defined_names(self):
+        code = (
+            "x = 1\naiki f(n):\n    mayar n\n"
+            "don i = 0 zuwa 3:\n    rubuta f(i + x)\nrubuta i\n"
+        )
+        assert undefined(code) == []
+
+    def test_call_before_definition(self):
+        code = "rubuta f(1)\naiki f(n):\n    mayar n\n"
+        assert undefined(code) == [(FUNCTION, "f", 1, 7)]
+
+    def test_loop_variable_is_not_defined_in_its_bounds(self):
+        assert undefined("don i = 0 zuwa i:\n    rubuta i\n") == [
+            (VARIABLE, "i", 1, 15)
+        ]
+
+    def test_loop_condition_is_tested_before_the_body_runs(self):
+        assert undefined("kadai x < 3:\n    x = 1\n") == [(VARIABLE, "x", 1, 6)]
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            # Either branch may run
+            "idan 1:\n    x = 1\nrubuta x\n",
+            "idan 1:\n    rubuta 0\nin ba haka ba:\n    x = 1\nrubuta x\n",
+            # Later iterations see what earlier ones assigned
+            "i = 0\nkadai i < 3:\n    idan i:\n        rubuta t\n    t = i\n"
+            "    i = i + 1\n",
+            "don i = 0 zuwa 3:\n    idan i:\n        rubuta f(i)\n"
+            "    aiki f(n):\n        mayar n\n",
+        ],
+    )
+    def test_names_defined_on_some_path(self, code):
+        assert undefined(code) == []
+
+    def test_names_defined_by_earlier_runs(self):
+        code = "rubuta x + f(x)\n"
+        assert undefined(code, variables={"x"}, functions={"f"}) == []
+
+
+class TestFunctions:
+    """Function bodies see the names of their callers"""
+
+    def test_callers_variables(self):
+        code = "aiki f(n):\n    mayar n + k\nk = 2\nrubuta f(1)\n"
+        assert undefined(code) == []
+
+    def test_variable_defined_after_every_call(self):
+        code = "aiki f(n):\n    mayar n + k\nrubuta f(1)\nk = 2\n"
+        assert undefined(code) == [(VARIABLE, "k", 2, 14)]
+
+    def test_callers_locals_are_visible_through_the_chain(self):
+        code = (
+            "aiki inner():\n    mayar depth\n"
+            "aiki outer(n):\n    depth = n\n    mayar inner()\n"
+            "rubuta outer(1)\n"
+        )
+        assert undefined(code) == []
+
+    def test_locals_do_not_leak_to_the_caller(self):
+        code = "aiki f(n):\n    local = n\n    mayar local\nrubuta f(1)\nrubuta local\n"
+        assert undefined(code) == [(VARIABLE, "local", 5, 7)]
+
+    def test_recursion(self):
+        code = (
+            "aiki even(n):\n    idan n == 0:\n        mayar 1\n    mayar odd(n - 1)\n"
+            "aiki odd(n):\n    idan n == 0:\n        mayar 0\n    mayar even(n - 1)\n"
+            "rubuta even(4)\n"
+        )
+        assert undefined(code) == []
+
+    def test_nested_functions(self):
+        code = (
+            "aiki outer(n):\n    rubuta inner(n)\n"
+            "    aiki inner(m):\n        mayar m\n    mayar inner(n)\n"
+            "rubuta outer(1)\nrubuta inner(1)\n"
+        )
+        assert undefined(code) == [
+            (FUNCTION, "inner", 2, 11),
+            (FUNCTION, "inner", 7, 7),
+        ]
+
+    def test_long_call_chain(self):
+        code = "".join(
+            f"aiki f{i}(n):\n    mayar f{i + 1}(n)\n" for i in range(1000, 0, -1)
+        )
+        code += "aiki f1001(n):\n    mayar n + k\nrubuta f1(1)\n"
+        assert undefined(code) == [(VARIABLE, "k", 2002, 14)]
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            # Never called
+            "aiki f(n):\n    mayar missing(n)\n",
+            # Only called from code that cannot run
+            "aiki f(n):\n    mayar missing\naiki g(n):\n    mayar n\n    f(n)\n"
+            "rubuta g(1)\n",
+            # Statements after a mayar
+            "aiki f(n):\n    mayar n\n    rubuta missing\nrubuta f(1)\n",
+        ],
+    )
+    def test_code_that_cannot_run_is_not_checked(self, code):
+        assert undefined(code) == []
+
+
+class TestGate:
+    """interpret_program(check_names=True)"""
+
+    CODE = 'rubuta "before"\nrubuta x\nrubuta g(1)\n'
+
+    def test_nothing_runs(self):
+        output = BufferOutput()
+        with pytest.raises(UndefinedNamesError) as info:
+            interpret_program(
+                self.CODE, interpreter=Interpreter(output=output), check_names=True
+            )
+        assert output.getvalue() == ""
+        error = info.value
+        assert isinstance(error, ContextualError)
+        assert isinstance(error, NameError)
+        assert error.kind == VARIABLE
+        assert error.message == "Undefined variable: x (and 1 more)"
+        assert (error.location.line, error.location.column) == (2, 7)
+        assert error.context_frames == [KvFrame("3:7", "Undefined function: g")]
+        assert [e.kind for e in error.errors] == [VARIABLE, FUNCTION]
+
+    def test_off_by_default(self):
+        output = BufferOutput()
+        with pytest.raises(NameError) as info:
+            interpret_program(self.CODE, interpreter=Interpreter(output=output))
+        assert not isinstance(info.value, UndefinedNamesError)
+        assert output.getvalue() == "before"
+
+    @pytest.mark.parametrize("opt_level", [0, 2])
+    def test_valid_programs_run(self, opt_level):
+        output = BufferOutput()
+        interpret_program(
+            "aiki f(n):\n    mayar n * k\nk = 3\nrubuta f(2)\n",
+            interpreter=Interpreter(output=output),
+            opt_level=opt_level,
+            check_names=True,
+        )
+        assert output.getvalue() == "6"
+
+    def test_interpreter_globals_count_as_defined(self):
+        output = BufferOutput()
+        interpreter = Interpreter(output=output)
+        interpret_program(
+            "k = 3\naiki f(n):\n    mayar n * k\n", interpreter=interpreter
+        )
+        interpret_program("rubuta f(2)\n", interpreter=interpreter, check_names=True)
+        assert output.getvalue() == "6"
@@ -0,0 +1,151 @@
+"""Tests for control-flow propagation in the interpreter.
+
+Covers `mayar` completions travelling out of nested blocks and loops, and the
+fast paths the interpreter takes for common loop shapes.
+"""
+
+import pytest
+
+from hausalang.core.errors import ContextualError, ErrorKind
+from hausalang.core.interpreter import Interpreter, interpret_program
+from hausalang.core.stack_interpreter import StackInterpreter
+from hausalang.repl.session import ReplSession
+
+
+class TestReturnPropagation:
+    """`mayar` exits the innermost function from any nesting depth"""
+
+    def test_return_from_nested_loops(self):
+        s = ReplSession()
+        s.execute(
+            """
+aiki first_multiple(n, k):
+    don i = 1 zuwa 100:
+        j = 0
+        kadai j < 3:
+            idan i * k == n + j:
+                mayar i
+            j = j + 1
+    mayar 0
+"""
+        )
+        r = s.execute("first_multiple(10, 3)")
+        assert r.success
+        assert r.output == 4
+
+    def test_return_stops_remaining_statements(self, capsys):
+        interpret_program(
+            """
+aiki f():
+    rubuta "a"
+    idan 1:
+        mayar 5
+    rubuta "b"
+
+rubuta f()
+"""
+        )
+        assert capsys.readouterr().out == "a5"
+
+    def test_function_without_return_gives_none(self):
+        s = ReplSession()
+        s.execute("aiki f(x):\n    y = x")
+        r = s.execute("f(1)")
+        assert r.success
+        assert r.output is None
+
+    def test_recursive_returns(self):
+        s = ReplSession()
+        s.execute(
+            """
+aiki fib(n):
+    idan n < 2:
+        mayar n
+    mayar fib(n - 1) + fib(n - 2)
+"""
+        )
+        assert s.execute("fib(15)").output == 610
+
+    def test_top_level_return_is_an_error(self):
+        with pytest.raises(ContextualError) as exc_info:
+            interpret_program("mayar 1")
+        assert exc_info.value.kind == ErrorKind.INTERPRETER_BUG
+        assert "inside a function" in exc_info.value.message
+
+
+class TestIntegerRangeLoops:
+    """`don` over integer bounds behaves exactly like the general loop"""
+
+    def run(self, source, capsys):
+        s = ReplSession()
+        r = s.execute(source)
+        return r, capsys.readouterr().out, s
+
+    def test_ascending_leaves_variable_past_end(self, capsys):
+        r, out, s = self.run("don i = 0 zuwa 5:\n    rubuta i", capsys)
+        assert out == "01234"
+        assert s.get_variable("i") == 5
+
+    def test_descending_with_step(self, capsys):
+        r, out, s = self.run("don i = 10 ba 0 ta 3:\n    rubuta i", capsys)
+        assert out == "10741"
+        assert s.get_variable("i") == -2
+
+    def test_empty_range_keeps_start(self, capsys):
+        r, out, s = self.run("don i = 5 zuwa 0:\n    rubuta i", capsys)
+        assert out == ""
+        assert s.get_variable("i") == 5
+
+    def test_body_reassigning_loop_variable(self, capsys):
+        source = "don i = 0 zuwa 10:\n    rubuta i\n    i = i + 2"
+        r, out, s = self.run(source, capsys)
+        assert out == "0369"
+        assert s.get_variable("i") == 12
+
+    def test_body_reassigning_loop_variable_to_float(self, capsys):
+        source = "don i = 0 zuwa 3:\n    rubuta i\n    i = i + 0.5"
+        r, out, s = self.run(source, capsys)
+        assert out == "01.5"
+        assert s.get_variable("i") == 3.0
+
+    def test_body_reassigning_loop_variable_to_string(self, capsys):
+        r, out, s = self.run('don i = 0 zuwa 3:\n    i = "x"', capsys)
+        assert not r.success
+        assert r.error.kind == ErrorKind.INVALID_OPERAND_TYPE
+        assert s.get_variable("i") == "x"
+
+    def test_float_bounds_use_general_loop(self, capsys):
+        r, out, s = self.run("don i = 0 zuwa 2 ta 0.5:\n    rubuta i", capsys)
+        assert out == "00.51.01.5"
+        assert s.get_variable("i") == 2.0
+
+
+class TestConditionTruthiness:
+    """Conditions follow is_truthy for every value type, in both engines"""
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_truthiness_of_condition_values(self, engine, capsys):
+        code = """
+aiki nothing():
+    x = 1
+
+don i = 0 zuwa 1:
+    idan 0.0:
+        rubuta "a"
+    idan 0.5:
+        rubuta "b"
+    idan "":
+        rubuta "c"
+    idan "0":
+        rubuta "d"
+    idan nothing():
+        rubuta "e"
+    idan 2 > 1:
+        rubuta "f"
+n = 3
+kadai n:
+    rubuta n
+    n = n - 1
+"""
+        interpret_program(code, interpreter=engine())
+        assert capsys.readouterr().out == "bdf321"
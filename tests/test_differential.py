@@ -0,0 +1,369 @@
+"""Differential tests: every execution engine must agree with the reference.
+
+The reference is the plain tree-walking `Interpreter` with its optional
+tiers (superinstructions, hot-loop compilation) switched off. Every other
+engine runs the same programs and must produce the same stdout, the same
+final globals, and the same ContextualError kind and location.
+
+Programs come from three places:
+- every `.ha` file under examples/
+- the REPL snippets embedded in tests/test_levels_*.py, replayed per test
+- randomly generated programs (seeded, so failures reproduce)
+
+To check a new engine, add a factory to ENGINES. A factory with an
+`opt_level` attribute has its programs optimized at that level first.
+"""
+
+import ast
+import glob
+import os
+import random
+
+import pytest
+
+from hausalang.core.errors import ContextualError
+from hausalang.core.interpreter import Interpreter, interpret_program
+from hausalang.core.output import BufferOutput
+from hausalang.core.stack_interpreter import StackInterpreter
+from hausalang.repl.session import ReplSession
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Generous safety net; no test program should come near it
+MAX_STEPS = 200_000
+
+
+def reference(output):
+    interpreter = Interpreter(
+        output=output, superinstructions=False, max_steps=MAX_STEPS
+    )
+    interpreter.hot_loop_threshold = None
+    return interpreter
+
+
+def hot_loops(output):
+    interpreter = Interpreter(output=output, max_steps=MAX_STEPS)
+    interpreter.hot_loop_threshold = 1
+    return interpreter
+
+
+def optimized(output):
+    return Interpreter(output=output, max_steps=MAX_STEPS)
+
+
+def optimized_stack(output):
+    return StackInterpreter(output=output, max_steps=MAX_STEPS)
+
+
+optimized.opt_level = optimized_stack.opt_level = 2
+
+
+ENGINES = {
+    "default": lambda output: Interpreter(output=output, max_steps=MAX_STEPS),
+    "hot_loops": hot_loops,
+    "memoize": lambda output: Interpreter(
+        output=output, max_steps=MAX_STEPS, memoize=True
+    ),
+    "stack": lambda output: StackInterpreter(output=output, max_steps=MAX_STEPS),
+    "optimized": optimized,
+    "optimized_stack": optimized_stack,
+}
+
+
+# ============================================================================
+# Running programs
+# ============================================================================
+
+
+def error_summary(error):
+    if error is None:
+        return None
+    return (error.kind, error.location.line, error.location.column)
+
+
+def final_globals(interpreter):
+    return {
+        name: (type(value), value)
+        for name, value in interpreter.global_env.variables.items()
+    }
+
+
+def run_program(factory, source):
+    """Run a whole program; return (stdout, globals, error)."""
+    output = BufferOutput()
+    interpreter = factory(output)
+    error = None
+    try:
+        interpret_program(
+            source,
+            interpreter=interpreter,
+            opt_level=getattr(factory, "opt_level", 0),
+        )
+    except ContextualError as e:
+        error = e
+    return output.getvalue(), final_globals(interpreter), error_summary(error)
+
+
+def run_session(factory, snippets):
+    """Replay REPL snippets; return (stdout, globals, per-snippet results)."""
+    session = ReplSession(use_colors=False)
+    output = BufferOutput()
+    session.interpreter = factory(output)
+    session.opt_level = getattr(factory, "opt_level", 0)
+    results = []
+    for snippet in snippets:
+        result = session.execute(snippet)
+        results.append((result.success, result.output, error_summary(result.error)))
+    return output.getvalue(), final_globals(session.interpreter), results
+
+
+def assert_engines_agree(run, program):
+    expected = run(reference, program)
+    for name, factory in ENGINES.items():
+        assert run(factory, program) == expected, f"engine {name!r} disagrees"
+
+
+# ============================================================================
+# Program sources
+# ============================================================================
+
+
+def example_files():
+    pattern = os.path.join(ROOT, "examples", "**", "*.ha")
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def level_test_sessions():
+    """Collect the `.execute("...")` snippets of each test_levels_* test."""
+    sessions = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "tests", "test_levels_*.py"))):
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.FunctionDef) or not node.name.startswith(
+                "test_"
+            ):
+                continue
+            calls = [
+                call
+                for call in ast.walk(node)
+                if isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Attribute)
+                and call.func.attr == "execute"
+                and call.args
+                and isinstance(call.args[0], ast.Constant)
+                and isinstance(call.args[0].value, str)
+            ]
+            calls.sort(key=lambda call: (call.lineno, call.col_offset))
+            if calls:
+                test_id = f"{os.path.basename(path)}::{node.name}"
+                sessions.append(
+                    pytest.param([call.args[0].value for call in calls], id=test_id)
+                )
+    return sessions
+
+
+class ProgramGenerator:
+    """Generates small random Hausalang programs that always terminate.
+
+    Loops have constant bounds and their counters are never reassigned in
+    the body; functions only call functions defined before them, except
+    for recursive helpers that are always called with small integers.
+    Programs may still fail at run time (undefined names, division by
+    zero, mixed types), which is part of what the engines must agree on.
+    """
+
+    VARIABLES = ["a", "b", "c", "n"]
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.functions = []  # (name, arity)
+        self.counters = 0
+
+    def program(self):
+        lines = [f"{name} = {self.random.randint(-3, 9)}" for name in self.VARIABLES]
+        for _ in range(self.random.randint(0, 3)):
+            lines += self.function()
+        if self.random.random() < 0.5:
+            lines += self.recursive_function()
+        for _ in range(self.random.randint(3, 8)):
+            lines += self.statement(0, in_function=False)
+        return "\n".join(lines) + "\n"
+
+    # -- statements ---------------------------------------------------------
+
+    def block(self, depth, in_function):
+        lines = []
+        for _ in range(self.random.randint(1, 3)):
+            lines += self.statement(depth + 1, in_function)
+        return ["    " + line for line in lines]
+
+    def statement(self, depth, in_function):
+        choices = ["assign", "assign", "increment", "print"]
+        if depth < 2:
+            choices += ["if", "while", "for"]
+        if self.functions:
+            choices.append("call")
+        if in_function:
+            choices.append("return")
+        kind = self.random.choice(choices)
+
+        if kind == "assign":
+            return [f"{self.random.choice(self.VARIABLES)} = {self.expression(2)}"]
+        if kind == "increment":
+            name = self.random.choice(self.VARIABLES)
+            op = self.random.choice("+-")
+            return [f"{name} = {name} {op} {self.random.randint(1, 3)}"]
+        if kind == "print":
+            if self.random.random() < 0.3:
+                return [f'rubuta "{self.random.choice(["x", "y", " "])}"']
+            return [f"rubuta {self.expression(2)}"]
+        if kind == "return":
+            return [f"mayar {self.expression(2)}"]
+        if kind == "call":
+            return [self.call()]
+        if kind == "if":
+            lines = [f"idan {self.condition()}:"] + self.block(depth, in_function)
+            if self.random.random() < 0.3:
+                lines += [f"idan {self.condition()} kuma:"]
+                lines += self.block(depth, in_function)
+            if self.random.random() < 0.5:
+                lines += ["in ba haka ba:"] + self.block(depth, in_function)
+            return lines
+        if kind == "while":
+            counter = self.counter()
+            limit = self.random.randint(0, 5)
+            return (
+                [f"{counter} = 0", f"kadai {counter} < {limit}:"]
+                + self.block(depth, in_function)
+                + [f"    {counter} = {counter} + 1"]
+            )
+        # for
+        counter = self.counter()
+        start, end = self.random.randint(-2, 3), self.random.randint(-2, 6)
+        if self.random.random() < 0.5:
+            header = f"don {counter} = {start} zuwa {end}"
+        else:
+            header = f"don {counter} = {end} ba {start}"
+        if self.random.random() < 0.3:
+            header += f" ta {self.random.choice([1, 2, 0.5])}"
+        return [header + ":"] + self.block(depth, in_function)
+
+    def function(self):
+        name = f"f{len(self.functions)}"
+        arity = self.random.randint(0, 2)
+        params = ["p", "q"][:arity]
+        lines = [f"aiki {name}({', '.join(params)}):"]
+        saved = self.VARIABLES
+        self.VARIABLES = saved + params
+        if self.random.random() < 0.6:
+            # Otherwise a one-line helper, as the optimizer inlines
+            lines += self.block(0, in_function=True)
+        lines.append(f"    mayar {self.expression(2)}")
+        self.VARIABLES = saved
+        self.functions.append((name, arity))
+        return lines
+
+    def recursive_function(self):
+        name = f"r{len(self.functions)}"
+        step = self.expression(1)
+        if self.random.random() < 0.5:
+            lines = [
+                f"aiki {name}(k, acc):",
+                "    idan k < 1:",
+                "        mayar acc",
+                f"    mayar {name}(k - 1, acc + {step})",
+            ]
+            self.functions.append((name, 2))
+        else:
+            lines = [
+                f"aiki {name}(k):",
+                "    idan k < 1:",
+                "        mayar 0",
+                f"    mayar {name}(k - 1) + {step}",
+            ]
+            self.functions.append((name, 1))
+        return lines
+
+    def counter(self):
+        self.counters += 1
+        return f"i{self.counters}"
+
+    # -- expressions --------------------------------------------------------
+
+    def call(self):
+        name, arity = self.random.choice(self.functions)
+        if name.startswith("r"):
+            # Recursive helpers only ever see small integer depths
+            args = [str(self.random.randint(0, 6))] + ["0"] * (arity - 1)
+        else:
+            args = [self.expression(1) for _ in range(arity)]
+        return f"{name}({', '.join(args)})"
+
+    def condition(self):
+        if self.random.random() < 0.2:
+            return self.expression(1)
+        op = self.random.choice(["==", "!=", "<", ">", "<=", ">="])
+        if self.random.random() < 0.3:
+            name = self.random.choice(self.VARIABLES)
+            return f"{name} % {self.random.randint(1, 3)} {op} 0"
+        return f"{self.expression(1)} {op} {self.expression(1)}"
+
+    def expression(self, depth):
+        roll = self.random.random()
+        if depth == 0 or roll < 0.35:
+            return self.leaf()
+        if roll < 0.45 and self.functions:
+            return self.call()
+        if roll < 0.5:
+            return f"-{self.leaf()}"
+        op = self.random.choice(["+", "-", "*", "/", "%"])
+        left = self.expression(depth - 1)
+        if op == "*":
+            # Keep numbers small: only ever multiply by a literal
+            return f"({left} * {self.random.randint(-2, 3)})"
+        if op in "/%" and self.random.random() < 0.7:
+            # Mostly divide by a non-zero literal so programs run further
+            return f"({left} {op} {self.random.randint(1, 4)})"
+        return f"({left} {op} {self.expression(depth - 1)})"
+
+    def leaf(self):
+        roll = self.random.random()
+        if roll < 0.45:
+            return self.random.choice(self.VARIABLES)
+        if roll < 0.9:
+            return str(self.random.randint(0, 9))
+        if roll < 0.985:
+            return self.random.choice(["1.5", "0.25", "2.0"])
+        return '"s"'
+
+
+# ============================================================================
+# Tests
+# ============================================================================
+
+
+@pytest.mark.parametrize(
+    "path", example_files(), ids=lambda path: os.path.relpath(path, ROOT)
+)
+def test_examples(path):
+    with open(path, encoding="utf-8") as f:
+        assert_engines_agree(run_program, f.read())
+
+
+@pytest.mark.parametrize("snippets", level_test_sessions())
+def test_level_test_programs(snippets):
+    assert_engines_agree(run_session, snippets)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_random_programs(seed):
+    assert_engines_agree(run_program, ProgramGenerator(seed).program())
+
+
+def test_generator_covers_errors_and_output():
+    outcomes = [
+        run_program(reference, ProgramGenerator(seed).program()) for seed in range(300)
+    ]
+    assert sum(error is not None for _, _, error in outcomes) > 30
+    assert sum(error is None and bool(out) for out, _, error in outcomes) > 30
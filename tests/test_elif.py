@@ -17,3 +17,22 @@ def test_elif_output():
 
     out = buf.getvalue()
     assert "eq10" in out
+
+
+def test_elif_chain_with_else():
+    code = (
+        "x = 5\n"
+        'idan x > 10:\n    rubuta "a"\n'
+        'kuma x > 7:\n    rubuta "b"\n'
+        'kuma x > 3:\n    rubuta "c"\n'
+        'in ba haka ba:\n    rubuta "d"\n'
+    )
+    buf = io.StringIO()
+    old = sys.stdout
+    sys.stdout = buf
+    try:
+        run(code)
+    finally:
+        sys.stdout = old
+
+    assert buf.getvalue() == "c"
@@ -0,0 +1,216 @@
+"""Tests for environment chain lookups and their owner caches."""
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.interpreter import Environment, Interpreter, LeafFrame
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.output import BufferOutput
+from hausalang.core.stack_interpreter import StackInterpreter
+
+
+def run(code, engine=Interpreter):
+    output = BufferOutput()
+    engine(output=output).interpret(parser.parse(tokenize_program(code)))
+    return output.getvalue()
+
+
+def chain(depth):
+    """Return a global environment and an environment `depth` levels below."""
+    root = Environment()
+    env = root
+    for _ in range(depth):
+        env = Environment(parent=env)
+    return root, env
+
+
+class TestLookups:
+    """Environment.get_variable / get_function / function_exists"""
+
+    def test_deep_chain_does_not_recurse(self):
+        root, env = chain(10_000)
+        root.define_variable("x", 1)
+        assert env.get_variable("x") == 1
+        assert env.function_exists("f") is False
+
+    def test_function_exists(self):
+        root, env = chain(5)
+        func = parser.Function(line=1, column=0, name="f", parameters=[], body=[])
+        root.define_function("f", func)
+        assert env.function_exists("f")
+        assert env.get_function("f") is func
+        with pytest.raises(NameError):
+            env.get_function("g")
+
+    def test_undefined_variable(self):
+        _, env = chain(3)
+        with pytest.raises(NameError, match="Undefined variable: x"):
+            env.get_variable("x")
+
+    def test_cached_owner_is_shadowed_by_local_definition(self):
+        root, env = chain(3)
+        root.define_variable("x", "global")
+        assert env.get_variable("x") == "global"
+        env.define_variable("x", "local")
+        assert env.get_variable("x") == "local"
+
+    def test_cache_sees_new_values(self):
+        root, env = chain(3)
+        root.define_variable("x", 1)
+        assert env.get_variable("x") == 1
+        root.define_variable("x", 2)
+        assert env.get_variable("x") == 2
+
+    def test_child_below_shadowing_scope(self):
+        root, middle = chain(3)
+        root.define_variable("x", "global")
+        assert middle.get_variable("x") == "global"
+        middle.define_variable("x", "middle")
+        inner = Environment(parent=Environment(parent=middle))
+        assert inner.get_variable("x") == "middle"
+
+
+@pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+class TestShadowing:
+    """Dynamic scoping through nested calls"""
+
+    def test_global_read_from_deep_recursion(self, engine):
+        code = """
+step = 2
+aiki down(n):
+    idan n > 0:
+        mayar down(n - 1) + step
+    mayar step
+rubuta down(60)
+"""
+        assert run(code, engine) == "122"
+
+    def test_caller_local_shadows_global(self, engine):
+        code = """
+x = "global"
+aiki show():
+    mayar x
+aiki outer():
+    a = show()
+    x = "outer"
+    mayar a + " " + show()
+rubuta outer()
+rubuta ","
+rubuta show()
+"""
+        assert run(code, engine) == "global outer,global"
+
+    def test_shadowing_per_recursion_level(self, engine):
+        code = """
+x = 0
+aiki read():
+    mayar x
+aiki level(n):
+    idan n == 0:
+        mayar read()
+    idan n == 3:
+        x = 100
+    mayar level(n - 1) + read()
+rubuta level(5)
+"""
+        # read() sees 0 at levels 5 and 4, 100 from level 3 down
+        assert run(code, engine) == "400"
+
+    def test_nested_function_shadows_global_function(self, engine):
+        code = """
+aiki f():
+    mayar "global"
+aiki call_f(n):
+    idan n > 0:
+        mayar call_f(n - 1)
+    mayar f()
+aiki outer():
+    a = call_f(3)
+    aiki f():
+        mayar "nested"
+    mayar a + " " + call_f(3)
+rubuta outer()
+rubuta ","
+rubuta call_f(3)
+"""
+        assert run(code, engine) == "global nested,global"
+
+
+@pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+class TestLeafFrames:
+    """Calls to leaf functions run on reused LeafFrames"""
+
+    def test_frame_is_reused(self, engine):
+        code = (
+            "aiki sq(x):\n    mayar x * x\n"
+            "s = 0\ndon i = 0 zuwa 50:\n    s = s + sq(i)\n"
+        )
+        interpreter = engine(output=BufferOutput())
+        interpreter.interpret(parser.parse(tokenize_program(code)))
+        assert interpreter.global_env.variables["s"] == sum(i * i for i in range(50))
+        assert [site.leaf for site in interpreter._call_sites.values()] == [True]
+        (frame,) = interpreter._free_frames
+        assert isinstance(frame, LeafFrame)
+        assert frame.parent is None and frame.variables == {}
+
+    def test_locals_do_not_outlive_the_call(self, engine):
+        code = """
+t = "global"
+aiki f(first):
+    idan first:
+        t = "local"
+    mayar t
+rubuta f(1)
+rubuta ","
+rubuta f(0)
+"""
+        assert run(code, engine) == "local,global"
+
+    def test_each_call_sees_its_own_callers(self, engine):
+        code = """
+x = "global"
+aiki leaf():
+    mayar x
+aiki down(n):
+    idan n > 0:
+        mayar down(n - 1)
+    mayar leaf()
+aiki b():
+    x = "b"
+    mayar down(2)
+rubuta down(2)
+rubuta ","
+rubuta b()
+rubuta ","
+rubuta leaf()
+"""
+        assert run(code, engine) == "global,b,global"
+
+    def test_calls_and_definitions_get_a_new_environment(self, engine):
+        code = """
+aiki one():
+    mayar 1
+aiki caller():
+    mayar one()
+aiki definer():
+    aiki local():
+        mayar 2
+    mayar 3
+rubuta caller() + definer()
+"""
+        interpreter = engine(output=BufferOutput())
+        interpreter.interpret(parser.parse(tokenize_program(code)))
+        leaves = {
+            site.function.name: site.leaf for site in interpreter._call_sites.values()
+        }
+        assert leaves == {"one": True, "caller": False, "definer": False}
+
+    def test_failed_call_does_not_corrupt_later_calls(self, engine):
+        interpreter = engine(output=BufferOutput())
+        program = "aiki inv(x):\n    y = x\n    mayar 10 / y\n"
+        interpreter.interpret(parser.parse(tokenize_program(program)))
+        with pytest.raises(ZeroDivisionError):
+            interpreter.interpret(parser.parse(tokenize_program("rubuta inv(0)\n")))
+        interpreter.interpret(parser.parse(tokenize_program("rubuta inv(5)\n")))
+        assert interpreter.output.getvalue() == "2"
+        assert "y" not in interpreter.global_env.variables
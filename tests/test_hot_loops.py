@@ -0,0 +1,166 @@
+"""Tests for compiled (hot) `kadai` loops."""
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.hot_loops import compile_loop
+from hausalang.core.interpreter import Interpreter
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.output import BufferOutput, OutputLimitError
+from hausalang.core.stack_interpreter import StackInterpreter
+
+
+def run(code, threshold=3, max_output=None):
+    out = BufferOutput(max_output=max_output)
+    interpreter = Interpreter(output=out)
+    interpreter.hot_loop_threshold = threshold
+    interpreter.interpret(parser.parse(tokenize_program(code)))
+    return interpreter
+
+
+def result(code, threshold=3):
+    interpreter = run(code, threshold)
+    return interpreter.output.getvalue(), interpreter.global_env.variables
+
+
+def compiled(interpreter):
+    return [loop for loop in interpreter._hot_loops.values() if loop.run]
+
+
+PROGRAMS = [
+    """
+i = 0
+total = 0
+kadai i < 50:
+    total = total + i * 2 - 1
+    i = i + 1
+rubuta total
+""",
+    """
+n = 97
+steps = 0
+kadai n != 1:
+    idan n % 2 == 0:
+        n = n / 2
+    in ba haka ba:
+        n = n * 3 + 1
+    steps = steps + 1
+rubuta steps
+""",
+    """
+x = 1.0
+k = 0
+kadai k < 20:
+    x = x / 2 + k
+    rubuta x
+    rubuta " "
+    k = k + 1
+""",
+    """
+row = 0
+cells = 0
+kadai row < 30:
+    col = 0
+    kadai col < row:
+        idan col % 3 != 1:
+            cells = cells + 1
+        col = col + 1
+    row = row + 1
+rubuta cells
+""",
+]
+
+
+class TestHotLoops:
+    """Compiled loops behave like the tree-walking interpreter"""
+
+    @pytest.mark.parametrize("code", PROGRAMS)
+    def test_same_output_and_state(self, code):
+        hot = run(code)
+        assert compiled(hot)
+        assert result(code) == result(code, threshold=None)
+
+    def test_type_change_is_not_compiled(self):
+        code = "t = 0\nk = 0\nkadai k < 10:\n    t = k\n    t = t * 1.5\n    k = k + 1"
+        hot = run(code)
+        assert not compiled(hot)
+        assert result(code) == result(code, threshold=None)
+
+    def test_nonlocal_names_are_not_compiled(self):
+        code = """
+limit = 50
+aiki count():
+    i = 0
+    kadai i < limit:
+        i = i + 1
+    mayar i
+rubuta count()
+"""
+        hot = run(code)
+        assert not compiled(hot)
+        assert hot.output.getvalue() == "50"
+
+    def test_guard_failure_deoptimises(self):
+        code = """
+aiki halve(x):
+    kadai x > 1:
+        x = x / 2
+    mayar x
+rubuta halve(1000)
+rubuta " "
+rubuta halve(1000.0)
+"""
+        hot = run(code)
+        assert len(compiled(hot)) == 1
+        assert hot.output.getvalue() == "1 0.9765625"
+
+    def test_error_writes_back_variables(self):
+        code = "k = 0\nx = 0\nkadai k < 10:\n    k = k + 1\n    x = 10 / (5 - k)"
+        interpreter = Interpreter(output=BufferOutput())
+        interpreter.hot_loop_threshold = 1
+        with pytest.raises(ZeroDivisionError):
+            interpreter.interpret(parser.parse(tokenize_program(code)))
+        assert compiled(interpreter)
+        assert interpreter.global_env.variables == {"k": 5, "x": 10}
+
+    def test_output_limit_inside_compiled_loop(self):
+        code = "i = 0\nkadai i < 100:\n    rubuta i\n    i = i + 1"
+        with pytest.raises(OutputLimitError):
+            run(code, max_output=25)
+
+    def test_unsupported_statements(self):
+        for body in (
+            "    f(i)",
+            "    don j = 0 zuwa 2:\n        i = i + 1",
+            '    s = "a"',
+        ):
+            stmt = parser.parse(
+                tokenize_program("kadai i < 10:\n" + body + "\n    i = i + 1")
+            ).statements[0]
+            assert compile_loop(stmt, {"i": 0, "j": 0, "s": ""}).run is None
+
+    def test_non_finite_literals(self):
+        # Too large for a float: the literal's value is inf
+        huge = "1" + "0" * 400 + ".0"
+        code = (
+            f"x = 0.0\ny = 0.0\ni = 0\nkadai i < 10:\n    x = x + {huge}\n"
+            f"    y = y - {huge}\n    idan x < {huge}:\n        rubuta 0\n"
+            "    i = i + 1\nrubuta x\nrubuta y\n"
+        )
+        output, variables = result(code, threshold=1)
+        assert output == "inf-inf"
+        assert variables["i"] == 10
+
+        stack_output = BufferOutput()
+        StackInterpreter(output=stack_output).interpret(
+            parser.parse(tokenize_program(code))
+        )
+        assert stack_output.getvalue() == output
+
+    def test_expression_too_deep_for_python_is_not_compiled(self):
+        chain = " + ".join(["b * b"] * 300)
+        code = f"b = 2\nt = 0\ni = 0\nkadai i < 10:\n    t = t + {chain}\n"
+        code += "    i = i + 1\nrubuta t"
+        interpreter = run(code, threshold=1)
+        assert interpreter.output.getvalue() == str(10 * 300 * 4)
+        assert not compiled(interpreter)
@@ -0,0 +1,161 @@
+"""Tests for memoization of pure functions."""
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.interpreter import Interpreter
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.memoize import PurityAnalyzer
+from hausalang.core.output import BufferOutput
+from hausalang.core.stack_interpreter import StackInterpreter
+from hausalang.repl.directives import DirectiveProcessor
+from hausalang.repl.session import ReplSession
+
+FIB = """
+aiki fib(n):
+    idan n < 2:
+        mayar n
+    mayar fib(n - 1) + fib(n - 2)
+"""
+
+
+def run(code, engine=Interpreter, **options):
+    interpreter = engine(output=BufferOutput(), **options)
+    interpreter.interpret(parser.parse(tokenize_program(code)))
+    return interpreter
+
+
+def purity(code):
+    functions = {
+        stmt.name: stmt
+        for stmt in parser.parse(tokenize_program(code)).statements
+        if isinstance(stmt, parser.Function)
+    }
+    analyzer = PurityAnalyzer(functions.get)
+    return {name: analyzer.is_pure(func) for name, func in functions.items()}
+
+
+class TestPurity:
+    """Which functions count as pure"""
+
+    def test_recursive_arithmetic_is_pure(self):
+        assert purity(FIB) == {"fib": True}
+
+    def test_mutual_recursion_is_pure(self):
+        code = """
+aiki is_even(n):
+    idan n == 0:
+        mayar 1
+    mayar is_odd(n - 1)
+
+aiki is_odd(n):
+    idan n == 0:
+        mayar 0
+    mayar is_even(n - 1)
+"""
+        assert purity(code) == {"is_even": True, "is_odd": True}
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            "    rubuta n\n    mayar n",
+            "    mayar n + limit",
+            "    idan n > 0:\n        k = 1\n    mayar k",
+            "    aiki inner():\n        mayar 1\n    mayar n",
+            "    mayar show(n)",
+            "    mayar missing(n)",
+        ],
+    )
+    def test_impure(self, body):
+        code = f"aiki show(x):\n    rubuta x\n\naiki f(n):\n{body}\n"
+        assert purity(code)["f"] is False
+
+    def test_locals_and_loops(self):
+        code = """
+aiki total(n):
+    s = 0
+    don i = 0 zuwa n:
+        s = s + i
+    idan s > 10:
+        k = 1
+    in ba haka ba:
+        k = 2
+    mayar s * k
+"""
+        assert purity(code) == {"total": True}
+
+
+class TestMemoization:
+    """Calls to pure functions are cached"""
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_fib_is_linear(self, engine):
+        interpreter = run(FIB + "x = fib(80)", engine, memoize=True)
+        assert interpreter.global_env.get_variable("x") == 23416728348467685
+        (stats,) = interpreter.memo_stats()
+        assert (stats.function, stats.misses, stats.hits) == ("fib", 81, 78)
+
+    def test_off_by_default(self):
+        interpreter = run(FIB + "x = fib(10)")
+        assert interpreter.global_env.get_variable("x") == 55
+        assert interpreter.memo_stats() == []
+
+    def test_argument_types_are_part_of_the_key(self):
+        code = "aiki half(n):\n    mayar n / 2\na = half(3)\nb = half(3.0)"
+        env = run(code, memoize=True).global_env
+        assert (env.get_variable("a"), env.get_variable("b")) == (1, 1.5)
+
+    def test_impure_calls_are_not_cached(self):
+        code = "aiki show(n):\n    rubuta n\n    mayar n\nshow(1)\nshow(1)"
+        interpreter = run(code, memoize=True)
+        assert interpreter.output.getvalue() == "11"
+        assert interpreter.memo_stats() == []
+
+    def test_redefinition_drops_caches(self):
+        code = """
+aiki f(n):
+    mayar n
+a = f(1)
+aiki f(n):
+    mayar n + 1
+b = f(1)
+"""
+        env = run(code, memoize=True).global_env
+        assert (env.get_variable("a"), env.get_variable("b")) == (1, 2)
+
+    def test_nested_definitions_disable_memoization(self):
+        code = """
+aiki base():
+    mayar 1
+aiki g():
+    mayar base()
+aiki outer():
+    aiki base():
+        mayar 2
+    mayar g()
+a = g()
+b = outer()
+"""
+        interpreter = run(code, memoize=True)
+        env = interpreter.global_env
+        assert (env.get_variable("a"), env.get_variable("b")) == (1, 2)
+
+    def test_cache_is_bounded(self):
+        code = "aiki sq(n):\n    mayar n * n\ndon i = 0 zuwa 10:\n    sq(i)"
+        interpreter = run(code, memoize=True, memo_size=3)
+        (stats,) = interpreter.memo_stats()
+        assert stats.size == 3
+
+
+def test_memo_directive():
+    session = ReplSession()
+    directives = DirectiveProcessor(session)
+    assert directives.process(":memo on") == "Memoization on."
+    session.execute(FIB)
+    session.execute("rubuta fib(30)")
+    report = directives.process(":memo")
+    assert report.splitlines() == [
+        "Memoization is on.",
+        "fib(): 28 hits, 31 misses, 31 cached",
+    ]
+    assert directives.process(":memo off") == "Memoization off."
@@ -0,0 +1,544 @@
+"""Tests for the AST optimizer passes."""
+
+import glob
+import os
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.interpreter import Interpreter, interpret_program
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.optimizer import (
+    MAX_FOLDED_STRING,
+    HoistedLoop,
+    Let,
+    OptimizerOptions,
+    OptimizerStats,
+    count_nodes,
+    fold_constants,
+    hoist_loop_invariants,
+    inline_functions,
+    optimize,
+    propagate_constants,
+)
+from hausalang.core.output import BufferOutput
+from hausalang.core.stack_interpreter import StackInterpreter
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+NO_PASSES = OptimizerOptions(
+    constant_folding=False,
+    constant_propagation=False,
+    inlining=False,
+    algebraic_simplification=False,
+    dead_code=False,
+    loop_invariant_motion=False,
+    common_subexpressions=False,
+    type_specialization=False,
+)
+
+
+def parse(code):
+    return parser.parse(tokenize_program(code))
+
+
+def value_of(code):
+    """Optimize a single `x = ...` program and return the node for x."""
+    return optimize(parse(code)).statements[-1].value
+
+
+def run(program):
+    output = BufferOutput()
+    Interpreter(output=output).interpret(program)
+    return output.getvalue()
+
+
+class TestConstantFolding:
+    """fold_constants"""
+
+    def test_arithmetic(self):
+        assert value_of("x = 2 + 3 * 4").value == 14
+
+    def test_nested_in_loop_and_function(self):
+        program = fold_constants(
+            parse("aiki f(n):\n    kadai n < 60 * 60:\n        n = n + 2 * 3\n")
+        )
+        loop = program.statements[0].body[0]
+        assert loop.condition.right.value == 3600
+        assert loop.body[0].value.right.value == 6
+
+    def test_integer_division_floors(self):
+        assert value_of("x = 7 / 2").value == 3
+        assert value_of("x = -7 / 2").value == -4
+
+    def test_float_division(self):
+        assert value_of("x = 7 / 2.0").value == 3.5
+
+    def test_unary_and_strings(self):
+        assert value_of("x = -(2 + 3)").value == -5
+        assert value_of('x = "ab" + "cd"').value == "abcd"
+
+    def test_comparison(self):
+        assert value_of("x = 3 > 2").value is True
+
+    @pytest.mark.parametrize("code", ["x = 1 / 0", "x = 5 % 0", 'x = "a" - 1'])
+    def test_errors_are_not_folded(self, code):
+        assert isinstance(value_of(code), parser.BinaryOp)
+
+    def test_division_by_zero_still_fails_at_run_time(self):
+        program = optimize(parse('rubuta "before"\nrubuta 1 / 0\n'))
+        output = BufferOutput()
+        with pytest.raises(ZeroDivisionError):
+            Interpreter(output=output).interpret(program)
+        assert output.getvalue() == "before"
+
+    def test_long_strings_are_not_folded(self):
+        code = f'x = "a" * {MAX_FOLDED_STRING + 1}'
+        assert isinstance(value_of(code), parser.BinaryOp)
+
+    def test_identifiers_are_not_folded(self):
+        program = optimize(parse("y = 1\nx = y + 1\ny = 2"))
+        assert isinstance(program.statements[1].value, parser.BinaryOp)
+
+
+class TestConstantPropagation:
+    """propagate_constants"""
+
+    def test_single_assignment(self):
+        program = optimize(parse("day = 60 * 60 * 24\nx = day * 7\n"))
+        assert program.statements[1].value.value == 604800
+
+    def test_assignment_is_kept(self):
+        program = optimize(parse("k = 3\nrubuta k\n"))
+        assert program.statements[0] == parse("k = 3").statements[0]
+
+    def test_reassigned_variable(self):
+        program = propagate_constants(parse("k = 3\nk = 4\nrubuta k\n"))
+        assert isinstance(program.statements[2].expression, parser.Identifier)
+
+    def test_assigned_in_loop(self):
+        program = propagate_constants(
+            parse("k = 3\ndon i = 0 zuwa 2:\n    k = i\nrubuta k\n")
+        )
+        assert isinstance(program.statements[2].expression, parser.Identifier)
+
+    @pytest.mark.parametrize(
+        "binding",
+        [
+            "aiki f(k):\n    mayar k\n",
+            "aiki f():\n    k = 1\n    mayar k\n",
+            "aiki f():\n    don k = 0 zuwa 1:\n        rubuta k\n",
+        ],
+    )
+    def test_any_other_binding_blocks_propagation(self, binding):
+        program = propagate_constants(parse(f"k = 3\n{binding}rubuta k\n"))
+        assert isinstance(program.statements[-1].expression, parser.Identifier)
+
+    def test_not_propagated_before_assignment(self):
+        program = propagate_constants(parse("rubuta k\nk = 3\n"))
+        assert isinstance(program.statements[0].expression, parser.Identifier)
+
+    def test_function_defined_after(self):
+        program = propagate_constants(parse("k = 3\naiki f():\n    mayar k\n"))
+        assert program.statements[1].body[0].expression.value == 3
+
+    def test_function_defined_before_still_fails_early(self):
+        code = "aiki f():\n    mayar k\nrubuta f()\nk = 3\n"
+        program = propagate_constants(parse(code))
+        assert isinstance(program.statements[0].body[0].expression, parser.Identifier)
+        with pytest.raises(NameError):
+            run(program)
+
+    def test_chained_constants(self):
+        program = optimize(parse("a = 2\nb = a * 10\nrubuta b + a\n"))
+        assert program.statements[2].expression == parser.Number(3, 9, 22)
+
+
+class TestDeadCode:
+    """eliminate_dead_code"""
+
+    def statements(self, code):
+        return optimize(parse(code)).statements
+
+    def test_constant_if(self):
+        code = "idan 0:\n    rubuta 1\nin ba haka ba:\n    rubuta 2\nrubuta 3\n"
+        statements = self.statements(code)
+        assert [stmt.expression.value for stmt in statements] == [2, 3]
+
+    def test_folded_condition(self):
+        assert self.statements("idan 2 > 3:\n    rubuta 1\n") == []
+
+    def test_elif_chain(self):
+        code = (
+            "aiki f(x):\n"
+            "    idan x > 10:\n        mayar 1\n"
+            "    kuma 0:\n        mayar 2\n"
+            "    kuma 3 > 2:\n        mayar 3\n"
+            "    in ba haka ba:\n        mayar 4\n"
+            "    rubuta 5\n"
+        )
+        body = self.statements(code)[0].body
+        # Only `idan x > 10` is left, with `mayar 3` as its else branch
+        assert len(body) == 1
+        assert [stmt.expression.value for stmt in body[0].else_body] == [3]
+
+    def test_elif_chain_behaves_the_same(self):
+        code = (
+            "x = 5\n"
+            "idan x > 10:\n    rubuta 1\n"
+            "kuma x > 7:\n    rubuta 2\n"
+            "kuma 1:\n    rubuta 3\n"
+            "in ba haka ba:\n    rubuta 4\n"
+        )
+        assert run(optimize(parse(code))) == run(parse(code)) == "3"
+
+    def test_false_while(self):
+        statements = self.statements("kadai 0:\n    rubuta 1\nrubuta 2\n")
+        assert [stmt.expression.value for stmt in statements] == [2]
+
+    def test_statements_after_return(self):
+        code = "aiki f():\n    mayar 1\n    rubuta 2\n    mayar 3\n"
+        assert len(self.statements(code)[0].body) == 1
+
+    def test_statements_after_returning_if(self):
+        code = (
+            "aiki f(x):\n"
+            "    idan x:\n        mayar 1\n"
+            "    in ba haka ba:\n        mayar 2\n"
+            "    rubuta 3\n"
+        )
+        assert len(self.statements(code)[0].body) == 1
+
+    def test_statements_after_endless_loop(self):
+        code = "aiki f(x):\n    kadai 1:\n        mayar x\n    rubuta 3\n"
+        assert len(self.statements(code)[0].body) == 1
+
+    def test_non_literal_conditions_are_kept(self):
+        code = "aiki f(x):\n    idan x:\n        mayar 1\n    rubuta 3\n"
+        assert len(self.statements(code)[0].body) == 2
+
+    def test_dead_assignment_unblocks_propagation(self):
+        code = "k = 3\nidan 0:\n    k = 4\nrubuta k\n"
+        assert self.statements(code)[1].expression.value == 3
+
+
+class TestLoopInvariantMotion:
+    """hoist_loop_invariants"""
+
+    def loop(self, code):
+        """Hoist a program and return its last top-level statement."""
+        return hoist_loop_invariants(parse(code)).statements[-1]
+
+    def test_hoists_from_condition_and_body(self):
+        stmt = self.loop(
+            "n = 4\ni = 0\nkadai i < n * n:\n    rubuta n - 1\n    i = i + 1\n"
+        )
+        assert isinstance(stmt, HoistedLoop)
+        hoisted = [value.operator for _, value in stmt.temporaries]
+        assert sorted(hoisted) == ["*", "-"]
+        assert isinstance(stmt.loop.condition.right, parser.Identifier)
+        assert stmt.loop.condition.right.name.startswith("$")
+
+    def test_assigned_names_are_not_invariant(self):
+        stmt = self.loop("n = 4\ndon i = 0 zuwa 3:\n    rubuta i * 2\n    n = n * 2\n")
+        assert isinstance(stmt, parser.For)
+
+    def test_calls_are_not_hoisted(self):
+        code = (
+            'aiki f(x):\n    rubuta "call"\n    mayar x\n'
+            "don i = 0 zuwa 3:\n    rubuta f(2) + 1\n"
+        )
+        assert isinstance(self.loop(code), parser.For)
+
+    def test_function_bodies_are_left_alone(self):
+        code = "n = 2\ndon i = 0 zuwa 3:\n    aiki g(x):\n        mayar n * n\n"
+        assert isinstance(self.loop(code), parser.For)
+
+    def test_nested_loops_hoist_to_outermost(self):
+        code = (
+            "n = 3\n"
+            "don i = 0 zuwa 3:\n"
+            "    don j = 0 zuwa 3:\n"
+            "        rubuta n * n\n"
+        )
+        stmt = self.loop(code)
+        inner = stmt.loop.body[0]
+        assert isinstance(stmt, HoistedLoop)
+        assert stmt.temporaries[0][1].operator == "*"
+        assert isinstance(inner.temporaries[0][1], parser.Identifier)
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_temporaries_are_hidden(self, engine):
+        code = (
+            "n = 3\n"
+            "aiki f(k):\n"
+            "    don i = 0 zuwa 10:\n"
+            "        idan i == k * 2:\n"
+            "            mayar i\n"
+            "x = f(n)\n"
+            "don i = 0 zuwa 2:\n"
+            "    rubuta n + 1\n"
+        )
+        interpreter = engine(output=BufferOutput())
+        interpreter.interpret(optimize(parse(code)))
+        assert interpreter.global_env.variables == {"n": 3, "x": 6, "i": 2}
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_errors_are_deferred(self, engine):
+        code = (
+            "d = 0\n"
+            "don i = 0 zuwa 0:\n"
+            "    rubuta 1 / d\n"
+            "don i = 0 zuwa 3:\n"
+            "    rubuta i\n"
+            "    idan i == 2:\n"
+            '        rubuta "a" - d\n'
+        )
+        program = optimize(parse(code))
+        assert isinstance(program.statements[1], HoistedLoop)
+        output = BufferOutput()
+        with pytest.raises(TypeError):
+            engine(output=output).interpret(program)
+        # The empty loop never divides; the second one fails at i == 2
+        assert output.getvalue() == "012"
+
+    def test_memoized_functions_stay_pure(self):
+        code = (
+            "aiki f(n):\n"
+            "    s = 0\n"
+            "    don i = 0 zuwa n:\n"
+            "        s = s + n * n\n"
+            "    mayar s\n"
+            "rubuta f(3) + f(3)\n"
+        )
+        interpreter = Interpreter(output=BufferOutput(), memoize=True)
+        interpreter.interpret(optimize(parse(code)))
+        assert interpreter.output.getvalue() == "54"
+        assert interpreter.memo_stats()[0].hits == 1
+
+
+SQUARE = "aiki square(x):\n    mayar x * x\n"
+
+
+class TestInlining:
+    """inline_functions"""
+
+    def inlined(self, code):
+        """Inline a program and return the expression of its last `rubuta`."""
+        statements = inline_functions(parse(code)).statements
+        return [stmt for stmt in statements if isinstance(stmt, parser.Print)][
+            -1
+        ].expression
+
+    def test_literal_arguments(self):
+        assert optimize(parse(SQUARE + "rubuta square(3)\n")).statements[
+            -1
+        ].expression == parser.Number(line=3, column=7, value=9)
+
+    def test_variable_arguments_are_read_in_place(self):
+        expr = self.inlined(SQUARE + "n = 2\nrubuta square(n)\n")
+        assert isinstance(expr, Let)
+        ((name, argument),) = expr.bindings
+        assert (name, argument.name) == (None, "n")
+        assert (expr.body.left.name, expr.body.right.name) == ("n", "n")
+
+    def test_other_arguments_use_temporaries(self):
+        expr = self.inlined(SQUARE + "n = 2\nrubuta square(n + 1)\n")
+        ((name, argument),) = expr.bindings
+        assert name.startswith("$x@")
+        assert argument.operator == "+"
+        assert expr.body.left.name == name
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            "aiki f(x):\n    y = x\n    mayar y\nrubuta f(1)\n",
+            "aiki f(x):\n    mayar square(x)\nrubuta f(1)\n",
+            "aiki f(x):\n    mayar x + " + " + ".join(["1"] * 8) + "\nrubuta f(1)\n",
+            "rubuta square(1)\n" + SQUARE,
+            SQUARE + "rubuta square(1, 2)\n",
+            SQUARE
+            + "aiki g():\n    aiki square(x):\n        mayar x\nrubuta square(1)\n",
+            "idan 1:\n    aiki square(x):\n        mayar x * x\nrubuta square(1)\n",
+        ],
+        ids=[
+            "statements",
+            "calls",
+            "too_large",
+            "called_before_definition",
+            "wrong_arity",
+            "redefined",
+            "not_top_level",
+        ],
+    )
+    def test_not_inlined(self, code):
+        assert isinstance(self.inlined(code), parser.FunctionCall)
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_arguments_are_evaluated_in_order(self, engine):
+        code = (
+            "aiki add(a, b):\n"
+            "    mayar a + b\n"
+            "aiki loud(v):\n"
+            "    rubuta v\n"
+            "    mayar v\n"
+            "rubuta add(loud(1), loud(2))\n"
+            "rubuta add(loud(3), missing)\n"
+        )
+        program = optimize(parse(code))
+        assert isinstance(program.statements[2].expression, Let)
+        interpreter = engine(output=BufferOutput())
+        with pytest.raises(NameError, match="missing"):
+            interpreter.interpret(program)
+        assert interpreter.output.getvalue() == "1233"
+        # The temporaries are gone, even after the error
+        assert list(interpreter.global_env.variables) == []
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_free_names_are_read_from_the_caller(self, engine):
+        code = (
+            "k = 10\n"
+            "aiki scale(x):\n"
+            "    mayar x * k\n"
+            "aiki f(k):\n"
+            "    mayar scale(2)\n"
+            "rubuta f(3)\n"
+            'rubuta ","\n'
+            "rubuta scale(2)\n"
+        )
+        program = optimize(parse(code))
+        assert isinstance(program.statements[2].body[0].expression, parser.BinaryOp)
+        output = BufferOutput()
+        engine(output=output).interpret(program)
+        assert output.getvalue() == "6,20"
+
+    def test_helper_calls_in_hot_loops_are_compiled(self):
+        code = (
+            SQUARE
+            + "s = 0\ni = 0\nkadai i < 2000:\n    s = s + square(i)\n    i = i + 1\n"
+        )
+        interpreter = Interpreter(output=BufferOutput())
+        interpreter.interpret(optimize(parse(code)))
+        assert interpreter.global_env.variables["s"] == sum(i * i for i in range(2000))
+        assert [loop.run is not None for loop in interpreter._hot_loops.values()] == [
+            True
+        ]
+
+
+class TestPipeline:
+    """optimize() and OptimizerOptions"""
+
+    def test_flags_switch_passes_off(self):
+        program = parse("a = 2\nrubuta a * 3\n")
+        assert optimize(program, NO_PASSES) == program
+        folded_only = optimize(program, OptimizerOptions(constant_propagation=False))
+        assert isinstance(folded_only.statements[1].expression, parser.BinaryOp)
+
+    def test_input_is_not_modified(self):
+        program = parse("rubuta 1 + 2\n")
+        optimize(program)
+        assert isinstance(program.statements[0].expression, parser.BinaryOp)
+
+    def test_levels(self):
+        assert not OptimizerOptions.for_level(0).any_enabled()
+        level_1 = OptimizerOptions.for_level(1)
+        assert level_1.constant_folding and level_1.inlining
+        assert not level_1.type_specialization
+        assert OptimizerOptions.for_level(2) == OptimizerOptions()
+        partial = OptimizerOptions.for_level(2, whole_program=False)
+        assert not partial.constant_propagation and not partial.inlining
+        assert partial.loop_invariant_motion
+        with pytest.raises(ValueError, match="optimization level"):
+            OptimizerOptions.for_level(3)
+
+    def test_stats(self):
+        program = parse("aiki sq(n):\n    mayar n * n\nx = 2 * 3\nrubuta sq(x)\n")
+        stats = OptimizerStats()
+        optimized = optimize(program, OptimizerOptions.for_level(1), stats)
+        assert stats.passes() == [
+            "constant_folding",
+            "constant_propagation",
+            "inlining",
+            "dead_code",
+        ]
+        assert stats.nodes_before == count_nodes(program)
+        assert stats.nodes_after == count_nodes(optimized) < stats.nodes_before
+        assert stats.nodes_after - stats.nodes_before == sum(
+            stats.node_changes.values()
+        )
+        assert stats.node_changes["constant_folding"] < 0
+        assert stats.rounds >= 2
+        data = stats.to_dict()
+        assert data["passes"]["inlining"]["rewrites"] == 1
+        assert data["passes"]["inlining"]["milliseconds"] >= 0
+        report = stats.format().splitlines()
+        assert report[0].endswith(f"{stats.nodes_before} -> {stats.nodes_after} nodes")
+        assert len(report) == 5
+        assert report[3].split()[:3] == ["inlining:", "1", "rewrites"]
+
+    def test_hoisted_loop_fallback_is_not_counted(self):
+        code = "k = 2\nk = k + 1\ni = 0\nkadai i < 3:\n    i = i + k * k\n"
+        program = parse(code)
+        hoisted = hoist_loop_invariants(program)
+        assert isinstance(hoisted.statements[3], HoistedLoop)
+        # Only the HoistedLoop and the Identifier read in place of `k * k`
+        assert count_nodes(hoisted) == count_nodes(program) + 2
+
+    @pytest.mark.parametrize("level", [0, 1, 2])
+    def test_interpret_program_levels(self, level):
+        output = BufferOutput()
+        stats = OptimizerStats()
+        interpret_program(
+            "x = 6\nrubuta x * 7\n",
+            interpreter=Interpreter(output=output),
+            opt_level=level,
+            optimizer_stats=stats,
+        )
+        assert output.getvalue() == "42"
+        assert bool(stats.rewrites) == (level > 0)
+
+    @pytest.mark.parametrize("level", [1, 2])
+    def test_expression_too_deep_to_optimize(self, level):
+        code = "x = 1\nrubuta " + " + ".join(["x"] * 600) + "\n"
+        output = BufferOutput()
+        stats = OptimizerStats()
+        interpret_program(
+            code,
+            interpreter=StackInterpreter(output=output),
+            opt_level=level,
+            optimizer_stats=stats,
+        )
+        assert output.getvalue() == "600"
+        assert stats.nodes_after == stats.nodes_before
+        assert not any(stats.rewrites.values())
+
+    def test_interpret_program_rejects_unknown_levels(self):
+        with pytest.raises(ValueError):
+            interpret_program("rubuta 1\n", opt_level=-1)
+
+    def test_error_location_is_kept(self):
+        program = optimize(parse('x = 10\ny = 20\nrubuta x + y + "a"\n'))
+        expression = program.statements[2].expression
+        assert (expression.line, expression.left.value) == (3, 30)
+        with pytest.raises(TypeError):
+            run(program)
+
+    @pytest.mark.parametrize(
+        "path",
+        sorted(glob.glob(os.path.join(ROOT, "examples", "**", "*.ha"), recursive=True)),
+        ids=os.path.basename,
+    )
+    def test_examples_behave_the_same(self, path):
+        with open(path, encoding="utf-8") as f:
+            program = parse(f.read())
+        results = []
+        for options in (NO_PASSES, OptimizerOptions()):
+            output = BufferOutput()
+            interpreter = Interpreter(output=output)
+            try:
+                interpreter.interpret(optimize(program, options))
+                error = None
+            except Exception as e:
+                error = type(e)
+            results.append((output.getvalue(), interpreter.global_env.variables, error))
+        assert results[0] == results[1]
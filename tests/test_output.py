@@ -0,0 +1,101 @@
+"""Tests for pluggable `rubuta` output sinks."""
+
+import io
+
+import pytest
+
+from hausalang.core.errors import ContextualError, ErrorKind
+from hausalang.core.interpreter import Interpreter, interpret_program
+from hausalang.core.output import (
+    BufferOutput,
+    CallbackOutput,
+    OutputSink,
+    StreamOutput,
+)
+from hausalang.repl.session import ReplSession
+
+PRINT_LOOP = 'don i = 0 zuwa 5:\n    rubuta i\n    rubuta ","'
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts write() calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestSinks:
+    """Each sink receives exactly what the program printed"""
+
+    def test_default_writes_to_stdout(self, capsys):
+        interpret_program(PRINT_LOOP)
+        assert capsys.readouterr().out == "0,1,2,3,4,"
+
+    def test_buffer_output(self, capsys):
+        buf = BufferOutput()
+        interpret_program(PRINT_LOOP, interpreter=Interpreter(output=buf))
+        assert buf.getvalue() == "0,1,2,3,4,"
+        assert capsys.readouterr().out == ""
+
+    def test_stream_output_writes_in_blocks(self):
+        stream = CountingStream()
+        sink = StreamOutput(stream, block_size=4)
+        interpret_program(PRINT_LOOP, interpreter=Interpreter(output=sink))
+        assert stream.getvalue() == "0,1,2,3,4,"
+        assert stream.writes == 3
+
+    def test_callback_output_chunks(self):
+        chunks = []
+        sink = CallbackOutput(chunks.append, chunk_size=6)
+        interpret_program(PRINT_LOOP, interpreter=Interpreter(output=sink))
+        assert chunks == ["0,1,2,", "3,4,"]
+
+    def test_buffered_output_flushed_before_error(self):
+        stream = io.StringIO()
+        sink = StreamOutput(stream, block_size=1024)
+        with pytest.raises(ContextualError):
+            interpret_program(
+                'rubuta "before"\nrubuta 1 / 0',
+                interpreter=Interpreter(output=sink),
+            )
+        assert stream.getvalue() == "before"
+
+    def test_repl_expression_output_flushed(self):
+        chunks = []
+        s = ReplSession()
+        s.interpreter = Interpreter(output=CallbackOutput(chunks.append))
+        s.execute('aiki f():\n    rubuta "hi"\n    mayar 1')
+        assert s.execute("f()").output == 1
+        assert chunks == ["hi"]
+
+    def test_sink_without_emit_cannot_be_built(self):
+        class NoEmit(OutputSink):
+            pass
+
+        with pytest.raises(TypeError):
+            OutputSink()
+        with pytest.raises(TypeError):
+            NoEmit()
+
+
+class TestOutputLimit:
+    """max_output stops runaway printing with a clean error"""
+
+    def test_limit_raises_output_limit_exceeded(self):
+        buf = BufferOutput(max_output=7)
+        with pytest.raises(ContextualError) as exc_info:
+            interpret_program(
+                'kadai 1:\n    rubuta "abc"', interpreter=Interpreter(output=buf)
+            )
+        assert exc_info.value.kind == ErrorKind.OUTPUT_LIMIT_EXCEEDED
+        assert buf.getvalue() == "abcabca"
+
+    def test_output_within_limit(self):
+        buf = BufferOutput(max_output=10)
+        interpret_program(PRINT_LOOP, interpreter=Interpreter(output=buf))
+        assert buf.getvalue() == "0,1,2,3,4,"
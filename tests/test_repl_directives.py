@@ -58,3 +58,28 @@ def test_load_and_history_and_save(tmp_path):
     assert out_file.exists()
     data = out_file.read_text()
     assert "b = 7" in data
+
+
+def test_opt_directive():
+    s = ReplSession()
+    dp = DirectiveProcessor(s)
+    assert dp.process(":opt") == "Optimization level is 0."
+    assert dp.process(":opt 5") == "Usage: :opt [0|1|2]"
+    assert dp.process(":opt 2") == "Optimization level 2."
+    assert s.opt_level == 2
+
+    s.execute("t = 0\ni = 0\nkadai i < 10:\n    t = t + i * 2\n    i = i + 1\n")
+    assert s.get_variable("t") == 90
+    report = dp.process(":opt")
+    assert report.startswith("Optimization level is 2.\nOptimizer:")
+    assert "type_specialization:" in report
+    # Whole-program passes stay off in the REPL
+    assert "inlining:" not in report
+
+
+def test_opt_keeps_later_redefinitions():
+    s = ReplSession()
+    s.opt_level = 2
+    s.execute("aiki g(n):\n    mayar n * 2\naiki h(n):\n    mayar g(n) + 1\n")
+    s.execute("aiki g(n):\n    mayar n * 3\n")
+    assert s.execute("h(1)").output == 4
@@ -0,0 +1,186 @@
+"""Tests for algebraic simplification and common subexpression elimination."""
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.interpreter import Interpreter
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.optimizer import Let, OptimizerStats, optimize
+from hausalang.core.output import BufferOutput
+from hausalang.core.simplifier import share_subexpressions, simplify_algebra
+from hausalang.core.stack_interpreter import StackInterpreter
+
+# Variables of each type that constant propagation cannot replace
+VARIABLES = 'i = 2\ni = i + 1\nf = 0.5\nf = f * 3\ns = "a"\ns = s + "b"\n'
+
+SHARED = "(i * i + i * 3)"
+
+
+def parse(code):
+    return parser.parse(tokenize_program(code))
+
+
+def printed(program):
+    """Return the expression of the last statement, a rubuta."""
+    return program.statements[-1].expression
+
+
+def run(engine, program):
+    output = BufferOutput()
+    engine(output=output).interpret(program)
+    return output.getvalue()
+
+
+class TestAlgebraicSimplification:
+    """simplify_algebra"""
+
+    @pytest.mark.parametrize(
+        "expression, name",
+        [
+            ("i + 0", "i"),
+            ("0 + i", "i"),
+            ("i - 0", "i"),
+            ("f - 0", "f"),
+            ("f - 0.0", "f"),
+            ("i * 1", "i"),
+            ("1 * f", "f"),
+            ("f * 1.0", "f"),
+            ("i / 1", "i"),
+            ('s + ""', "s"),
+            ('"" + s', "s"),
+            ("+i", "i"),
+            ("-(-f)", "f"),
+        ],
+    )
+    def test_identities(self, expression, name):
+        program = simplify_algebra(parse(VARIABLES + f"rubuta {expression}\n"))
+        assert printed(program) == parser.Identifier(
+            line=7, column=printed(program).column, name=name
+        )
+
+    @pytest.mark.parametrize(
+        "expression",
+        [
+            "f + 0",
+            "i * 1.0",
+            "i / 1.0",
+            "s * 1",
+            "i + 0.0",
+            "1 - i",
+            "+s",
+            "-(-s)",
+        ],
+    )
+    def test_type_changing_operations_are_kept(self, expression):
+        program = simplify_algebra(parse(VARIABLES + f"rubuta {expression}\n"))
+        assert not isinstance(printed(program), parser.Identifier)
+
+    def test_unknown_types_are_kept(self):
+        code = "aiki f(n):\n    mayar n + 0\nrubuta f(1.5)\n"
+        program = simplify_algebra(parse(code))
+        assert isinstance(program.statements[0].body[0].expression, parser.BinaryOp)
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_results_are_unchanged(self, engine):
+        expressions = ["z + 0", "z - 0", "i * 1", "f / 1.0", 's + ""', "b + 0", "b * 1"]
+        code = VARIABLES + "z = 0.0\nz = -z\nb = i > f\n"
+        code += "".join(
+            f'rubuta {expression}\nrubuta " "\n' for expression in expressions
+        )
+        program = optimize(parse(code))
+        assert run(engine, program) == run(engine, parse(code))
+        assert run(engine, program) == "0.0 -0.0 3 1.5 ab 1 1 "
+
+
+class TestCommonSubexpressions:
+    """share_subexpressions"""
+
+    def test_repeated_subexpression_is_shared(self):
+        code = VARIABLES + f"rubuta {SHARED} * {SHARED}\n"
+        expression = printed(share_subexpressions(parse(code)))
+        assert isinstance(expression, Let)
+        ((name, value),) = expression.bindings
+        assert name == "$cse1"
+        assert value == printed(parse(code)).left
+        assert expression.body.left.name == expression.body.right.name == name
+
+    @pytest.mark.parametrize(
+        "expression",
+        [
+            # Saves too little for the cost of the temporary
+            "(i * i) * (i * i)",
+            # May raise
+            "(i * i + i / f) * (i * i + i / f)",
+            "(i * i + i / 0) * (i * i + i / 0)",
+            "(i * i + i * f) * (i * i + i * f)",
+            "(i * i + i * s) * (i * i + i * s)",
+            # Unassigned names
+            "(i * k + i * 3) * (i * k + i * 3)",
+        ],
+    )
+    def test_not_shared(self, expression):
+        code = VARIABLES + f"rubuta {expression}\n"
+        assert not isinstance(printed(share_subexpressions(parse(code))), Let)
+
+    def test_parameters_are_not_shared(self):
+        code = "aiki f(n):\n    mayar (n * n + n) * (n * n + n)\nrubuta f(2)\n"
+        program = share_subexpressions(parse(code))
+        assert not isinstance(program.statements[0].body[0].expression, Let)
+
+    def test_temporaries_are_numbered_program_wide(self):
+        code = VARIABLES + f"x = {SHARED} - {SHARED}\nrubuta {SHARED} * {SHARED}\n"
+        program = share_subexpressions(parse(code))
+        assert program.statements[6].value.bindings[0][0] == "$cse1"
+        assert printed(program).bindings[0][0] == "$cse2"
+        again = share_subexpressions(program)
+        assert again == program
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_results_are_unchanged(self, engine):
+        code = (
+            VARIABLES
+            + f"rubuta {SHARED} * {SHARED}\n"
+            + f"rubuta ({SHARED} < 20) == ({SHARED} < 20)\n"
+            + "t = 0\nj = 0\n"
+            + "kadai j < 300:\n    t = t + (j * j - j) % 7 * (j * j - j) % 7\n"
+            + "    j = j + 1\n"
+            + "rubuta t\n"
+        )
+        program = optimize(parse(code))
+        assert run(engine, program) == run(engine, parse(code))
+
+    def test_hot_loop_with_shared_subexpression_is_compiled(self):
+        code = (
+            "t = 0\nj = 0\nkadai j < 2000:\n"
+            "    t = t + (j * j + j * 3) * (j * j + j * 3)\n"
+            "    j = j + 1\n"
+        )
+        program = optimize(parse(code))
+        assert isinstance(program.statements[2].body[0].value, Let)
+        interpreter = Interpreter(output=BufferOutput())
+        interpreter.interpret(program)
+        assert interpreter.global_env.variables["t"] == sum(
+            (j * j + j * 3) ** 2 for j in range(2000)
+        )
+        assert "$cse1" not in interpreter.global_env.variables
+        assert [loop.run is not None for loop in interpreter._hot_loops.values()] == [
+            True
+        ]
+
+
+class TestStats:
+    """OptimizerStats"""
+
+    def test_rewrite_counts(self):
+        code = (
+            "aiki sq(n):\n    mayar n * n\n"
+            + VARIABLES
+            + f"rubuta sq(i) * 1\nrubuta {SHARED} * {SHARED}\nrubuta 2 + 3\n"
+        )
+        stats = OptimizerStats()
+        optimize(parse(code), stats=stats)
+        assert stats.rewrites["inlining"] == 1
+        assert stats.rewrites["algebraic_simplification"] == 1
+        assert stats.rewrites["common_subexpressions"] == 1
+        assert stats.rewrites["constant_folding"] >= 1
+        assert stats.rewrites["dead_code"] == 0
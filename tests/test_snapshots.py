@@ -0,0 +1,101 @@
+"""Tests for copy-on-write environment snapshots."""
+
+from hausalang.core import parser
+from hausalang.core.interpreter import Interpreter
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.output import BufferOutput
+from hausalang.repl.directives import DirectiveProcessor
+from hausalang.repl.session import ReplSession
+
+
+def execute(interpreter, code):
+    interpreter.interpret(parser.parse(tokenize_program(code)))
+
+
+def variable(interpreter, name):
+    return interpreter.global_env.get_variable(name)
+
+
+class TestSnapshots:
+    """Interpreter.snapshot() / restore()"""
+
+    def test_restore_variables(self):
+        interpreter = Interpreter(output=BufferOutput())
+        execute(interpreter, "x = 1\ny = 2")
+        snapshot = interpreter.snapshot()
+        execute(interpreter, "x = 10\nz = 3")
+        interpreter.restore(snapshot)
+        assert interpreter.global_env.variables == {"x": 1, "y": 2}
+
+    def test_snapshot_is_shared_until_written(self):
+        interpreter = Interpreter(output=BufferOutput())
+        execute(interpreter, "x = 1")
+        snapshot = interpreter.snapshot()
+        assert snapshot.variables is interpreter.global_env.variables
+        execute(interpreter, "x = 2")
+        assert snapshot.variables == {"x": 1}
+        assert snapshot.variables is not interpreter.global_env.variables
+
+    def test_restore_many_times(self):
+        interpreter = Interpreter(output=BufferOutput())
+        execute(interpreter, "n = 0")
+        snapshot = interpreter.snapshot()
+        for _ in range(3):
+            interpreter.restore(snapshot)
+            execute(interpreter, "n = n + 1")
+            assert variable(interpreter, "n") == 1
+
+    def test_restore_functions(self):
+        interpreter = Interpreter(output=BufferOutput())
+        execute(interpreter, "aiki f():\n    mayar 1\na = f()")
+        snapshot = interpreter.snapshot()
+        execute(interpreter, "aiki f():\n    mayar 2\naiki g():\n    mayar 3\nb = f()")
+        assert variable(interpreter, "b") == 2
+        interpreter.restore(snapshot)
+        execute(interpreter, "c = f()")
+        assert variable(interpreter, "c") == 1
+        assert not interpreter.global_env.function_exists("g")
+
+    def test_compiled_loop_does_not_write_into_snapshot(self):
+        interpreter = Interpreter(output=BufferOutput())
+        interpreter.hot_loop_threshold = 2
+        execute(interpreter, "i = 0")
+        snapshot = interpreter.snapshot()
+        execute(interpreter, "kadai i < 100:\n    i = i + 1")
+        assert variable(interpreter, "i") == 100
+        assert snapshot.variables == {"i": 0}
+
+    def test_many_inputs_against_one_setup(self):
+        interpreter = Interpreter(output=BufferOutput())
+        execute(
+            interpreter,
+            "aiki square(x):\n    mayar x * x\ntotal = 0",
+        )
+        setup = interpreter.snapshot()
+        results = []
+        for value in (2, 3, 4):
+            interpreter.restore(setup)
+            execute(interpreter, f"total = total + square({value})")
+            results.append(variable(interpreter, "total"))
+        assert results == [4, 9, 16]
+
+
+def test_repl_snapshot_directives():
+    session = ReplSession()
+    directives = DirectiveProcessor(session)
+    session.execute("x = 1")
+    assert directives.process(":snapshot start") == "Snapshot saved: start"
+    session.execute("x = 2")
+    assert directives.process(":restore start") == "Restored snapshot: start"
+    assert session.get_variable("x") == 1
+    assert directives.process(":restore nope") == "No such snapshot: nope"
+
+
+def test_repl_clear_keeps_interpreter():
+    session = ReplSession()
+    interpreter = session.interpreter
+    session.execute("x = 1\naiki f():\n    mayar 1")
+    session.clear_state()
+    assert session.interpreter is interpreter
+    assert not session.variable_exists("x")
+    assert not session.function_exists("f")
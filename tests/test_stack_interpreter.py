@@ -0,0 +1,109 @@
+"""Tests for the explicit-stack evaluation mode (StackInterpreter)."""
+
+import pytest
+
+from hausalang.core import StackInterpreter
+from hausalang.core.errors import ContextualError, ErrorKind
+from hausalang.core.interpreter import interpret_program
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.optimizer import optimize
+from hausalang.core.output import BufferOutput
+from hausalang.core.parser import parse
+
+COUNT_DOWN = """
+aiki count(n):
+    idan n == 0:
+        mayar 0
+    mayar 1 + count(n - 1)
+
+rubuta count({depth})
+"""
+
+
+class TestStackInterpreterSemantics:
+    """The stack engine runs ordinary programs exactly like Interpreter"""
+
+    def test_functions_loops_and_branches(self, capsys):
+        code = """
+aiki fib(n):
+    idan n < 2:
+        mayar n
+    mayar fib(n - 1) + fib(n - 2)
+
+don i = 0 zuwa 8:
+    rubuta fib(i)
+    rubuta " "
+x = 3
+kadai x > 0:
+    x = x - 1
+idan x == 0:
+    rubuta "done"
+in ba haka ba:
+    rubuta "bad"
+"""
+        interpret_program(code, interpreter=StackInterpreter())
+        assert capsys.readouterr().out == "0 1 1 2 3 5 8 13 done"
+
+    def test_runtime_errors_keep_their_kind(self):
+        with pytest.raises(ContextualError) as exc_info:
+            interpret_program("rubuta 1 / 0", interpreter=StackInterpreter())
+        assert exc_info.value.kind == ErrorKind.DIVISION_BY_ZERO
+
+    def test_interpreter_usable_after_error(self, capsys):
+        interpreter = StackInterpreter(max_call_depth=10)
+        with pytest.raises(ContextualError):
+            interpret_program(COUNT_DOWN.format(depth=50), interpreter=interpreter)
+        assert interpreter.call_depth == 0
+        interpret_program(COUNT_DOWN.format(depth=5), interpreter=interpreter)
+        assert capsys.readouterr().out == "5"
+
+
+class TestDeepRecursion:
+    """Depth is bounded by max_call_depth, not by CPython's recursion limit"""
+
+    def test_recursion_deeper_than_python_limit(self, capsys):
+        interpret_program(COUNT_DOWN.format(depth=3000), interpreter=StackInterpreter())
+        assert capsys.readouterr().out == "3000"
+
+    def test_deeply_nested_expression(self, capsys):
+        code = "rubuta " + " + ".join(["1"] * 5000)
+        interpret_program(code, interpreter=StackInterpreter())
+        assert capsys.readouterr().out == "5000"
+
+    def test_max_call_depth_raises_stack_overflow(self):
+        with pytest.raises(ContextualError) as exc_info:
+            interpret_program(
+                COUNT_DOWN.format(depth=100),
+                interpreter=StackInterpreter(max_call_depth=50),
+            )
+        assert exc_info.value.kind == ErrorKind.STACK_OVERFLOW
+        assert "50" in exc_info.value.message
+
+    def test_tree_interpreter_reports_stack_overflow(self):
+        with pytest.raises(ContextualError) as exc_info:
+            interpret_program(COUNT_DOWN.format(depth=3000))
+        assert exc_info.value.kind == ErrorKind.STACK_OVERFLOW
+
+
+class TestHiddenTemporaries:
+    """Optimizer temporaries are removed even when the program fails"""
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            # Inlined call: the parameter is bound, then the body fails
+            "aiki f(n):\n    mayar n / (n - n)\na = 1\na = a + 2\nrubuta f(a + 1)\n",
+            # Hoisted loop: the invariant is bound, then the loop fails
+            "k = 3\ni = 0\nkadai i < 5:\n    rubuta k * k / (2 - i)\n    i = i + 1\n",
+        ],
+    )
+    def test_removed_after_error(self, code):
+        program = optimize(parse(tokenize_program(code)))
+        interpreter = StackInterpreter(output=BufferOutput())
+        # Holding on to the error (as the REPL does) keeps the failed frames
+        # alive, so their cleanup cannot wait for garbage collection
+        with pytest.raises(ZeroDivisionError) as exc_info:
+            interpreter.interpret(program)
+        hidden = [name for name in interpreter.global_env.variables if "$" in name]
+        assert hidden == []
+        assert exc_info.value is not None
@@ -0,0 +1,121 @@
+"""Tests for the step budget (infinite-loop protection)."""
+
+import threading
+import time
+
+import pytest
+
+from hausalang.core.errors import ContextualError, ErrorKind
+from hausalang.core.interpreter import (
+    Interpreter,
+    StepLimitError,
+    interpret_program,
+    run,
+)
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.output import BufferOutput
+from hausalang.core.parser import parse
+from hausalang.core.stack_interpreter import StackInterpreter
+from hausalang.core.time_limit import TimeLimitError, call_with_time_limit
+
+ENGINES = [Interpreter, StackInterpreter]
+
+RUNAWAY = {
+    "while": "x = 0\nkadai 1 == 1:\n    x = x + 1",
+    "for": "s = 0\ndon i = 0 zuwa 1000000000:\n    s = s + i",
+    "float_for": "s = 0\ndon i = 0.5 zuwa 1000000000:\n    s = s + i",
+    "tail_call": "aiki spin(n):\n    mayar spin(n + 1)\nspin(0)",
+    "calls": "aiki f(x):\n    mayar x\nkadai 1:\n    f(1)",
+}
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", sorted(RUNAWAY))
+def test_runaway_program_is_stopped(engine, name):
+    interpreter = engine(output=BufferOutput(), max_steps=5000)
+    with pytest.raises(ContextualError) as exc_info:
+        run(RUNAWAY[name], interpreter=interpreter)
+    assert exc_info.value.kind == ErrorKind.INFINITE_LOOP
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_budget_counts_back_edges_and_calls(engine):
+    # 10 loop iterations + 10 calls
+    code = "aiki f():\n    mayar 1\ni = 0\nkadai i < 10:\n    f()\n    i = i + 1"
+    run(code, interpreter=engine(output=BufferOutput(), max_steps=20))
+    with pytest.raises(StepLimitError):
+        engine(output=BufferOutput(), max_steps=19).interpret(
+            parse(tokenize_program(code))
+        )
+
+
+def test_compiled_loop_uses_the_same_budget():
+    code = "i = 0\nkadai i < 5000:\n    i = i + 1"
+    for threshold in (None, 10):
+        interpreter = Interpreter(output=BufferOutput(), max_steps=5000)
+        interpreter.hot_loop_threshold = threshold
+        interpreter.interpret(parse(tokenize_program(code)))
+        assert interpreter.steps_left == 0
+
+        interpreter = Interpreter(output=BufferOutput(), max_steps=4999)
+        interpreter.hot_loop_threshold = threshold
+        with pytest.raises(StepLimitError):
+            interpreter.interpret(parse(tokenize_program(code)))
+        assert interpreter.global_env.get_variable("i") == 5000
+
+
+def test_budget_is_per_run():
+    interpreter = Interpreter(output=BufferOutput(), max_steps=100)
+    program = parse(tokenize_program("i = 0\nkadai i < 80:\n    i = i + 1"))
+    interpreter.interpret(program)
+    interpreter.interpret(program)
+
+
+def test_run_max_steps_argument():
+    with pytest.raises(ContextualError) as exc_info:
+        run(RUNAWAY["while"], max_steps=1000)
+    assert exc_info.value.kind == ErrorKind.INFINITE_LOOP
+
+
+@pytest.mark.parametrize("own_budget", [None, 5000])
+def test_run_max_steps_applies_to_that_run_only(own_budget):
+    interpreter = Interpreter(output=BufferOutput(), max_steps=own_budget)
+    with pytest.raises(ContextualError) as exc_info:
+        run(RUNAWAY["while"], interpreter=interpreter, max_steps=10)
+    assert exc_info.value.kind == ErrorKind.INFINITE_LOOP
+    assert interpreter.max_steps == own_budget
+    run("i = 0\nkadai i < 100:\n    i = i + 1", interpreter=interpreter)
+    assert interpreter.global_env.get_variable("i") == 100
+
+
+def test_works_outside_the_main_thread():
+    errors = []
+
+    def target():
+        try:
+            run(RUNAWAY["while"], max_steps=1000)
+        except ContextualError as e:
+            errors.append(e.kind)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join(timeout=30)
+    assert errors == [ErrorKind.INFINITE_LOOP]
+
+
+# 40 iterations, far under any step budget, but each squaring doubles the
+# size of x: the work per step is unbounded
+HEAVY_STEPS = "x = 3\ndon i = 0 zuwa 40:\n    x = x * x"
+
+
+def test_time_limit_stops_heavy_steps_under_the_budget():
+    start = time.monotonic()
+    with pytest.raises(TimeLimitError):
+        call_with_time_limit(1, interpret_program, HEAVY_STEPS, max_steps=1_000_000)
+    assert time.monotonic() - start < 10
+
+
+def test_time_limit_returns_results_and_errors():
+    assert call_with_time_limit(10, divmod, 7, 2) == (3, 1)
+    with pytest.raises(RuntimeError, match="DIVISION_BY_ZERO"):
+        call_with_time_limit(10, interpret_program, "rubuta 1 / 0")
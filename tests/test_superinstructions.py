@@ -0,0 +1,121 @@
+"""Tests for the superinstruction fusion pass."""
+
+import glob
+import io
+import os
+from contextlib import redirect_stdout
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.interpreter import Interpreter
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.output import BufferOutput
+from hausalang.core.stack_interpreter import StackInterpreter
+from hausalang.core.superinstructions import (
+    CompareConst,
+    CompareNames,
+    Increment,
+    ModuloTest,
+    fuse_program,
+)
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def fused(code):
+    return fuse_program(parser.parse(tokenize_program(code))).statements
+
+
+def run(code, superinstructions=True, engine=Interpreter):
+    out = BufferOutput()
+    interpreter = engine(output=out)
+    interpreter.superinstructions = superinstructions
+    interpreter.interpret(parser.parse(tokenize_program(code)))
+    return out.getvalue(), interpreter.global_env.variables
+
+
+class TestFusionPass:
+    """Shapes that are (and are not) fused"""
+
+    def test_increment_and_decrement(self):
+        inc, dec = fused("x = x + 1\ny = y - 2.5")
+        assert inc == Increment(1, 0, name="x", operator="+", amount=1)
+        assert (dec.name, dec.operator, dec.amount) == ("y", "-", 2.5)
+
+    def test_other_assignments_untouched(self):
+        for code in ("x = y + 1", "x = x * 2", "x = x + y", "x = 1 + x"):
+            assert isinstance(fused(code)[0], parser.Assignment)
+
+    def test_conditions(self):
+        code = "kadai i < 10:\n    i = i + 1\nidan a >= b:\n    rubuta 1"
+        loop, branch = fused(code)
+        assert isinstance(loop.condition, CompareConst)
+        assert isinstance(loop.body[0], Increment)
+        assert branch.condition == CompareNames(
+            branch.condition.line, branch.condition.column, "a", ">=", "b"
+        )
+
+    def test_modulo_test(self):
+        (stmt,) = fused("idan n % 2 != 0:\n    rubuta n")
+        assert isinstance(stmt.condition, ModuloTest)
+        assert stmt.condition.operator == "!="
+
+    def test_nested_bodies_are_fused(self):
+        code = """
+aiki f(n):
+    don i = 0 zuwa n:
+        idan i % 3 == 0:
+            n = n - 1
+        in ba haka ba:
+            kadai n > 0:
+                n = n - 1
+    mayar n
+"""
+        (func,) = fused(code)
+        branch = func.body[0].body[0]
+        assert isinstance(branch.condition, ModuloTest)
+        assert isinstance(branch.then_body[0], Increment)
+        assert isinstance(branch.else_body[0].condition, CompareConst)
+
+
+class TestFusedSemantics:
+    """Fused programs behave exactly like unfused ones"""
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            "x = 5\nkadai x > 0:\n    rubuta x\n    x = x - 2",
+            "n = 10\nidan n % 4 == 2:\n    rubuta 1\nin ba haka ba:\n    rubuta 0",
+            "x = 1.5\nx = x + 1\nrubuta x\nidan x == 2.5:\n    rubuta 1",
+            "s = 0\na = 3\nb = 4\nidan a < b:\n    s = s + 1\nrubuta s",
+        ],
+    )
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_same_result(self, code, engine):
+        assert run(code, True, engine) == run(code, False, engine)
+
+    @pytest.mark.parametrize(
+        "code, error",
+        [
+            ("x = x + 1", NameError),
+            ('s = "a"\ns = s - 1', TypeError),
+            ('s = "a"\nidan s < 1:\n    rubuta s', TypeError),
+            ("d = 0\nidan 5 % d == 0:\n    rubuta 1", ZeroDivisionError),
+        ],
+    )
+    def test_same_errors(self, code, error):
+        with pytest.raises(error) as fused_error:
+            run(code, True)
+        with pytest.raises(error) as plain_error:
+            run(code, False)
+        assert str(fused_error.value) == str(plain_error.value)
+
+    @pytest.mark.parametrize(
+        "path", sorted(glob.glob(os.path.join(EXAMPLES, "tests", "*.ha")))
+    )
+    def test_examples(self, path):
+        with open(path, encoding="utf-8") as f:
+            code = f.read()
+        with redirect_stdout(io.StringIO()):
+            assert run(code, True) == run(code, False)
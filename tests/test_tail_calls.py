@@ -0,0 +1,119 @@
+"""Tests for self tail-call elimination (`mayar f(...)` inside `f`)."""
+
+import pytest
+
+from hausalang.core import StackInterpreter
+from hausalang.core.interpreter import Interpreter, find_tail_calls
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.parser import parse
+from hausalang.repl.session import ReplSession
+
+ENGINES = [Interpreter, StackInterpreter]
+
+
+def make_session(engine):
+    s = ReplSession()
+    s.interpreter = engine()
+    return s
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+class TestTailRecursion:
+    """Tail-recursive loops run in constant stack"""
+
+    def test_countdown_deeper_than_recursion_limit(self, engine):
+        s = make_session(engine)
+        s.execute(
+            """
+aiki countdown(n):
+    idan n == 0:
+        mayar "done"
+    mayar countdown(n - 1)
+"""
+        )
+        r = s.execute("countdown(20000)")
+        assert r.success, r.error
+        assert r.output == "done"
+
+    def test_gcd(self, engine):
+        s = make_session(engine)
+        s.execute(
+            """
+aiki gcd(a, b):
+    idan b == 0:
+        mayar a
+    mayar gcd(b, a % b)
+"""
+        )
+        assert s.execute("gcd(1071, 462)").output == 21
+
+    def test_accumulator_with_locals(self, engine):
+        s = make_session(engine)
+        s.execute(
+            """
+aiki total(n, acc):
+    idan n == 0:
+        mayar acc
+    step = n * 2
+    mayar total(n - 1, acc + step)
+"""
+        )
+        r = s.execute("total(10000, 0)")
+        assert r.success, r.error
+        assert r.output == 100010000
+
+    def test_arguments_evaluated_before_rebinding(self, engine):
+        s = make_session(engine)
+        s.execute(
+            """
+aiki swap(a, b, n):
+    idan n == 0:
+        mayar a - b
+    mayar swap(b, a, n - 1)
+"""
+        )
+        assert s.execute("swap(10, 3, 3)").output == -7
+
+    def test_shadowed_name_is_an_ordinary_call(self, engine):
+        s = make_session(engine)
+        s.execute(
+            """
+aiki f(n):
+    idan n == 0:
+        mayar "outer"
+    aiki f(n):
+        mayar "inner"
+    mayar f(n - 1)
+"""
+        )
+        assert s.execute("f(3)").output == "inner"
+
+
+class TestFindTailCalls:
+    """Detection of self tail calls in a function body"""
+
+    def parse_function(self, code):
+        return parse(tokenize_program(code)).statements[0]
+
+    def test_nested_in_if_and_loops(self):
+        func = self.parse_function(
+            """
+aiki f(n):
+    idan n > 0:
+        kadai n > 5:
+            mayar f(n - 1)
+    mayar f(0)
+"""
+        )
+        assert len(find_tail_calls(func)) == 2
+
+    def test_non_tail_and_wrong_arity_are_ignored(self):
+        func = self.parse_function(
+            """
+aiki f(n):
+    mayar 1 + f(n - 1)
+    mayar f(n, 1)
+    mayar g(n)
+"""
+        )
+        assert find_tail_calls(func) == []
@@ -0,0 +1,162 @@
+"""Tests for static type inference and type specialization."""
+
+import pytest
+
+from hausalang.core import parser
+from hausalang.core.errors import ErrorKind
+from hausalang.core.interpreter import Interpreter
+from hausalang.core.lexer import tokenize_program
+from hausalang.core.output import BufferOutput
+from hausalang.core.stack_interpreter import StackInterpreter
+from hausalang.core.type_inference import (
+    ANY,
+    BINARY_RESULTS,
+    NONE_TYPE,
+    TypedBinaryOp,
+    binary_operation,
+    check_types,
+    infer_types,
+    specialize_types,
+)
+
+SAMPLES = {int: [0, 7, -3], float: [0.0, 2.5], str: ["", "ab", "%d"]}
+SAMPLES.update({bool: [True, False], NONE_TYPE: [None]})
+
+
+def parse(code):
+    return parser.parse(tokenize_program(code))
+
+
+def variables(code):
+    return infer_types(parse(code)).variables
+
+
+def typed_ops(program):
+    found = []
+
+    def visit(node):
+        if isinstance(node, TypedBinaryOp):
+            found.append(node)
+        if isinstance(node, list):
+            for item in node:
+                visit(item)
+        elif isinstance(node, parser.ASTNode):
+            for value in vars(node).values():
+                visit(value)
+
+    visit(program)
+    return found
+
+
+def outcome(function, *args):
+    try:
+        return "value", function(*args)
+    except Exception as e:
+        return "error", type(e), str(e)
+
+
+class TestInference:
+    """infer_types"""
+
+    def test_literals_and_operators(self):
+        assert variables('a = 1\nb = a / 2\nc = a * 0.5\nd = "x" * a\ne = a < 2') == {
+            "a": {int},
+            "b": {int},
+            "c": {float},
+            "d": {str},
+            "e": {bool},
+        }
+
+    def test_branches_join(self):
+        code = 'x = 1\nidan x:\n    x = "s"\n    y = 1\nin ba haka ba:\n    y = 2.0\n'
+        assert variables(code) == {"x": {int, str}, "y": {int, float}}
+
+    def test_assigned_on_one_path_is_unknown(self):
+        assert "y" not in variables("x = 1\nidan x:\n    y = 1\n")
+
+    def test_while_fixed_point(self):
+        code = "x = 0\ni = 0\nkadai i < 3:\n    x = x + 0.5\n    i = i + 1\n"
+        assert variables(code) == {"x": {int, float}, "i": {int}}
+
+    def test_for_variable(self):
+        assert variables("don i = 0 zuwa 2 ta 0.5:\n    rubuta i\n") == {
+            "i": {int, float}
+        }
+
+    def test_parameters_and_calls_are_unknown(self):
+        code = "aiki f(n):\n    m = n + 1\n    k = 2\n    mayar m\nx = f(1)\n"
+        info = infer_types(parse(code))
+        body = parse(code).statements[0].body
+        assert info.type_of(body[0].value) == ANY
+        assert info.variables == {"x": ANY}
+
+
+class TestTypeErrors:
+    """check_types"""
+
+    def test_definite_errors(self):
+        code = 'x = "a"\ny = 1\nrubuta x - y\nrubuta -x\nrubuta y < x\n'
+        errors = check_types(parse(code))
+        assert [(e.kind, e.location.line) for e in errors] == [
+            (ErrorKind.INVALID_OPERAND_TYPE, 3),
+            (ErrorKind.INVALID_OPERAND_TYPE, 4),
+            (ErrorKind.INVALID_OPERAND_TYPE, 5),
+        ]
+        assert "'-'" in errors[0].message
+        assert "str and int" in errors[0].message
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            'x = "a" * 3',
+            'x = "%d" % 3',
+            "aiki f(a):\n    mayar a - 1\n",
+            'x = 1\nidan x:\n    x = "s"\nrubuta x - 1\n',
+        ],
+    )
+    def test_no_false_positives(self, code):
+        assert check_types(parse(code)) == []
+
+    def test_errors_are_not_cascaded(self):
+        assert len(check_types(parse('x = ("a" - 1) + 2\n'))) == 1
+
+
+class TestSpecialization:
+    """specialize_types and TypedBinaryOp"""
+
+    @pytest.mark.parametrize("op", sorted({key[0] for key in BINARY_RESULTS}))
+    def test_operations_match_interpreter(self, op):
+        interpreter = Interpreter(output=BufferOutput())
+        for left_type, left_values in SAMPLES.items():
+            for right_type, right_values in SAMPLES.items():
+                operation = binary_operation(op, left_type, right_type)
+                for left in left_values:
+                    for right in right_values:
+                        expected = outcome(interpreter.apply_binary_op, op, left, right)
+                        assert outcome(operation, left, right) == expected
+                        if expected[0] == "value":
+                            assert BINARY_RESULTS[op, left_type, right_type] is type(
+                                expected[1]
+                            )
+
+    def test_integer_division(self):
+        program = specialize_types(parse("a = 7\nb = 2\nrubuta a / b\n"))
+        (typed,) = typed_ops(program)
+        assert (typed.left_type, typed.right_type) == (int, int)
+        output = BufferOutput()
+        Interpreter(output=output).interpret(program)
+        assert output.getvalue() == "3"
+
+    def test_unknown_types_are_not_specialized(self):
+        code = "aiki f(a):\n    mayar a / 2\nrubuta f(7.0)\n"
+        assert typed_ops(specialize_types(parse(code))) == []
+
+    @pytest.mark.parametrize("engine", [Interpreter, StackInterpreter])
+    def test_errors_are_unchanged(self, engine):
+        code = 'x = 0\ny = 1\nrubuta y / 2.0\nrubuta "s" + "t"\nrubuta y / x\n'
+        program = specialize_types(parse(code))
+        assert len(typed_ops(program)) == 3
+        output = BufferOutput()
+        with pytest.raises(ZeroDivisionError, match="integer division"):
+            engine(output=output).interpret(program)
+        assert output.getvalue() == "0.5st"
@@ -1,15 +1,36 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from core.interpreter import run
-import io
-import sys
-import signal
+from pydantic import BaseModel, Field
+from hausalang.core.checker import UndefinedNamesError
+from hausalang.core.interpreter import Interpreter, run
+from hausalang.core.optimizer import OPT_LEVELS, OptimizerStats
+from hausalang.core.output import BufferOutput
+from hausalang.core.stack_interpreter import StackInterpreter
+from hausalang.core.time_limit import TimeLimitError, call_with_time_limit
+
+# Maximum number of characters a playground program may print
+MAX_OUTPUT_CHARS = 100_000
+
+# Maximum number of loop iterations and function calls per program
+MAX_STEPS = 1_000_000
+
+# Maximum wall-clock time per program, whatever each step costs
+MAX_SECONDS = 5
 
 
 class CodeRequest(BaseModel):
     code: str
+    # Optimization level (see core/optimizer.py); 0 runs no optimizer passes
+    opt_level: int = Field(0, ge=min(OPT_LEVELS), le=max(OPT_LEVELS))
+    # Whether the response reports what each optimizer pass did
+    opt_stats: bool = False
+    # Whether undefined names are reported before the program runs
+    check_names: bool = False
+    # Run on StackInterpreter: deep recursion, but slower loops
+    stack: bool = False
 
 
 app = FastAPI(title="Hausalang Interpreter API")
@@ -27,12 +48,42 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="web"), name="static")
 
 
-class TimeoutException(Exception):
-    pass
+def _execute(
+    code: str, opt_level: int, opt_stats: bool, check_names: bool, stack: bool
+) -> dict:
+    """Run a program and build the /api/execute response (in a worker process)."""
+    # Capture output in memory (bounded) instead of swapping sys.stdout
+    buf = BufferOutput(max_output=MAX_OUTPUT_CHARS)
+    stats = OptimizerStats() if opt_stats else None
+    engine = StackInterpreter if stack else Interpreter
+
+    try:
+        # Runaway loops are stopped early by the step budget
+        run(
+            code,
+            interpreter=engine(output=buf, max_steps=MAX_STEPS),
+            opt_level=opt_level,
+            optimizer_stats=stats,
+            check_names=check_names,
+        )
+
+        output = buf.getvalue()
+
+        response = {
+            "success": True,
+            "output": output if output else "(no output)",
+            "error": None,
+        }
 
+    except Exception as e:
+        response = {"success": False, "output": buf.getvalue(), "error": str(e)}
+        if isinstance(e, UndefinedNamesError):
+            # Every undefined name, with its location, not just the first
+            response["undefined_names"] = [error.to_dict() for error in e.errors]
 
-def timeout_handler(signum, frame):
-    raise TimeoutException("Code execution timed out")
+    if stats is not None:
+        response["optimizer"] = stats.to_dict()
+    return response
 
 
 @app.post("/api/execute")
@@ -43,41 +94,30 @@ async def execute_code(request: CodeRequest):
     if not code:
         return {"success": False, "error": "No code provided"}
 
-    # Capture stdout
-    buf = io.StringIO()
-    old_stdout = sys.stdout
-    sys.stdout = buf
-
     try:
-        # Set a timeout (5 seconds)
-        signal.signal(signal.SIGALRM, timeout_handler)
-        signal.alarm(5)
-
-        run(code)
-
-        signal.alarm(0)  # Cancel the alarm
-        output = buf.getvalue()
-
-        return {
-            "success": True,
-            "output": output if output else "(no output)",
-            "error": None,
-        }
-
-    except TimeoutException:
-        signal.alarm(0)
+        # The step budget does not limit the work done per step (one
+        # big-int multiplication can run for hours), so the program runs
+        # in a worker process that is killed after MAX_SECONDS
+        return await asyncio.to_thread(
+            call_with_time_limit,
+            MAX_SECONDS,
+            _execute,
+            code,
+            request.opt_level,
+            request.opt_stats,
+            request.check_names,
+            request.stack,
+        )
+
+    except TimeLimitError:
         return {
             "success": False,
-            "output": buf.getvalue(),
-            "error": "Code execution timed out (5 second limit)",
+            "output": "",
+            "error": f"Code execution timed out ({MAX_SECONDS} second limit)",
         }
 
     except Exception as e:
-        signal.alarm(0)
-        return {"success": False, "output": buf.getvalue(), "error": str(e)}
-
-    finally:
-        sys.stdout = old_stdout
+        return {"success": False, "output": "", "error": str(e)}
 
 
 @app.get("/api/examples")